@@ -4,7 +4,11 @@ import datetime
 import logging
 import time
 from dateutil import parser
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from bayclub_base import BayClubBookingBase
+from availability import CLUB_TZ
+from ledger import Target, AlreadyReserved, parse_start
+from jobspec import load_spec, plan_jobs, execute
 
 logging.basicConfig(
     level=logging.INFO,
@@ -12,48 +16,23 @@ logging.basicConfig(
     datefmt='%d-%b-%y %H:%M:%S'
 )
 
+# Row of the 5:30 PM Ignite class in the class list when no row shows it
+IGNITE_ROW = 24
+# One div per class in the rendered class list
+CLASS_LIST_ROWS = "/html/body/app-root/div/app-classes-shell/app-classes/div/app-classes-list/div/div"
+
 
 class BayClubIgniteBooking(BayClubBookingBase):
-    """Book Monday and Wednesday 6:30pm Ignite classes at Bay Club San Francisco"""
+    """Book Ignite classes at Bay Club San Francisco (see schedule.toml for which days)"""
     
     # Inherit __init__, __enter__, __exit__, login, and calendar methods from base class
 
-    def select_location(self):
-        """Select Bay Club San Francisco location"""
-        logging.info("Selecting San Francisco location...")
+    def select_location(self, club="San Francisco"):
+        """Select the Bay Club location (San Francisco by default) and open Fitness classes"""
+        logging.info(f"Selecting {club} location...")
         
         try:
-            # Wait for dashboard to load
-            time.sleep(3)
-            
-            # Click club context selector
-            club_selector = "/html/body/app-root/div/app-dashboard/div/div/div[1]/div[1]/app-club-context-select/div/span[4]"
-            self.page.wait_for_selector(f"xpath={club_selector}", timeout=10000).click()
-            logging.info("Opened club selector")
-            time.sleep(2)
-            
-            # Select San Francisco club
-            sf_club = "/html/body/modal-container/div[2]/div/app-club-context-select-modal/div[2]/div/app-schedule-visit-club/div/div[1]/div/div[2]/div/div[3]/div[1]/div/div[2]/app-radio-select/div/div[4]/div/div[2]/div/span"
-            self.page.wait_for_selector(f"xpath={sf_club}", timeout=10000).click()
-            logging.info("Selected San Francisco club")
-            time.sleep(1)
-            
-            # Click save button
-            save_button = "/html/body/modal-container/div[2]/div/app-club-context-select-modal/div[2]/div/app-schedule-visit-club/div/div[2]/div/div"
-            self.page.wait_for_selector(f"xpath={save_button}", timeout=10000).click()
-            logging.info("Clicked save")
-            time.sleep(2)
-            
-            # Click Schedule Activity
-            schedule_activity = "/html/body/app-root/div/app-navbar/nav/div/div/button/span"
-            self.page.wait_for_selector(f"xpath={schedule_activity}", timeout=10000).click()
-            logging.info("Clicked Schedule Activity")
-            time.sleep(2)
-            
-            # Click Fitness
-            fitness_button = "/html/body/app-root/div/app-schedule-visit/div/div/div[2]/div[2]/div[2]/div[2]/div/span"
-            self.page.wait_for_selector(f"xpath={fitness_button}", timeout=10000).click()
-            logging.info("Clicked Fitness")
+            self.goto_activity(club, "fitness")
             
             # Wait for classes page to fully load
             time.sleep(5)
@@ -62,15 +41,16 @@ class BayClubIgniteBooking(BayClubBookingBase):
             
         except Exception as e:
             logging.error(f"Location selection failed: {e}")
-            self.page.screenshot(path="location_selection_error.png")
+            self.capture_artifact("location_selection_error")
             raise
 
-    def select_day(self, day_code):
-        """Select day of week (Mo, We, Th, Fr)"""
+    def select_day(self, day_code, settle=3):
+        """Select day of week (Mo, We, Th, Fr); settle is how long to let the slider render first"""
         logging.info(f"Selecting day: {day_code}")
+        self.feed.clear("classes")
         
         # Wait for day selector to appear
-        time.sleep(3)
+        time.sleep(settle)
         
         # Use specific XPath for Wednesday
         if day_code == "We":
@@ -82,7 +62,7 @@ class BayClubIgniteBooking(BayClubBookingBase):
                 return True
             except Exception as e:
                 logging.error(f"Failed to select Wednesday: {e}")
-                self.page.screenshot(path="wednesday_not_found.png")
+                self.capture_artifact("wednesday_not_found")
                 return False
         
         # Use specific XPath for Thursday (next day after Wednesday in slider)
@@ -96,7 +76,7 @@ class BayClubIgniteBooking(BayClubBookingBase):
                 return True
             except Exception as e:
                 logging.error(f"Failed to select Thursday: {e}")
-                self.page.screenshot(path="thursday_not_found.png")
+                self.capture_artifact("thursday_not_found")
                 return False
         
         # For other days, use text search
@@ -106,7 +86,7 @@ class BayClubIgniteBooking(BayClubBookingBase):
             if not elements:
                 logging.warning(f"No '{day_code}' found, attempt {attempt + 1}/3")
                 if attempt == 2:
-                    self.page.screenshot(path="day_not_found.png")
+                    self.capture_artifact("day_not_found")
                 time.sleep(2)
                 continue
             
@@ -120,16 +100,42 @@ class BayClubIgniteBooking(BayClubBookingBase):
         logging.error(f"Could not select day {day_code}")
         return False
 
-    def select_ignite(self):
-        """Select 5:30-6:30 PM Ignite class"""
-        logging.info("Looking for 5:30-6:30 PM Ignite class")
+    def find_ignite_row(self, class_time):
+        """Row of the Ignite class at class_time in the rendered class list; None if no row shows it
+        
+        Rows are matched on their own name and start time, so a list ordered or filtered
+        differently from the app's class data can't lead to clicking another class. The
+        class data, when it arrives, only says whether the class is full.
+        """
+        wanted = parser.parse(class_time).time()
+        for cls in self.feed.wait(self.page, "classes") or []:
+            if "ignite" in cls.name.lower() and parse_start(cls.start) == wanted and not cls.bookable:
+                logging.info("Ignite class is full, booking will join the waitlist")
+                self.run.waitlisted = True
+        
+        try:
+            self.page.wait_for_selector(f"xpath={CLASS_LIST_ROWS}", timeout=10000)
+        except PlaywrightTimeoutError:
+            logging.warning(f"Class list did not render, using row {IGNITE_ROW}")
+            return None
+        texts = self.page.eval_on_selector_all(f"xpath={CLASS_LIST_ROWS}", "rows => rows.map(row => row.textContent)")
+        for row, text in enumerate(texts, start=1):
+            if "ignite" in text.lower() and parse_start(text) == wanted:
+                logging.info(f"✓ Ignite class is row {row}")
+                return row
+        
+        logging.warning(f"No {class_time} Ignite class in the class list, using row {IGNITE_ROW}")
+        return None
+
+    def select_ignite(self, class_time="5:30 PM"):
+        """Select the Ignite class at class_time (5:30-6:30 PM by default)"""
+        logging.info(f"Looking for {class_time} Ignite class")
         
-        # Wait for classes to load
-        time.sleep(3)
+        row = self.find_ignite_row(class_time) or IGNITE_ROW
         
         try:
             # Click the Ignite class using exact XPath
-            ignite_class = "/html/body/app-root/div/app-classes-shell/app-classes/div/app-classes-list/div/div[24]/app-classes-can-book-item/app-class-list-item/div/div[1]/div[1]"
+            ignite_class = f"/html/body/app-root/div/app-classes-shell/app-classes/div/app-classes-list/div/div[{row}]/app-classes-can-book-item/app-class-list-item/div/div[1]/div[1]"
             self.page.wait_for_selector(f"xpath={ignite_class}", timeout=10000).click()
             logging.info("Ignite class clicked")
             time.sleep(3)
@@ -143,7 +149,7 @@ class BayClubIgniteBooking(BayClubBookingBase):
             
         except Exception as e:
             logging.error(f"Failed to select/book Ignite class: {e}")
-            self.page.screenshot(path="ignite_booking_failed.png")
+            self.capture_artifact("ignite_booking_failed")
             return False
 
     def book_or_waitlist(self):
@@ -176,6 +182,8 @@ class BayClubIgniteBooking(BayClubBookingBase):
 
     def confirm_booking(self):
         """Confirm the booking"""
+        if self.dry_run:
+            return self.skip_confirm()
         logging.info("Confirming booking...")
         
         try:
@@ -187,7 +195,7 @@ class BayClubIgniteBooking(BayClubBookingBase):
             return True
         except Exception as e:
             logging.error(f"Failed to confirm booking: {e}")
-            self.page.screenshot(path="confirm_booking_failed.png")
+            self.capture_artifact("confirm_booking_failed")
             return False
 
     def get_class_date(self):
@@ -204,7 +212,7 @@ class BayClubIgniteBooking(BayClubBookingBase):
             logging.warning(f"Could not extract class date: {e}")
             return None
 
-    def add_to_calendar(self, class_date_text):
+    def add_to_calendar(self, class_date_text, class_time="5:30 PM", duration_minutes=50, summary=None, description=None):
         """Add the booked class to Google Calendar"""
         try:
             logging.info("Adding event to Google Calendar...")
@@ -217,15 +225,14 @@ class BayClubIgniteBooking(BayClubBookingBase):
             # Parse the date string
             class_date = parser.parse(class_date_text)
             
-            # Set time to 5:30 PM - 6:20 PM
-            start = class_date.replace(hour=17, minute=30, second=0, microsecond=0)
-            end = start + datetime.timedelta(minutes=50)
+            start = datetime.datetime.combine(class_date.date(), parser.parse(class_time).time(), tzinfo=CLUB_TZ)
+            end = start + datetime.timedelta(minutes=duration_minutes)
             
             # Use base class method to add calendar event
             return self.add_calendar_event(
-                summary='Ignite - Bay Club San Francisco',
-                location='Bay Club San Francisco',
-                description='5:30-6:20 PM Ignite Class',
+                summary=summary or f'Ignite - Bay Club {self.club or "San Francisco"}',
+                location=f'Bay Club {self.club or "San Francisco"}',
+                description=description or f'{start:%-I:%M}-{end:%-I:%M %p} Ignite Class',
                 start_datetime=start,
                 end_datetime=end
             )
@@ -236,70 +243,106 @@ class BayClubIgniteBooking(BayClubBookingBase):
             return False
 
 
-def main(test_mode=False, force_mode=False):
-    """Main booking logic"""
-    today = datetime.datetime.now()
-    weekday = today.weekday()
+def book_ignite(target_day, club="San Francisco", username=None, password=None, headless=False,
+                class_time="5:30 PM", duration=50, calendar_summary=None, calendar_description=None, dry_run=False,
+                target_date=None, release_at=None):
+    """Run the full Ignite booking flow for one day code (Mo, We, Th, Fr)
     
-    logging.info(f"Starting - {today.strftime('%A %Y-%m-%d')}")
-    
-    # Determine target day
-    if test_mode:
-        target_day = "Mo"
-        logging.info("TEST MODE: Monday 5:30-6:30pm Ignite")
-    elif weekday == 5:  # Saturday
-        target_day = "Mo"
-        logging.info("Booking Monday 5:30-6:30pm Ignite")
-    elif weekday == 0:  # Monday
-        target_day = "We"
-        logging.info("Booking Wednesday 5:30-6:30pm Ignite")
-    elif weekday == 1:  # Tuesday
-        target_day = "Th"
-        logging.info("Booking Thursday 5:30-6:30pm Ignite")
-    elif force_mode:
-        # Force mode: try booking next Monday regardless of day
-        target_day = "Mo"
-        logging.info(f"FORCE MODE: Attempting Monday 5:30-6:30pm Ignite on {today.strftime('%A')}")
-    else:
-        logging.error(f"Should only run on Saturday, Monday, or Tuesday, not {today.strftime('%A')}")
-        return False
+    With target_date, a class already in the reservation ledger is not booked again.
+    With release_at, the class list is opened first and the class is only selected
+    once booking opens by the club's clock.
     
+    Returns:
+        bool: True if the class was booked (or already was), False otherwise
+    """
+    target = Target("ignite", club, target_date, parser.parse(class_time).time()) if target_date else None
     try:
-        with BayClubIgniteBooking(headless=False) as booking:
-            booking.login()
-            booking.select_location()
+        with BayClubIgniteBooking(headless=headless, username=username, password=password, dry_run=dry_run,
+                                  target=target) as booking:
+            booking.run.target = f"{target_day} {class_time} Ignite"
+            booking.prepare_release(release_at)
+            
+            with booking.step("login"):
+                booking.login()
+            with booking.step("select_location"):
+                booking.select_location(club)
             
-            if not booking.select_day(target_day):
-                raise RuntimeError(f"Failed to select {target_day}")
+            with booking.step("select_day"):
+                if not booking.select_day(target_day):
+                    raise RuntimeError(f"Failed to select {target_day}")
             
             # Get the class date before selecting the class
             class_date = booking.get_class_date()
+            booking.run.chosen_slot = class_date
+            booking.wait_for_release(release_at)
+            if release_at:
+                # The class list and its data were loaded before booking opened; load them again
+                # so the class isn't taken for full (and the booking for a waitlist) from stale data
+                with booking.step("reload_classes"):
+                    if not booking.select_day(target_day, settle=0):
+                        raise RuntimeError(f"Failed to select {target_day} again after the release")
             
-            if not booking.select_ignite():
-                raise RuntimeError("Failed to find Ignite class")
+            with booking.step("select_class"):
+                if not booking.select_ignite(class_time):
+                    raise RuntimeError("Failed to find Ignite class")
             
             # select_ignite now handles booking, but keep this as fallback
             # if not booking.book_or_waitlist():
             #     raise RuntimeError("Could not book or join waitlist")
             
-            if not booking.confirm_booking():
-                raise RuntimeError("Failed to confirm")
+            with booking.step("confirm"):
+                if not booking.confirm_booking():
+                    raise RuntimeError("Failed to confirm")
             
-            logging.info(f"✓ Successfully booked {target_day} 5:30-6:30 PM Ignite!")
+            booking.mark_booked()
+            logging.info(f"✓ Successfully booked {target_day} {class_time} Ignite!")
+            if target and not booking.run.waitlisted:
+                booking.verify_reservations([target])
             
             # Add to Google Calendar
             if class_date:
-                booking.add_to_calendar(class_date)
+                booking.add_to_calendar(class_date, class_time, duration, calendar_summary, calendar_description)
             
             return True
             
+    except AlreadyReserved as e:
+        logging.info(f"✓ {e}")
+        return True
     except Exception as e:
         logging.error(f"Booking failed: {e}")
         return False
 
 
+def main(test_mode=False, force_mode=False, dry_run=False):
+    """Run the Ignite jobs in schedule.toml that are due today
+    
+    test_mode dry-runs one Ignite job whatever the day; force_mode books it for real.
+    That is the job due today if there is one (on a Monday, Wednesday's class),
+    otherwise the first Ignite job in the file, for its next date.
+    """
+    today = datetime.datetime.now(CLUB_TZ)
+    logging.info(f"Starting - {today.strftime('%A %Y-%m-%d')}")
+    
+    specs = load_spec()
+    jobs = plan_jobs(specs, today.date(), activity="ignite")
+    if test_mode or force_mode:
+        jobs = (jobs or plan_jobs(specs, today.date(), activity="ignite", force=True))[:1]
+        logging.info(f"{'TEST' if test_mode else 'FORCE'} MODE on {today.strftime('%A')}")
+        dry_run = dry_run or test_mode
+    
+    if not jobs:
+        logging.error(f"No Ignite jobs scheduled to run on {today.strftime('%A')}")
+        return False
+    
+    success = True
+    for job in jobs:
+        logging.info(f"Booking {job.label}")
+        success = execute(job, dry_run=dry_run) and success
+    return success
+
+
 if __name__ == "__main__":
     test_mode = '--test' in sys.argv
     force_mode = '--force' in sys.argv
-    success = main(test_mode=test_mode, force_mode=force_mode)
+    success = main(test_mode=test_mode, force_mode=force_mode, dry_run='--dry-run' in sys.argv)
     sys.exit(0 if success else 1)
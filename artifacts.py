@@ -0,0 +1,104 @@
+"""
+Failure artifact capture that stays off the booking hot path
+
+A failure used to take a full-page screenshot right where it happened, which costs
+a render in the middle of the booking window. ArtifactCapture instead:
+
+- grabs only the DOM at the failure point (one round trip, no rendering) and hands
+  the bytes to a background writer thread,
+- takes a single screenshot at teardown, after the booking attempt is over,
+- optionally records a Playwright trace (BAYCLUB_TRACE=on, or retain-on-failure to
+  keep it only for runs that captured a failure),
+- keeps ARTIFACT_DIR under BAYCLUB_ARTIFACT_MAX_MB by deleting the oldest files.
+"""
+import os
+import queue
+import logging
+import threading
+from run_history import ARTIFACT_DIR
+
+ARTIFACT_MAX_BYTES = int(float(os.environ.get("BAYCLUB_ARTIFACT_MAX_MB", "200")) * 1024 * 1024)
+CAPTURE_DOM = os.environ.get("BAYCLUB_CAPTURE_DOM", "1") != "0"
+TRACE_MODE = os.environ.get("BAYCLUB_TRACE", "off")  # off | on | retain-on-failure
+
+
+class ArtifactCapture:
+    """Deferred screenshots, background DOM writes and optional tracing for one run"""
+
+    def __init__(self, run, capture_dom=CAPTURE_DOM, trace_mode=TRACE_MODE):
+        self.run = run
+        self.capture_dom = capture_dom
+        self.trace_mode = trace_mode
+        self.pending = []
+        self.context = None
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="artifact-writer", daemon=True)
+        self._writer.start()
+
+    def start(self, context):
+        """Attach to a browser context, starting a trace if enabled"""
+        self.context = context
+        if self.trace_mode in ("on", "retain-on-failure"):
+            try:
+                context.tracing.start(screenshots=True, snapshots=True)
+            except Exception as e:
+                logging.warning(f"Could not start trace: {e}")
+                self.trace_mode = "off"
+
+    def capture(self, page, name):
+        """Note a failure; only the DOM is read now, the screenshot waits for teardown"""
+        self.pending.append(name)
+        if self.capture_dom and page:
+            try:
+                self._queue.put((self.run.artifact_path(name, "html"), page.content().encode()))
+            except Exception as e:
+                logging.debug(f"Could not capture DOM for {name}: {e}")
+
+    def _write_loop(self):
+        while True:
+            path, data = self._queue.get()
+            try:
+                with open(path, "wb") as f:
+                    f.write(data)
+            except OSError as e:
+                logging.warning(f"Could not write artifact {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def finish(self, page, failed=False):
+        """Take the deferred screenshot, save the trace, flush writes and apply retention"""
+        failed = failed or bool(self.pending)
+        if self.pending and page:
+            try:
+                page.screenshot(path=self.run.artifact_path(self.pending[-1]))
+            except Exception as e:
+                logging.warning(f"Could not save screenshot {self.pending[-1]}: {e}")
+
+        if self.context and self.trace_mode != "off":
+            try:
+                if self.trace_mode == "on" or failed:
+                    self.context.tracing.stop(path=self.run.artifact_path("trace", "zip"))
+                else:
+                    self.context.tracing.stop()
+            except Exception as e:
+                logging.warning(f"Could not save trace: {e}")
+
+        self._queue.join()
+        prune_artifacts()
+
+
+def prune_artifacts(max_bytes=ARTIFACT_MAX_BYTES, directory=ARTIFACT_DIR):
+    """Delete the oldest files in the artifact directory until it fits in max_bytes"""
+    try:
+        entries = sorted(os.scandir(directory), key=lambda e: e.stat().st_mtime, reverse=True)
+    except FileNotFoundError:
+        return
+
+    total = 0
+    for entry in entries:
+        total += entry.stat().st_size
+        if total > max_bytes:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
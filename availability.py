@@ -0,0 +1,148 @@
+"""
+Minute-resolution availability masks
+
+A span of local days is packed into one Python int, one bit per wall-clock minute
+(bit 0 = 00:00 on the first day), with a set bit meaning busy. Finding every start
+time where a block of N minutes is free is then a handful of big-int shifts and
+ANDs over the whole range at once, instead of an overlap check per slot per event.
+
+Everything is in the club's local time (America/Los_Angeles). Calendar times are
+converted with zoneinfo before they are placed, so UTC offsets and DST changes are
+handled when the mask is built. On DST transition days a busy span is sized by
+the real minutes it lasts and split where the UTC offset changes, so a span in
+the repeated fall-back hour covers those wall-clock minutes once (rather than
+mapping to an empty or short range); the wall-clock minutes skipped when clocks
+spring forward don't exist and are never free.
+"""
+import datetime
+from zoneinfo import ZoneInfo
+
+UTC = datetime.timezone.utc
+
+CLUB_TZ = ZoneInfo("America/Los_Angeles")
+MINUTES_PER_DAY = 24 * 60
+
+# Court starts considered each day: every 30 minutes from 7:00 AM to 8:30 PM
+FIRST_START = 7 * 60
+LAST_START = 20 * 60 + 30
+SLOT_STEP = 30
+
+
+def parse_event_time(value, tz=CLUB_TZ):
+    """Calendar API dateTime string -> aware datetime in tz"""
+    parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=tz)
+    return parsed.astimezone(tz)
+
+
+class AvailabilityMask:
+    """Busy bitmask over the local days [start_date, start_date + days)"""
+
+    def __init__(self, start_date, days, tz=CLUB_TZ):
+        self.start_date = start_date
+        self.days = days
+        self.tz = tz
+        self.size = days * MINUTES_PER_DAY
+        self.all_bits = (1 << self.size) - 1
+        self.busy = 0
+        self.add_skipped_minutes()
+
+    def wall_index(self, when):
+        """Bit index of an aware datetime's wall-clock minute, which may lie outside the mask"""
+        local = when.astimezone(self.tz)
+        return (local.date() - self.start_date).days * MINUTES_PER_DAY + local.hour * 60 + local.minute
+
+    def minute_index(self, when):
+        """Bit index of an aware datetime (clamped to the mask range)"""
+        return max(0, min(self.size, self.wall_index(when)))
+
+    def offset_change(self, start, end):
+        """First instant after start (up to end) where the UTC offset differs from start's
+
+        Offset changes fall on a quarter hour UTC, so quarter hours are all that is checked.
+        """
+        moment = start.astimezone(UTC).replace(second=0, microsecond=0)
+        moment += datetime.timedelta(minutes=15 - moment.minute % 15)
+        while moment < end and moment.astimezone(self.tz).utcoffset() == start.utcoffset():
+            moment += datetime.timedelta(minutes=15)
+        return min(moment, end).astimezone(self.tz)
+
+    def add_skipped_minutes(self):
+        """Mark busy the wall-clock minutes that don't exist because clocks sprang forward"""
+        for day in range(self.days):
+            date = self.start_date + datetime.timedelta(days=day)
+            start = datetime.datetime.combine(date, datetime.time(), tzinfo=self.tz)
+            end = datetime.datetime.combine(date + datetime.timedelta(days=1), datetime.time(), tzinfo=self.tz)
+            if start.utcoffset() < end.utcoffset():
+                change = self.offset_change(start, end)
+                skipped = int((end.utcoffset() - start.utcoffset()).total_seconds() // 60)
+                first = self.wall_index(change) - skipped
+                self.busy |= ((1 << skipped) - 1) << first
+
+    def to_datetime(self, index):
+        """Aware local datetime for a bit index"""
+        day, minute = divmod(index, MINUTES_PER_DAY)
+        date = self.start_date + datetime.timedelta(days=day)
+        return datetime.datetime.combine(date, datetime.time(minute // 60, minute % 60), tzinfo=self.tz)
+
+    def add_busy(self, start, end):
+        """Mark the wall-clock minutes covered by [start, end) busy"""
+        start, end = start.astimezone(self.tz), end.astimezone(self.tz)
+        # Compared and sized by timestamp: aware datetimes sharing a tzinfo compare as wall-clock times
+        while start.timestamp() < end.timestamp():
+            # Split where the UTC offset changes, so each piece maps at its own offset
+            piece_end = end if start.utcoffset() == end.utcoffset() else self.offset_change(start, end)
+            first = self.wall_index(start)
+            last = first + int(piece_end.timestamp() // 60 - start.timestamp() // 60)
+            first, last = max(0, min(self.size, first)), max(0, min(self.size, last))
+            if last > first:
+                self.busy |= ((1 << (last - first)) - 1) << first
+            start = piece_end
+
+    def add_events(self, events):
+        """Mark Google Calendar events busy; all-day events are ignored, as before"""
+        for event in events:
+            start = event['start'].get('dateTime')
+            end = event['end'].get('dateTime')
+            if start and end:
+                self.add_busy(parse_event_time(start, self.tz), parse_event_time(end, self.tz))
+        return self
+
+    def free_starts(self, duration_minutes, before=0, after=0):
+        """Bitmask of start minutes where the next duration_minutes are all free
+
+        `before` and `after` reserve extra free minutes around the block (travel
+        time, changing, buffers between events).
+
+        Windowed AND by doubling: after the loop, bit m of `ok` is set iff bits
+        m .. m+window-1 of `free` are all set. Minutes outside the range count as busy.
+        """
+        window = before + duration_minutes + after
+        free = ~self.busy & self.all_bits
+        ok, width = free, 1
+        while width * 2 <= window:
+            ok &= ok >> width
+            width *= 2
+        if width < window:
+            ok &= ok >> (window - width)
+        # A window starting at m-before means the block itself starts at m
+        return (ok << before) & self.all_bits
+
+    def slot_mask(self, starts):
+        """Bitmask with one bit per aware start datetime (e.g. court slots on offer)"""
+        mask = 0
+        for start in starts:
+            index = self.minute_index(start)
+            if index < self.size:
+                mask |= 1 << index
+        return mask
+
+    def starts_on(self, mask, date, first_minute, last_minute, step):
+        """Aware datetimes on `date` whose bit is set in mask, every `step` minutes"""
+        base = (date - self.start_date).days * MINUTES_PER_DAY
+        return [
+            self.to_datetime(base + minute)
+            for minute in range(first_minute, last_minute + 1, step)
+            if mask >> (base + minute) & 1
+        ]
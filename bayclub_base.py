@@ -4,75 +4,415 @@ Shared base class and utilities for Bay Club booking automation
 import os
 import time
 import logging
+import threading
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from dotenv import load_dotenv
+import catalog
+import http_client
+import metrics
+from run_history import RunRecorder
+from artifacts import ArtifactCapture
+from memory import MemorySampler, get_profile, child_pids, BROWSER_PROFILE, SPAWN_LOCK
+from browser_server import BrowserLease, BROWSER_SERVER
+from calendar_mirror import CalendarMirror
+from slot_feed import SlotFeed
+from clock_sync import ClockSync, CLOCK_PATH
+from ledger import Ledger, AlreadyReserved, LEDGER, VERIFY_RESERVATIONS, read_reservations
 
 load_dotenv()
 
-USERNAME = os.environ["BAYCLUB_USERNAME"]
-PASSWORD = os.environ["BAYCLUB_PASSWORD"]
+USERNAME = os.environ.get("BAYCLUB_USERNAME")
+PASSWORD = os.environ.get("BAYCLUB_PASSWORD")
 CALENDAR_CREDENTIALS = os.environ.get(
     "CALENDAR_CREDENTIALS_PATH", 
     os.path.expanduser("~/.credentials/credentials.json")
 )
 
+# Override to point the scripts at another deployment, e.g. the local mock_server.py
+BASE_URL = os.environ.get("BAYCLUB_BASE_URL", "https://bayclubconnect.com").rstrip("/")
+DASHBOARD_URL = f"{BASE_URL}/home/dashboard"
+CLOCK_URL = f"{BASE_URL}{CLOCK_PATH}"
+# BAYCLUB_HEADLESS=1 forces headless browsers even where the scripts ask for a visible one
+FORCE_HEADLESS = os.environ.get("BAYCLUB_HEADLESS") == "1"
+# BAYCLUB_DRY_RUN=1 runs every step up to, but not including, the final confirmation
+DRY_RUN = os.environ.get("BAYCLUB_DRY_RUN") == "1"
+# My Reservations page, where court bookings are cancelled
+RESERVATIONS_PATH = os.environ.get("BAYCLUB_RESERVATIONS_PATH", "/home/reservations")
+# What My Reservations shows instead of a list when there is nothing booked
+NO_RESERVATIONS_SELECTOR = os.environ.get(
+    "BAYCLUB_NO_RESERVATIONS_SELECTOR",
+    "app-my-reservations :text-matches('no (upcoming )?reservations', 'i')"
+)
+# BAYCLUB_CALENDAR_MIRROR=0 lists events from the API on every lookup instead of the local mirror
+CALENDAR_MIRROR = os.environ.get("BAYCLUB_CALENDAR_MIRROR", "1") == "1"
+
+# Saved browser sessions (cookies + localStorage) so headless tools can reuse a login
+SESSION_DIR = os.environ.get(
+    "BAYCLUB_SESSION_DIR",
+    os.path.expanduser("~/.cache/bayclub/sessions")
+)
+
+# Position of each club in the club context modal's radio list (app-radio-select/div/div[N])
+CLUBS = {
+    "Gateway": 2,
+    "San Francisco": 4,
+}
+
+# Buttons on the Schedule Activity page, keyed by activity name
+ACTIVITY_BUTTONS = {
+    "fitness": "/html/body/app-root/div/app-schedule-visit/div/div/div[2]/div[2]/div[2]/div[2]/div/span",
+    "court_booking": "/html/body/app-root/div/app-schedule-visit/div/div/div[2]/div[1]/div[2]/div/div/img",
+}
+
+# The club the session is on, shown in the navbar of every page ("Bay Club Gateway")
+SELECTED_CLUB_XPATH = "/html/body/app-root/div/app-navbar/nav/div/span"
+
+# Element that shows up once each activity's schedule page has rendered
+ACTIVITY_READY_SELECTORS = {
+    "fitness": "app-classes-shell",
+    "court_booking": "app-racquet-sports-filter",
+}
+
+
+def session_state_path(username):
+    """Path of the saved Playwright storage state for an account"""
+    safe_name = "".join(c if c.isalnum() else "_" for c in username)
+    return os.path.join(SESSION_DIR, f"{safe_name}.json")
+
+
+def build_calendar_service():
+    """Google Calendar API service, or None if there are no usable credentials"""
+    try:
+        if os.path.exists(CALENDAR_CREDENTIALS):
+            credentials = service_account.Credentials.from_service_account_file(
+                CALENDAR_CREDENTIALS,
+                scopes=['https://www.googleapis.com/auth/calendar']
+            )
+            service = build('calendar', 'v3', credentials=credentials)
+            logging.info("Calendar service initialized")
+            return service
+        logging.warning("Calendar credentials not found, skipping calendar integration")
+    except Exception as e:
+        logging.warning(f"Failed to initialize calendar service: {e}")
+    return None
+
 
 class BayClubBookingBase:
     """Base class for Bay Club booking automation with shared functionality"""
     
-    def __init__(self, headless=True):
-        self.headless = headless
+    def __init__(self, headless=True, username=None, password=None, base_url=None, profile=None, dry_run=False,
+                 browser_server=None, reuse_session=False, target=None):
+        self.headless = headless or FORCE_HEADLESS
+        self.dry_run = dry_run or DRY_RUN
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.dashboard_url = f"{self.base_url}/home/dashboard"
+        self.username = username or USERNAME
+        self.password = password or PASSWORD
         self.playwright = None
         self.browser = None
+        self.context = None
         self.page = None
         self.calendar_service = None
+        self.calendar_mirror = None
+        self.club = None
+        self.profile_name = profile or BROWSER_PROFILE
+        self.profile = get_profile(self.profile_name)
+        self.pages_opened = 0
+        # Control URL of a warm browser_server.py to attach to instead of launching Chromium
+        self.browser_server = browser_server or BROWSER_SERVER
+        self.lease = None
+        # Start from the account's saved login (always done when attached to a browser server)
+        self.reuse_session = reuse_session
+        self.session_reused = False
+        self.run = RunRecorder(type(self).__name__, account=self.username)
+        self.run.profile = self.profile_name
+        self.run.dry_run = self.dry_run
+        self.artifacts = ArtifactCapture(self.run)
+        self.memory = MemorySampler()
+        # Class lists and court slots parsed from the app's JSON responses as they arrive
+        self.feed = SlotFeed()
+        # What this run books (a ledger.Target); if it is already reserved, __enter__ stops before launching
+        self.target = target
+        self.ledger = Ledger() if LEDGER else None
+        # Bay Club's clock, measured once per run (prepare_release starts it early)
+        self.clock = ClockSync(f"{self.base_url}{CLOCK_PATH}")
+        self.clock_thread = None
         
     def __enter__(self):
-        self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(
-            headless=self.headless,
-            args=['--no-sandbox', '--disable-dev-shm-usage']
-        )
-        context = self.browser.new_context(
-            viewport={'width': 1280, 'height': 720},
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        )
-        self.page = context.new_page()
-        self.page.goto("https://bayclubconnect.com/home/dashboard", timeout=10000)
+        self.check_ledger()
+        self.memory.start()
+        with self.step("launch"):
+            with SPAWN_LOCK:
+                before = child_pids()
+                self.playwright = sync_playwright().start()
+                # This session's driver; Chromium launched through it runs under it
+                self.memory.root_pids.update(child_pids() - before)
+            if self.browser_server:
+                self.browser = self._attach_browser_server()
+            if not self.browser:
+                self.browser = self.playwright.chromium.launch(
+                    headless=self.headless,
+                    args=self.profile["args"]
+                )
+            storage_state = None
+            if self.lease or self.reuse_session:
+                # A shared browser (or a helper session) starts with the account's saved login
+                saved = session_state_path(self.username) if self.username else None
+                if saved and os.path.exists(saved):
+                    storage_state = saved
+                    self.session_reused = True
+            self.context = self._new_context(storage_state=storage_state)
+            self.artifacts.start(self.context)
+            self.open_page()
+            self.page.goto(self.dashboard_url, timeout=10000)
         
         # Initialize calendar service
-        self._init_calendar()
+        self.init_calendar()
         
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.run.python_peak_mb, self.run.browser_peak_mb = self.memory.stop()
+        logging.info(f"Peak RSS ({self.profile_name}): python {self.run.python_peak_mb:.0f} MB, "
+                     f"browser {self.run.browser_peak_mb:.0f} MB")
+        # Deferred screenshots and traces are taken here, after the booking attempt
+        self.artifacts.finish(self.page, failed=exc_val is not None)
+        http_client.log_latency()
+        if self.calendar_mirror:
+            self.calendar_mirror.close()
+        if self.ledger:
+            self.ledger.close()
+        self.run.club = self.club
+        self.run.finish(exc_val)
+        # Textfile collector metrics (BAYCLUB_METRICS_TEXTFILE), refreshed from the history just written
+        metrics.write_textfile()
+        if self.context:
+            self.context.close()
         if self.browser:
+            # For an attached browser this only disconnects; the server keeps Chromium running
             self.browser.close()
+        if self.lease:
+            self.lease.release()
         if self.playwright:
             self.playwright.stop()
 
-    def _init_calendar(self):
-        """Initialize Google Calendar API service"""
+    def _attach_browser_server(self):
+        """Lease a slot on the browser server and connect over CDP; None (launch locally) if that fails"""
+        lease = BrowserLease(self.browser_server)
         try:
-            if os.path.exists(CALENDAR_CREDENTIALS):
-                credentials = service_account.Credentials.from_service_account_file(
-                    CALENDAR_CREDENTIALS,
-                    scopes=['https://www.googleapis.com/auth/calendar']
-                )
-                self.calendar_service = build('calendar', 'v3', credentials=credentials)
-                logging.info("Calendar service initialized")
-            else:
-                logging.warning("Calendar credentials not found, skipping calendar integration")
+            cdp_url = lease.acquire(self.username or "anonymous")
+            browser = self.playwright.chromium.connect_over_cdp(cdp_url, timeout=10000)
+        except Exception as e:
+            logging.warning(f"Browser server unavailable ({e}), launching Chromium locally")
+            lease.release()
+            return None
+        self.lease = lease
+        # Shared with the server's other leases, but it is where this session's pages live
+        self.memory.root_pids.update(lease.pids)
+        logging.info(f"✓ Attached to warm browser at {cdp_url}")
+        return browser
+
+    def _new_context(self, storage_state=None):
+        return self.browser.new_context(
+            viewport=self.profile["viewport"],
+            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+            storage_state=storage_state
+        )
+
+    def open_page(self):
+        """Open a fresh page, recycling the context (keeping the login) once it hits the profile's page limit"""
+        limit = self.profile["context_page_limit"]
+        if limit and self.pages_opened >= limit:
+            logging.info(f"Recycling browser context after {self.pages_opened} pages")
+            state = self.context.storage_state()
+            self.context.close()
+            self.context = self._new_context(storage_state=state)
+            self.artifacts.start(self.context)
+            self.pages_opened = 0
+        elif self.page:
+            self.page.close()
+        
+        self.page = self.context.new_page()
+        self.feed.attach(self.page)
+        self.pages_opened += 1
+        if self.profile["disable_cache"]:
+            cdp = self.context.new_cdp_session(self.page)
+            cdp.send("Network.setCacheDisabled", {"cacheDisabled": True})
+        return self.page
+
+    def step(self, name):
+        """Context manager that times a named step of the booking flow for the run history"""
+        return self.run.step(name)
+
+    def skip_confirm(self):
+        """Dry run: stop in front of the final confirmation as if it had succeeded"""
+        logging.info(f"DRY RUN: stopping before confirmation (would have booked {self.run.chosen_slot or 'the selected slot'})")
+        return True
+
+    def mark_booked(self):
+        """Record a successful booking (or a dry run that got as far as confirming)"""
+        if self.dry_run:
+            self.run.outcome = "dry_run"
+        else:
+            self.run.outcome = "waitlisted" if self.run.waitlisted else "booked"
+
+    def prepare_release(self, release_at):
+        """Start measuring Bay Club's clock on a thread, so it is known before the page is ready
+        
+        Call it before logging in; wait_for_release picks up the estimate.
+        """
+        if not release_at or self.dry_run or self.clock_thread:
+            return
+        def measure():
+            try:
+                self.clock.sync()
+            except Exception as e:
+                logging.warning(f"Could not measure the club's clock yet: {e}")
+
+        self.clock_thread = threading.Thread(target=measure, name="clock-sync", daemon=True)
+        self.clock_thread.start()
+
+    def wait_for_release(self, release_at):
+        """Block until release_at (aware datetime) by the club's clock, with the page already prepared
+        
+        The offset of Bay Club's clock is measured again shortly before (or taken from
+        prepare_release when the release is closer than that), so a request sent right
+        after this returns reaches the server just after release. A release already
+        past returns at once.
+        """
+        if not release_at or self.dry_run:
+            return
+        if self.clock_thread:
+            self.clock_thread.join()
+        if release_at.timestamp() < self.clock.server_now():
+            logging.info(f"Release at {release_at:%H:%M:%S} has passed, going ahead")
+            return
+        with self.step("wait_release"):
+            self.clock.wait_for(release_at)
+        lateness = self.clock.server_now() - release_at.timestamp()
+        logging.info(f"✓ Released ({lateness * 1000:+.0f}ms by the server clock)")
+
+    def check_ledger(self):
+        """Raise AlreadyReserved, before any browser is launched, if the target is already booked"""
+        if not (self.ledger and self.target) or self.dry_run:
+            return
+        held = self.ledger.satisfied(self.username, self.target)
+        if not held:
+            return
+        self.run.target = self.target.text
+        self.run.chosen_slot = held
+        self.run.outcome = "already_booked"
+        self.run.club = self.target.club
+        self.finish_early()
+        raise AlreadyReserved(f"{self.target.text} is already reserved: {held} "
+                              "(run `python3 ledger.py sync` if it was cancelled)")
+
+    def finish_early(self, record=True):
+        """End a run that never launched the browser, recording it unless record is False"""
+        if record:
+            self.run.finish()
+            metrics.write_textfile()
+        if self.calendar_mirror:
+            self.calendar_mirror.close()
+        if self.ledger:
+            self.ledger.close()
+
+    def sync_ledger(self):
+        """Read My Reservations into the ledger
+        
+        Returns:
+            list: the reservations listed (empty when the page says there are none), or None if
+            the page showed neither a list nor its empty state, or a list that couldn't be read;
+            the ledger is left alone then
+        """
+        self.page.goto(f"{self.base_url}{RESERVATIONS_PATH}", timeout=10000)
+        try:
+            self.page.wait_for_selector(f"app-reservation-item, {NO_RESERVATIONS_SELECTOR}", timeout=5000)
+        except PlaywrightTimeoutError:
+            logging.warning("My Reservations didn't load, leaving the ledger as it is")
+            return None
+        reservations = read_reservations(self.page)
+        if not reservations:
+            if self.page.query_selector("app-reservation-item"):
+                logging.warning("Could not read the reservations listed, leaving the ledger as it is")
+                return None
+            logging.info("My Reservations lists nothing")
+        if self.ledger:
+            self.ledger.replace(self.username, reservations)
+        return reservations
+
+    def verify_reservations(self, targets):
+        """After confirming, check My Reservations lists each target and update the ledger
+        
+        A booking that isn't listed is still recorded locally (so a retry doesn't book it
+        twice) until the next sync says otherwise. Unless BAYCLUB_VERIFY_RESERVATIONS=1,
+        targets are only recorded locally.
+        
+        Returns:
+            bool: True if every target is listed (or wasn't checked)
+        """
+        if self.dry_run or not self.ledger or not targets:
+            return True
+        if not VERIFY_RESERVATIONS:
+            for target in targets:
+                self.ledger.record(self.username, target)
+            return True
+        try:
+            with self.step("verify"):
+                listed = self.sync_ledger()
         except Exception as e:
-            logging.warning(f"Failed to initialize calendar service: {e}")
+            logging.warning(f"Could not read My Reservations: {e}")
+            listed = None
+        verified = True
+        for target in targets:
+            if listed is not None and any(target.matches(r) for r in listed):
+                logging.info(f"✓ {target.text} is in My Reservations")
+                continue
+            verified = False
+            if listed is not None:
+                logging.warning(f"{target.text} was confirmed but is not in My Reservations")
+                self.capture_artifact("reservation_missing")
+            self.ledger.record(self.username, target)
+        return verified
+
+    def capture_artifact(self, name):
+        """Record a failure artifact without blocking: DOM now, screenshot at teardown"""
+        self.artifacts.capture(self.page, name)
+
+    def init_calendar(self):
+        """Initialize Google Calendar API service (once; planners call it before launching the browser)"""
+        if self.calendar_service:
+            return
+        self.calendar_service = build_calendar_service()
+        if self.calendar_service and CALENDAR_MIRROR:
+            try:
+                self.calendar_mirror = CalendarMirror()
+            except Exception as e:
+                logging.warning(f"Calendar mirror unavailable, listing events from the API: {e}")
+
+    def mirrored_events(self, first_date, last_date=None):
+        """Events from the local calendar mirror (synced once per run), or None to use the API"""
+        if self.calendar_mirror and self.calendar_mirror.ensure_synced(self.calendar_service):
+            return self.calendar_mirror.events_on(first_date, last_date)
+        return None
 
     def login(self):
         """Login to Bay Club"""
-        logging.info("Logging in...")
-        self.page.wait_for_selector("#username", timeout=5000).fill(USERNAME)
-        self.page.wait_for_selector("#password", timeout=5000).fill(PASSWORD)
+        if not self.username or not self.password:
+            raise RuntimeError("Bay Club credentials not set (BAYCLUB_USERNAME / BAYCLUB_PASSWORD)")
+        
+        if self.session_reused:
+            try:
+                self.page.wait_for_selector("#username", timeout=3000)
+            except PlaywrightTimeoutError:
+                logging.info("✓ Already logged in from saved session")
+                return
+        
+        logging.info(f"Logging in as {self.username}...")
+        self.page.wait_for_selector("#username", timeout=5000).fill(self.username)
+        self.page.wait_for_selector("#password", timeout=5000).fill(self.password)
         time.sleep(1)
         
         # Click login button
@@ -89,6 +429,94 @@ class BayClubBookingBase:
         
         time.sleep(2)
         logging.info("Login complete")
+        
+        try:
+            os.makedirs(SESSION_DIR, exist_ok=True)
+            self.context.storage_state(path=session_state_path(self.username))
+        except Exception as e:
+            logging.warning(f"Could not save session state: {e}")
+
+    def select_club(self, club):
+        """Switch the club context to the given club via the club selector modal"""
+        if club not in CLUBS:
+            raise ValueError(f"Unknown club '{club}', expected one of: {', '.join(CLUBS)}")
+        
+        # Click club context selector
+        club_selector = "/html/body/app-root/div/app-dashboard/div/div/div[1]/div[1]/app-club-context-select/div/span[4]"
+        self.page.wait_for_selector(f"xpath={club_selector}", timeout=10000).click()
+        logging.info("Opened club selector")
+        time.sleep(2)
+        
+        # Select the club's radio button
+        club_radio = f"/html/body/modal-container/div[2]/div/app-club-context-select-modal/div[2]/div/app-schedule-visit-club/div/div[1]/div/div[2]/div/div[3]/div[1]/div/div[2]/app-radio-select/div/div[{CLUBS[club]}]/div/div[2]/div/span"
+        self.page.wait_for_selector(f"xpath={club_radio}", timeout=10000).click()
+        logging.info(f"Selected {club} club")
+        self.club = club
+        catalog.record_session_club(self.username, club)
+        time.sleep(1)
+        
+        # Click save button
+        save_button = "/html/body/modal-container/div[2]/div/app-club-context-select-modal/div[2]/div/app-schedule-visit-club/div/div[2]/div/div"
+        self.page.wait_for_selector(f"xpath={save_button}", timeout=10000).click()
+        logging.info("Clicked save")
+        time.sleep(2)
+        
+        # Click Schedule Activity
+        schedule_activity = "/html/body/app-root/div/app-navbar/nav/div/div/button/span"
+        self.page.wait_for_selector(f"xpath={schedule_activity}", timeout=10000).click()
+        logging.info("Clicked Schedule Activity")
+        time.sleep(2)
+
+    def open_activity(self, activity):
+        """Click an activity on the Schedule Activity page and cache the URL it lands on"""
+        self.page.wait_for_selector(f"xpath={ACTIVITY_BUTTONS[activity]}", timeout=10000).click()
+        logging.info(f"Clicked {activity}")
+        self.page.wait_for_selector(ACTIVITY_READY_SELECTORS[activity], timeout=15000)
+        if self.club:
+            catalog.record(self.club, activity, self.page.url)
+
+    def selected_club(self):
+        """Club shown in the navbar, or None if the page doesn't show one"""
+        element = self.page.query_selector(f"xpath={SELECTED_CLUB_XPATH}")
+        if not element:
+            return None
+        return element.inner_text().strip().removeprefix("Bay Club ").strip() or None
+
+    def goto_activity(self, club, activity):
+        """Open an activity's schedule page for a club, using the catalog when possible
+        
+        Jumps straight to the cached URL when the session is already on that club and
+        checks the navbar shows it; otherwise falls back to the club selector modal.
+        """
+        self.feed.clear()
+        url = catalog.lookup(club, activity)
+        session_club = catalog.session_club(self.username)
+        if url and url.startswith(self.base_url) and session_club in (club, None):
+            try:
+                logging.info(f"Jumping to cached {club}/{activity} page")
+                self.page.goto(url, timeout=10000)
+                self.page.wait_for_selector(ACTIVITY_READY_SELECTORS[activity], timeout=10000)
+                shown = self.selected_club()
+                if shown == club:
+                    self.club = club
+                    catalog.record_session_club(self.username, club)
+                    logging.info(f"✓ Opened {club}/{activity} from catalog")
+                    return
+                # The URL is fine; the session is on another club, which only the modal changes
+                logging.info(f"Session is on {shown or 'an unknown club'}, switching to {club}")
+                if shown:
+                    catalog.record_session_club(self.username, shown)
+            except PlaywrightTimeoutError:
+                logging.warning(f"Cached {club}/{activity} page did not load, falling back to club selector")
+                catalog.invalidate(club, activity)
+            self.page.goto(self.dashboard_url, timeout=10000)
+        elif url:
+            logging.info(f"Session is on {session_club}, switching to {club}")
+        
+        # Wait for dashboard to load
+        time.sleep(3)
+        self.select_club(club)
+        self.open_activity(activity)
 
     def add_calendar_event(self, summary, location, description, start_datetime, end_datetime):
         """Add an event to Google Calendar
@@ -103,6 +531,10 @@ class BayClubBookingBase:
         Returns:
             bool: True if successful, False otherwise
         """
+        if self.dry_run:
+            logging.info(f"DRY RUN: not adding '{summary}' to the calendar")
+            return True
+        
         if not self.calendar_service:
             logging.warning("Calendar service not available")
             return False
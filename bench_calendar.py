@@ -0,0 +1,110 @@
+"""
+Calendar mirror benchmark and consistency check against the fake Calendar service
+
+Fills mock_calendar.FakeCalendarService with events, then compares answering
+"what's on this day" by listing from the (simulated-latency) API against a
+calendar_mirror.py query, and walks the mirror through incremental changes
+(adds, moves, deletes across several pages) and a 410 token-expiry resync,
+checking after each step that the mirror matches a full listing.
+
+Usage: python3 bench_calendar.py [--days 60] [--per-day 6] [--latency 0.08] [--page-size 25]
+"""
+import os
+import sys
+import time
+import random
+import datetime
+import tempfile
+import statistics
+from availability import CLUB_TZ
+from calendar_mirror import CalendarMirror
+from mock_calendar import FakeCalendarService
+
+
+def api_events_on(service, date):
+    """What get_calendar_events does without the mirror: a paged listing of the local day"""
+    start = datetime.datetime.combine(date, datetime.time.min, tzinfo=CLUB_TZ)
+    end = start + datetime.timedelta(days=1)
+    events, page_token = [], None
+    while True:
+        page = service.events().list(calendarId="primary", timeMin=start.isoformat(), timeMax=end.isoformat(),
+                                     singleEvents=True, orderBy="startTime", pageToken=page_token).execute()
+        events.extend(page.get("items", []))
+        page_token = page.get("nextPageToken")
+        if not page_token:
+            return events
+
+
+def check(label, mirror, service, dates):
+    latency, service.latency = service.latency, 0
+    mismatched = [date for date in dates
+                  if sorted(e["id"] for e in mirror.events_on(date)) != sorted(e["id"] for e in api_events_on(service, date))]
+    service.latency = latency
+    print(f"  {label:<34} {'OK' if not mismatched else f'MISMATCH on {len(mismatched)} days'}")
+    return not mismatched
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    days = int(arg('--days', 60))
+    service = FakeCalendarService(page_size=int(arg('--page-size', 25)))
+    today = datetime.datetime.now(CLUB_TZ).date()
+    service.populate(today - datetime.timedelta(days=7), days, per_day=int(arg('--per-day', 6)))
+    dates = [today + datetime.timedelta(days=offset) for offset in range(days - 7)]
+    rng = random.Random(1)
+
+    mirror = CalendarMirror(os.path.join(tempfile.mkdtemp(prefix="bayclub-calendar-"), "calendar.db"))
+    ok = True
+
+    service.latency = float(arg('--latency', 0.08))
+    print("Consistency:")
+    calls = service.calls
+    started = time.perf_counter()
+    mirror.sync(service)
+    print(f"  full sync: {service.calls - calls} pages in {time.perf_counter() - started:.2f}s")
+    ok &= check("after full sync", mirror, service, dates)
+
+    ids = list(service.by_id)
+    for event_id in rng.sample(ids, 30):
+        service.move_event(event_id, rng.choice((-60, 30, 90)))
+    for event_id in rng.sample(ids, 40):
+        service.delete_event(event_id)
+    service.populate(today, 10, per_day=3, seed=2)
+    calls = service.calls
+    started = time.perf_counter()
+    changed, removed, _ = mirror.sync(service)
+    print(f"  incremental sync: {service.calls - calls} pages, {changed} changed, {removed} removed "
+          f"in {time.perf_counter() - started:.2f}s")
+    ok &= check("after moves, deletes and adds", mirror, service, dates)
+
+    service.expire_tokens()
+    service.delete_event(rng.choice([i for i, e in service.by_id.items() if e["status"] != "cancelled"]))
+    _, _, full = mirror.sync(service)
+    ok &= check(f"after 410 ({'full resync' if full else 'no resync!'})", mirror, service, dates)
+    ok &= full
+
+    calls = service.calls
+    mirror.sync(service)
+    print(f"  no-change sync: {service.calls - calls} page(s)")
+
+    print("\nPer-day availability query:")
+    api_times, mirror_times = [], []
+    for date in dates[:10]:
+        started = time.perf_counter()
+        api_events_on(service, date)
+        api_times.append(time.perf_counter() - started)
+    for date in dates:
+        started = time.perf_counter()
+        mirror.events_on(date)
+        mirror_times.append(time.perf_counter() - started)
+    print(f"  API listing   median {statistics.median(api_times) * 1000:>8.1f}ms")
+    print(f"  mirror query  median {statistics.median(mirror_times) * 1e6:>8.0f}µs")
+    mirror.close()
+    return ok
+
+
+if __name__ == "__main__":
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
@@ -0,0 +1,82 @@
+"""
+Clock sync benchmark against a mock server with a skewed clock
+
+Runs mock_server.py with its clock set --skew seconds off the local one and, for
+Date-header and exact-timestamp probing, reports how well clock_sync.py
+estimates the offset. It then fires a class booking at a release instant
+several times, once timed by the local clock and once by ClockSync. For each,
+it reports when the request reached the server relative to the release by the
+server's clock, and how many requests came too early and were refused.
+
+Usage: python3 bench_clock.py [--skew 2.73] [--latency 0.02] [--trials 5] [--probes 8]
+"""
+import sys
+import time
+import datetime
+import statistics
+from bench_contention import http_login, spin_until, target_class_id
+from clock_sync import ClockSync, CLOCK_PATH
+from mock_server import MockBayClubServer, MockConfig
+
+
+def fire(server, session, class_id, release_at, clock=None):
+    """Post a booking at the release instant; returns (arrival - release by the server clock, refused)"""
+    if clock:
+        clock.wait_for(datetime.datetime.fromtimestamp(release_at).astimezone())
+    else:
+        spin_until(release_at)
+    response = session.post(f"{server.base_url}/api/book", json={"classId": class_id}, timeout=5)
+    arrived = server.state.booking_log[-1][0]
+    return arrived - release_at, response.status_code == 403
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    skew = float(arg('--skew', 2.73))
+    latency = float(arg('--latency', 0.02))
+    trials = int(arg('--trials', 5))
+    probes = int(arg('--probes', 8))
+
+    print(f"Server clock {skew:+.3f}s off, {latency * 1000:.0f}ms latency\n")
+    print(f"{'probing':<12} {'estimate':>10} {'error':>9} {'±':>8} {'rtt':>8} {'took':>6}")
+    for timestamps in (False, True):
+        config = MockConfig(latency=latency, api_latency=latency, clock_skew=skew, timestamp_header=timestamps)
+        with MockBayClubServer(config) as server:
+            clock = ClockSync(f"{server.base_url}{CLOCK_PATH}")
+            started = time.perf_counter()
+            est = clock.sync(probes)
+            took = time.perf_counter() - started
+            print(f"{'timestamp' if timestamps else 'Date':<12} {est.offset:>+9.4f}s {(est.offset - skew) * 1000:>+7.1f}ms "
+                  f"{est.uncertainty * 1000:>6.1f}ms {est.rtt * 1000:>6.1f}ms {took:>5.1f}s")
+
+    print(f"\nFiring at a release instant ({trials} trials, Date probing):")
+    print(f"{'timed by':<12} {'refused':>8} {'p50 late':>9} {'max late':>9}")
+    config = MockConfig(latency=latency, api_latency=latency, clock_skew=skew, capacity=1000)
+    ok = True
+    with MockBayClubServer(config) as server:
+        session = http_login(server.base_url, "bench-clock")
+        class_id = target_class_id()
+        for name in ("local clock", "ClockSync"):
+            lateness, refused = [], 0
+            for _ in range(trials):
+                clock = ClockSync(f"{server.base_url}{CLOCK_PATH}") if name == "ClockSync" else None
+                # Leave time for the probes, which wait for second boundaries
+                release_at = server.state.now() + probes + 2.0
+                config.release_at = release_at
+                late, was_refused = fire(server, session, class_id, release_at, clock)
+                refused += was_refused
+                if not was_refused:
+                    lateness.append(late * 1000)
+            p50 = f"{statistics.median(lateness):>7.1f}ms" if lateness else f"{'-':>9}"
+            worst = f"{max(lateness):>7.1f}ms" if lateness else f"{'-':>9}"
+            print(f"{name:<12} {refused:>5}/{trials} {p50:>9} {worst:>9}")
+            if name == "ClockSync":
+                ok = refused == 0
+    return ok
+
+
+if __name__ == "__main__":
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
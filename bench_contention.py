@@ -0,0 +1,182 @@
+"""
+Contested release-time booking benchmark
+
+Simulates the 12:01am race for a limited number of Ignite spots on the local mock
+server. Each trial opens booking at a scheduled instant, lets N competing clients
+fire booking requests after a random human-ish reaction delay, and measures how
+quickly our client reaches the server and whether it got a spot.
+
+Modes:
+    browser    - page prepared up to the class list; select_ignite + confirm_booking at release
+    prewarmed  - class details and confirmation modal already open; only the confirm click at release
+    http       - logged-in requests.Session posting straight to the booking API at release
+
+Usage: python3 bench_contention.py [--trials 5] [--competitors 20] [--spots 3]
+                                   [--modes browser,prewarmed,http] [--latency 0.02]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import datetime
+import statistics
+import threading
+import requests
+from mock_server import MockBayClubServer, MockConfig, IGNITE_INDEX
+
+CLUB = "San Francisco"
+OUR_USER = "bench-us"
+
+
+def target_class_id():
+    """The Ignite class that select_day("We") lands on: Wednesday of the current week"""
+    today = datetime.date.today()
+    wednesday = today - datetime.timedelta(days=today.weekday()) + datetime.timedelta(days=2)
+    return f"{CLUB}|{wednesday}|{IGNITE_INDEX}"
+
+
+def http_login(base_url, user):
+    session = requests.Session()
+    session.post(f"{base_url}/login", data={"username": user, "password": "x"}, timeout=5)
+    session.get(f"{base_url}/select-club", params={"club": CLUB}, timeout=5)
+    return session
+
+
+def spin_until(epoch):
+    """Sleep most of the way, then spin for the last few milliseconds"""
+    while True:
+        remaining = epoch - time.time()
+        if remaining <= 0:
+            return
+        time.sleep(remaining - 0.005 if remaining > 0.01 else 0)
+
+
+def competitor(base_url, user, release_at, rng, class_id):
+    session = http_login(base_url, user)
+    # Reaction time of someone refreshing the page at midnight
+    spin_until(release_at + rng.lognormvariate(-0.7, 0.6))
+    for _ in range(50):
+        response = session.post(f"{base_url}/api/book", json={"classId": class_id}, timeout=5)
+        if response.status_code != 403:
+            return
+        time.sleep(0.02)
+
+
+class HttpClient:
+    def prepare(self, base_url):
+        self.base_url = base_url
+        self.session = http_login(base_url, OUR_USER)
+        # Open the connection now so the release request doesn't pay for it
+        self.session.get(f"{base_url}/api/classes", timeout=5)
+
+    def fire(self, class_id):
+        for _ in range(100):
+            response = self.session.post(f"{self.base_url}/api/book", json={"classId": class_id}, timeout=5)
+            if response.status_code != 403:
+                return
+            time.sleep(0.005)
+
+    def close(self):
+        self.session.close()
+
+
+class BrowserClient:
+    """Drives BayClubIgniteBooking; prewarmed stops one click short of confirming"""
+
+    def __init__(self, prewarmed):
+        self.prewarmed = prewarmed
+
+    def prepare(self, base_url):
+        from app import BayClubIgniteBooking
+        self.booking = BayClubIgniteBooking(headless=True, username=OUR_USER, password="x", base_url=base_url)
+        self.booking.__enter__()
+        self.booking.login()
+        self.booking.select_location(CLUB)
+        self.booking.select_day("We")
+        if self.prewarmed:
+            self.booking.select_ignite()
+            self.confirm = self.booking.page.wait_for_selector(
+                "xpath=/html/body/modal-container/div[2]/div/app-universal-confirmation-modal/div[2]/div/div/div[4]/div/button[1]/span",
+                timeout=10000
+            )
+
+    def fire(self, class_id):
+        if self.prewarmed:
+            self.confirm.click()
+        else:
+            self.booking.select_ignite()
+            self.booking.confirm_booking()
+        # Let the confirm request reach the server before the trial is scored
+        self.booking.page.wait_for_function("document.getElementById('result').textContent.length > 0", timeout=10000)
+
+    def close(self):
+        self.booking.__exit__(None, None, None)
+
+
+def run_trial(mode, competitors, spots, latency, seed):
+    config = MockConfig(latency=latency, api_latency=latency, capacity=spots, release_at=float("inf"), seed=seed)
+    rng = random.Random(seed)
+    class_id = target_class_id()
+    with MockBayClubServer(config) as server:
+        client = HttpClient() if mode == "http" else BrowserClient(prewarmed=mode == "prewarmed")
+        client.prepare(server.base_url)
+
+        release_at = time.time() + 2.0
+        config.release_at = release_at
+        threads = [
+            threading.Thread(target=competitor, args=(server.base_url, f"bench-{i}", release_at, random.Random(rng.random()), class_id))
+            for i in range(competitors)
+        ]
+        for thread in threads:
+            thread.start()
+
+        spin_until(release_at)
+        try:
+            client.fire(class_id)
+        finally:
+            for thread in threads:
+                thread.join()
+            client.close()
+
+        ours = [arrived for arrived, user, _, status in server.state.booking_log if user == OUR_USER and status != 403]
+        reaction = (min(ours) - release_at) if ours else None
+        won = OUR_USER in server.state.class_bookings.get(class_id, [])
+        return reaction, won
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    trials = int(arg('--trials', 5))
+    competitors = int(arg('--competitors', 20))
+    spots = int(arg('--spots', 3))
+    latency = float(arg('--latency', 0.02))
+    modes = arg('--modes', 'browser,prewarmed,http').split(',')
+
+    # Keep benchmark runs out of the real history, artifacts and catalog
+    workdir = tempfile.mkdtemp(prefix="bayclub-contention-")
+    for name, value in [("BAYCLUB_HISTORY_DB", "history.db"), ("BAYCLUB_ARTIFACT_DIR", "artifacts"),
+                        ("BAYCLUB_CATALOG_PATH", "catalog.json"), ("BAYCLUB_SESSION_DIR", "sessions")]:
+        os.environ[name] = os.path.join(workdir, value)
+
+    print(f"{trials} trials, {competitors} competitors, {spots} spots, {latency * 1000:.0f}ms server latency\n")
+    print(f"{'mode':<10} {'win rate':>9} {'p50':>8} {'p90':>8} {'max':>8}")
+    for mode in modes:
+        reactions, wins = [], 0
+        for trial in range(trials):
+            reaction, won = run_trial(mode, competitors, spots, latency, seed=trial)
+            wins += won
+            if reaction is not None:
+                reactions.append(reaction * 1000)
+        if reactions:
+            reactions.sort()
+            p90 = reactions[min(len(reactions) - 1, int(len(reactions) * 0.9))]
+            print(f"{mode:<10} {wins / trials:>8.0%} {statistics.median(reactions):>6.0f}ms {p90:>6.0f}ms {reactions[-1]:>6.0f}ms")
+        else:
+            print(f"{mode:<10} {wins / trials:>8.0%} {'-':>8} {'-':>8} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
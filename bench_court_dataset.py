@@ -0,0 +1,109 @@
+"""
+Court dataset benchmark on synthetic snapshots
+
+Simulates --months of scraping: every --interval minutes, the slot grid of the
+next 7 days at --clubs clubs, with each slot filling at a random lead time
+before its start. It appends one file per snapshot, like the cron job, compacts
+every finished month and reports:
+- bytes per slot row on disk;
+- how long fill_percentiles() takes over the whole range, and over one club and month;
+- how far the median lead time it finds is from the one the simulation used.
+
+Usage: python3 bench_court_dataset.py [--months 3] [--clubs 3] [--interval 60]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import datetime
+from court_dataset import append, compact, fill_percentiles, open_dataset, slot_rows
+from slot_feed import CourtSlot
+
+CLUBS = ["Gateway", "Redwood Shores", "Broadway", "San Francisco", "Walnut Creek"]
+STARTS = [7 * 60 + 30 * i for i in range(27)]     # 7:00 AM to 8:00 PM
+COURTS_PER_SLOT = 4
+# Median hours before the start that the last court goes, by weekday (weekends fill sooner)
+MEDIAN_LEAD = [20, 20, 20, 20, 30, 60, 60]
+
+
+def simulate(path, months, clubs, interval):
+    rng = random.Random(7)
+    start = datetime.datetime(2026, 7, 1, tzinfo=datetime.timezone.utc)
+    end = start + datetime.timedelta(days=30 * months)
+    fill_at = {}
+    snapshots = rows = 0
+    snapshot_at = start
+    while snapshot_at < end:
+        batch = []
+        for club in CLUBS[:clubs]:
+            local = snapshot_at - datetime.timedelta(hours=7)
+            for offset in range(7):
+                date = (local + datetime.timedelta(days=offset)).date()
+                slots = []
+                for minute in STARTS:
+                    slot_start = (datetime.datetime.combine(date, datetime.time(minute // 60, minute % 60))
+                                  + datetime.timedelta(hours=7)).replace(tzinfo=datetime.timezone.utc)
+                    key = (club, date, minute)
+                    if key not in fill_at:
+                        lead = rng.lognormvariate(0, 0.5) * MEDIAN_LEAD[date.weekday()]
+                        fill_at[key] = slot_start - datetime.timedelta(hours=lead)
+                    if slot_start <= snapshot_at:
+                        continue
+                    left = max(0, min(COURTS_PER_SLOT, int((fill_at[key] - snapshot_at).total_seconds() // 7200) + 1))
+                    slots.append(CourtSlot(start=f"{minute // 60:02d}:{minute % 60:02d}", available=left > 0,
+                                           courts_left=left, duration=90))
+                batch.extend(slot_rows(club, date, slots, snapshot_at))
+        append(batch, path)
+        snapshots += 1
+        rows += len(batch)
+        snapshot_at += datetime.timedelta(minutes=interval)
+    compact(before=f"{end:%Y-%m}", path=path)
+    return snapshots, rows
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    months = int(arg('--months', 3))
+    clubs = int(arg('--clubs', 3))
+    interval = int(arg('--interval', 60))
+    path = tempfile.mkdtemp(prefix="bench-courts-")
+    try:
+        started = time.perf_counter()
+        snapshots, rows = simulate(path, months, clubs, interval)
+        took = time.perf_counter() - started
+        size = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+        files = len(open_dataset(path).files)
+        print(f"{snapshots} snapshots, {rows:,} slot rows, {files} files, {size / 1024 / 1024:.1f} MB "
+              f"({size / rows:.2f} bytes/row), written in {took:.1f}s\n")
+
+        print(f"{'query':<28} {'groups':>7} {'time':>8}")
+        queries = [
+            ("all clubs, all months", {}),
+            (f"{CLUBS[0]}, one month", {"club": CLUBS[0], "since": datetime.date(2026, 8, 1),
+                                        "until": datetime.date(2026, 9, 1)}),
+        ]
+        for name, kwargs in queries:
+            started = time.perf_counter()
+            table = fill_percentiles(path, **kwargs)
+            took = time.perf_counter() - started
+            print(f"{name:<28} {table.num_rows:>7} {took * 1000:>6.0f}ms")
+
+        table = fill_percentiles(path)
+        errors = []
+        for row in table.to_pylist():
+            if row["lead_p50"] is not None:
+                errors.append(abs(row["lead_p50"] - MEDIAN_LEAD[row["weekday"]]))
+        print(f"\nmedian lead vs simulated: mean error {sum(errors) / len(errors):.1f}h over {len(errors)} slots "
+              f"(snapshots every {interval} min)")
+        return bool(errors)
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
@@ -0,0 +1,83 @@
+"""
+End-to-end benchmark of both booking flows against the local mock server
+
+Starts mock_server.py in-process, runs the Ignite and tennis flows N times each
+in headless Chromium, and prints success counts plus per-step timings read back
+from a throwaway run history database.
+
+Usage: python3 bench_flows.py [--runs 3] [--latency 0.1] [--failure-rate 0]
+"""
+import os
+import sys
+import tempfile
+import statistics
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    runs = int(arg('--runs', 3))
+    workdir = tempfile.mkdtemp(prefix="bayclub-bench-")
+
+    # Must be set before the booking modules read their configuration
+    from mock_server import MockBayClubServer, MockConfig
+    server = MockBayClubServer(MockConfig(
+        latency=float(arg('--latency', 0.1)),
+        api_latency=float(arg('--latency', 0.1)),
+        failure_rate=float(arg('--failure-rate', 0)),
+    )).start()
+    os.environ.update({
+        "BAYCLUB_BASE_URL": server.base_url,
+        "BAYCLUB_HEADLESS": "1",
+        "BAYCLUB_USERNAME": "bench",
+        "BAYCLUB_PASSWORD": "bench",
+        "BAYCLUB_HISTORY_DB": os.path.join(workdir, "history.db"),
+        "BAYCLUB_ARTIFACT_DIR": os.path.join(workdir, "artifacts"),
+        "BAYCLUB_CATALOG_PATH": os.path.join(workdir, "catalog.json"),
+        "BAYCLUB_SESSION_DIR": os.path.join(workdir, "sessions"),
+        "BAYCLUB_ROSTER_PATH": os.path.join(workdir, "roster.json"),
+        "BAYCLUB_PARTNER": "Partner Player",
+    })
+    os.environ.pop("MODEL_ACCESS_KEY", None)
+
+    from app import book_ignite
+    from tennisbookapp import book_tennis
+    import run_history
+
+    results = {"ignite": [], "tennis": []}
+    try:
+        for _ in range(runs):
+            results["ignite"].append(book_ignite("We"))
+            results["tennis"].append(book_tennis("Friday"))
+    finally:
+        server.stop()
+
+    print("\nFlow       succeeded")
+    for flow, outcomes in results.items():
+        print(f"{flow:<10} {sum(outcomes)}/{len(outcomes)}")
+
+    conn = run_history.connect()
+    rows = conn.execute(
+        "SELECT runs.script, steps.name, steps.seconds FROM steps JOIN runs ON runs.id = steps.run_id"
+        " WHERE steps.ok = 1 ORDER BY runs.script, steps.started_offset"
+    ).fetchall()
+    totals = conn.execute("SELECT script, total_seconds FROM runs").fetchall()
+    conn.close()
+
+    timings = {}
+    for script, name, seconds in rows:
+        timings.setdefault((script, name), []).append(seconds)
+
+    print(f"\n{'Script':<24} {'Step':<18} {'median':>8} {'max':>8}")
+    for (script, name), values in timings.items():
+        print(f"{script:<24} {name:<18} {statistics.median(values):>7.2f}s {max(values):>7.2f}s")
+    for script in sorted({s for s, _ in totals}):
+        values = [t for s, t in totals if s == script]
+        print(f"{script:<24} {'total':<18} {statistics.median(values):>7.2f}s {max(values):>7.2f}s")
+    return all(all(outcomes) for outcomes in results.values())
+
+
+if __name__ == "__main__":
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
@@ -0,0 +1,63 @@
+"""
+Time-to-decision benchmark for the LLM booking decision
+
+Runs decide_booking_time_with_llm against the local llm_stub.py, once waiting for
+the full completion and once streaming with early termination, and prints the
+median and max time to a decision plus how many tokens the stub generated.
+
+Usage: python3 bench_llm.py [--runs 5] [--token-delay 0.03] [--reasoning-tokens 30]
+"""
+import os
+import sys
+import time
+import datetime
+import statistics
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    runs = int(arg('--runs', 5))
+
+    from llm_stub import LLMStubServer, StubConfig
+    stub = LLMStubServer(StubConfig(
+        token_delay=float(arg('--token-delay', 0.03)),
+        reasoning_tokens=int(arg('--reasoning-tokens', 30)),
+        answer="2:30 PM",
+    )).start()
+    # Must be set before tennisbookapp reads its configuration
+    os.environ.update({"MODEL_ACCESS_KEY": "stub", "BAYCLUB_LLM_URL": stub.url})
+
+    from availability import CLUB_TZ
+    from tennisbookapp import decide_booking_time_with_llm
+
+    day = datetime.date.today() + datetime.timedelta(days=3)
+    calendar_times = [
+        datetime.datetime.combine(day, datetime.time(hour, minute), tzinfo=CLUB_TZ)
+        for hour in range(7, 21) for minute in (0, 30)
+    ]
+    court_times = [("8:00 - 9:30 AM", None), ("2:30 - 4:00 PM", None), ("5:00 - 6:30 PM", None)]
+
+    print(f"\n{'mode':<10} {'decision':<16} {'median':>8} {'max':>8} {'tokens/run':>11}")
+    try:
+        for mode in ("full", "streaming"):
+            timings, decisions = [], set()
+            tokens_before = stub.state.tokens_sent
+            for _ in range(runs):
+                started = time.perf_counter()
+                decisions.add(decide_booking_time_with_llm(calendar_times, court_times, day.strftime("%A"),
+                                                           stream=mode == "streaming"))
+                timings.append(time.perf_counter() - started)
+            # Give cancelled generations a moment to notice the disconnect
+            time.sleep(0.2)
+            tokens = (stub.state.tokens_sent - tokens_before) / runs
+            print(f"{mode:<10} {', '.join(map(str, decisions)):<16} {statistics.median(timings):>7.2f}s "
+                  f"{max(timings):>7.2f}s {tokens:>11.0f}")
+    finally:
+        stub.stop()
+    print(f"\nStreamed generations cancelled early: {stub.state.cancelled}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
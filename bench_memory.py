@@ -0,0 +1,79 @@
+"""
+Peak memory of each browser profile on a full Ignite booking against the mock server
+
+Each profile runs in its own subprocess so the Python peak RSS (ru_maxrss) of one
+profile never leaks into the next.
+
+Usage: python3 bench_memory.py [--runs 2] [--profiles default,low-memory]
+"""
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import statistics
+
+
+def child(profile):
+    """Run one booking with the given profile and print its peaks as JSON"""
+    from app import BayClubIgniteBooking
+
+    with BayClubIgniteBooking(headless=True, profile=profile) as booking:
+        booking.login()
+        booking.select_location()
+        booking.select_day("We")
+        booking.select_ignite()
+        booking.confirm_booking()
+    print(json.dumps({"python": booking.run.python_peak_mb, "browser": booking.run.browser_peak_mb}))
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    if '--child' in argv:
+        child(arg('--child', 'default'))
+        return True
+
+    from mock_server import MockBayClubServer
+    from memory import PROFILES
+
+    runs = int(arg('--runs', 2))
+    profiles = arg('--profiles', ','.join(PROFILES)).split(',')
+    workdir = tempfile.mkdtemp(prefix="bayclub-memory-")
+
+    # Keep benchmark runs out of the real history, artifacts, catalog, ledger, calendar, policy and metrics
+    results = {}
+    with MockBayClubServer() as server:
+        env = dict(os.environ,
+                   BAYCLUB_BASE_URL=server.base_url, BAYCLUB_HEADLESS="1",
+                   BAYCLUB_USERNAME="bench", BAYCLUB_PASSWORD="bench",
+                   BAYCLUB_HISTORY_DB=os.path.join(workdir, "history.db"),
+                   BAYCLUB_ARTIFACT_DIR=os.path.join(workdir, "artifacts"),
+                   BAYCLUB_CATALOG_PATH=os.path.join(workdir, "catalog.json"),
+                   BAYCLUB_SESSION_DIR=os.path.join(workdir, "sessions"),
+                   BAYCLUB_LEDGER_DB=os.path.join(workdir, "ledger.db"),
+                   BAYCLUB_CALENDAR_DB=os.path.join(workdir, "calendar.db"),
+                   BAYCLUB_POLICY_PATH=os.path.join(workdir, "policy.json"),
+                   BAYCLUB_METRICS_TEXTFILE=os.path.join(workdir, "bayclub.prom"))
+        for profile in profiles:
+            for _ in range(runs):
+                output = subprocess.run([sys.executable, __file__, "--child", profile],
+                                        env=env, capture_output=True, text=True, check=True).stdout
+                results.setdefault(profile, []).append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"\n{'profile':<12} {'python MB':>10} {'browser MB':>11} {'total MB':>9}")
+    baseline = None
+    for profile, samples in results.items():
+        python_mb = statistics.median(s["python"] for s in samples)
+        browser_mb = statistics.median(s["browser"] for s in samples)
+        total = python_mb + browser_mb
+        saved = f"  (saves {baseline - total:.0f} MB vs {profiles[0]})" if baseline is not None else ""
+        baseline = total if baseline is None else baseline
+        print(f"{profile:<12} {python_mb:>10.0f} {browser_mb:>11.0f} {total:>9.0f}{saved}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
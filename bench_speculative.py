@@ -0,0 +1,143 @@
+"""
+Speculative court holds benchmark
+
+Races simulated members for the same court times on the local mock server (one
+court per slot, nothing pre-booked) and compares booking the ranked court times
+one after another with holding the top K at once (speculate.py). The mock
+enforces the club rules: at most K reservations per member per day, and
+cancellation only with 24h notice, so the target day is a few days out.
+
+For each mode it reports the win rate, the average rank of the court time won
+(0 is the policy's first choice), the time from the first click to a decision,
+and the most reservations left on our account afterwards, which must be 1.
+
+Usage: python3 bench_speculative.py [--trials 5] [--competitors 6] [--holds 1,2,3] [--latency 0.05]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import datetime
+import statistics
+import threading
+from bench_contention import http_login, spin_until
+from mock_server import MockBayClubServer, MockConfig
+
+CLUB = "Gateway"
+OUR_USER = "bench-us"
+DAYS_AHEAD = 3
+
+
+def competitor(base_url, user, start_at, rng, slot_ids):
+    """Someone going for one of the top court times, usually the best one"""
+    session = http_login(base_url, user)
+    slot_id = slot_ids[min(int(rng.expovariate(1.2)), len(slot_ids) - 1)]
+    spin_until(start_at + rng.lognormvariate(-1.0, 0.6))
+    session.post(f"{base_url}/api/court-book", json={"slotId": slot_id}, timeout=5)
+
+
+def run_trial(holds, competitors, latency, seed):
+    from availability import CLUB_TZ, FIRST_START, LAST_START, SLOT_STEP
+    from policy import load_policy
+    from speculate import SpeculationRules, book_speculatively, stop_holds
+    from tennisbookapp import BayClubTennisBooking, rank_booking_times, parse_court_start_time
+
+    config = MockConfig(latency=latency, api_latency=latency, courts=1, prebooked=0, seed=seed,
+                        max_court_bookings_per_day=holds, min_cancel_notice_hours=24)
+    rules = SpeculationRules(enabled=holds > 1, max_holds=holds, max_reservations_per_day=holds,
+                             min_cancel_notice_hours=24)
+    rng = random.Random(seed)
+    target_date = datetime.date.today() + datetime.timedelta(days=DAYS_AHEAD)
+    day_name = target_date.strftime("%A")
+    # A free calendar: every court start on the day fits
+    calendar_times = [
+        datetime.datetime.combine(target_date, datetime.time(minute // 60, minute % 60), tzinfo=CLUB_TZ)
+        for minute in range(FIRST_START, LAST_START + 1, SLOT_STEP)
+    ]
+
+    with MockBayClubServer(config) as server:
+        with BayClubTennisBooking(headless=True, username=OUR_USER, password="x", base_url=server.base_url,
+                                  speculation=rules) as booking:
+            booking.login()
+            booking.select_location(CLUB)
+            workers = booking.prepare_holds(target_date, load_policy().rank(calendar_times))
+            try:
+                booking.select_date(target_date)
+                court_times = booking.get_available_court_times()
+                candidates = rank_booking_times(calendar_times, court_times, day_name)
+                for worker in workers:
+                    worker.ready.wait(60)
+
+                slot_ids = [
+                    f"{CLUB}|{datetime.datetime.combine(target_date, parse_court_start_time(text).time()).isoformat()}|90"
+                    for text in candidates[:3]
+                ]
+                start_at = time.time() + 1.0
+                threads = [
+                    threading.Thread(target=competitor, args=(server.base_url, f"bench-{i}", start_at,
+                                                              random.Random(rng.random()), slot_ids))
+                    for i in range(competitors)
+                ]
+                for thread in threads:
+                    thread.start()
+
+                spin_until(start_at)
+                started = time.perf_counter()
+                if workers:
+                    time_text = book_speculatively(booking, candidates, court_times, workers)
+                else:
+                    time_text = booking.book_candidates(candidates, court_times)
+                elapsed = time.perf_counter() - started
+                for thread in threads:
+                    thread.join()
+            finally:
+                stop_holds(booking.holds)
+
+        rank = candidates.index(time_text) if time_text in candidates else None
+        return rank, elapsed, len(server.state.reservations(OUR_USER))
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    trials = int(arg('--trials', 5))
+    competitors = int(arg('--competitors', 6))
+    latency = float(arg('--latency', 0.05))
+    hold_counts = [int(k) for k in arg('--holds', '1,2,3').split(',')]
+
+    # Keep benchmark runs out of the real history, artifacts, catalog and slot policy
+    workdir = tempfile.mkdtemp(prefix="bayclub-speculative-")
+    for name, value in [("BAYCLUB_HISTORY_DB", "history.db"), ("BAYCLUB_ARTIFACT_DIR", "artifacts"),
+                        ("BAYCLUB_CATALOG_PATH", "catalog.json"), ("BAYCLUB_SESSION_DIR", "sessions"),
+                        ("BAYCLUB_ROSTER_PATH", "roster.json"), ("BAYCLUB_POLICY_PATH", "policy.json")]:
+        os.environ[name] = os.path.join(workdir, value)
+    os.environ["BAYCLUB_PARTNER"] = "Partner Player"
+    os.environ["BAYCLUB_CALENDAR_MIRROR"] = "0"
+
+    print(f"{trials} trials, {competitors} competitors for the top 3 court times, "
+          f"{latency * 1000:.0f}ms server latency\n")
+    print(f"{'mode':<14} {'win rate':>9} {'avg rank':>9} {'p50 time':>9} {'max left':>9}")
+    ok = True
+    for holds in hold_counts:
+        ranks, times, leftovers = [], [], []
+        for trial in range(trials):
+            rank, elapsed, left = run_trial(holds, competitors, latency, seed=trial)
+            times.append(elapsed)
+            leftovers.append(left)
+            if rank is not None:
+                ranks.append(rank)
+        mode = "sequential" if holds == 1 else f"speculative K={holds}"
+        avg_rank = f"{statistics.mean(ranks):.1f}" if ranks else "-"
+        print(f"{mode:<14} {len(ranks) / trials:>8.0%} {avg_rank:>9} "
+              f"{statistics.median(times):>8.2f}s {max(leftovers):>9}")
+        ok &= max(leftovers) <= 1
+    if not ok:
+        print("\nA trial left more than one reservation on the account!")
+    return ok
+
+
+if __name__ == "__main__":
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
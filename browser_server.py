@@ -0,0 +1,279 @@
+"""
+Shared warm Chromium that booking processes attach to over CDP
+
+Every app.py / tennisbookapp.py run normally pays for a full Chromium start, and
+jobs that fire close together run a browser each. Instead, run one long-lived
+browser server:
+
+    python3 browser_server.py --port 9300 --max-leases 2
+
+It launches Chromium with a remote debugging port and hands out leases over a
+small HTTP control API. A booking run with BAYCLUB_BROWSER_SERVER=http://127.0.0.1:9300
+leases a slot, attaches with connect_over_cdp, and opens its own context from the
+account's saved session (see bayclub_base.session_state_path), so it starts out
+logged in. The context is closed and the lease returned when the run ends.
+
+What a lease saves is the Chromium start and, while the saved session is valid,
+the login form. Connections, DNS and the HTTP cache are not shared: each lease is
+a new BrowserContext with its own network state, so its first requests to the
+club site cost the same as in a freshly launched browser. The page opened on the
+site at launch only checks that the site is reachable from the server.
+
+Memory stays bounded: at most --max-leases contexts exist at once, leases expire
+after --lease-ttl seconds if a run dies without returning them, and Chromium is
+restarted once idle after --recycle-after leases or when it grows past --max-rss-mb.
+
+Playwright for Python has no launch_server(), so contexts can't be handed across
+processes; each lease gets a fresh context built from the saved session instead.
+
+Control API:
+    POST /lease    {"account": "..."} -> {"lease_id", "cdp_url", "pids"}  (503 when full or restarting)
+    POST /release  {"lease_id": "..."}
+    GET  /status
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import threading
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from memory import browser_tree_rss_mb, child_pids
+
+BROWSER_SERVER = os.environ.get("BAYCLUB_BROWSER_SERVER")
+
+
+class LeaseTable:
+    """Active leases and recycling state, shared between the control threads and the browser thread"""
+
+    def __init__(self, max_leases, lease_ttl, recycle_after, max_rss_mb):
+        self.max_leases = max_leases
+        self.lease_ttl = lease_ttl
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        self.leases = {}          # lease_id -> (account, expires_at)
+        self.served = 0           # leases granted since the browser was (re)launched
+        self.total_served = 0
+        self.cdp_url = None       # None while (re)launching
+        self.needs_recycle = False
+        self.browser_pids = []    # the server's Playwright driver process
+        self.lock = threading.Lock()
+
+    def expire(self):
+        now = time.monotonic()
+        for lease_id, (account, expires_at) in list(self.leases.items()):
+            if expires_at < now:
+                logging.warning(f"Lease {lease_id} for {account} expired without being released")
+                del self.leases[lease_id]
+
+    def acquire(self, account):
+        with self.lock:
+            self.expire()
+            if self.cdp_url is None or self.needs_recycle or len(self.leases) >= self.max_leases:
+                return None
+            lease_id = uuid.uuid4().hex[:12]
+            self.leases[lease_id] = (account, time.monotonic() + self.lease_ttl)
+            self.served += 1
+            self.total_served += 1
+            if self.served >= self.recycle_after:
+                self.needs_recycle = True
+            logging.info(f"Lease {lease_id} -> {account} ({len(self.leases)}/{self.max_leases} in use)")
+            # The Playwright driver Chromium runs under, so clients can sample its memory
+            return {"lease_id": lease_id, "cdp_url": self.cdp_url, "pids": self.browser_pids}
+
+    def release(self, lease_id):
+        with self.lock:
+            lease = self.leases.pop(lease_id, None)
+            if lease:
+                logging.info(f"Lease {lease_id} released by {lease[0]}")
+            return lease is not None
+
+    def idle(self):
+        with self.lock:
+            self.expire()
+            return not self.leases
+
+    def status(self):
+        with self.lock:
+            self.expire()
+            return {
+                "cdp_url": self.cdp_url,
+                "active": len(self.leases),
+                "max_leases": self.max_leases,
+                "served_since_launch": self.served,
+                "total_served": self.total_served,
+                "needs_recycle": self.needs_recycle,
+            }
+
+
+class ControlHandler(BaseHTTPRequestHandler):
+    table = None  # set per server
+
+    def log_message(self, format, *args):
+        logging.debug("browser server: " + format % args)
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/status":
+            self._reply(200, self.table.status())
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path == "/lease":
+            lease = self.table.acquire(self._body().get("account") or "unknown")
+            if lease:
+                self._reply(200, lease)
+            else:
+                self._reply(503, {"error": "no lease available"})
+        elif self.path == "/release":
+            released = self.table.release(self._body().get("lease_id"))
+            self._reply(200 if released else 404, {"released": released})
+        else:
+            self._reply(404, {"error": "not found"})
+
+
+class BrowserServer:
+    """Owns the Chromium process; all Playwright calls stay on the thread that runs serve_forever()"""
+
+    def __init__(self, port=9300, cdp_port=9301, max_leases=2, lease_ttl=900, recycle_after=20,
+                 max_rss_mb=1500, warm_url=None, headless=True, profile=None):
+        from memory import get_profile
+        self.cdp_port = cdp_port
+        self.warm_url = warm_url
+        self.headless = headless
+        self.profile = get_profile(profile)
+        self.table = LeaseTable(max_leases, lease_ttl, recycle_after, max_rss_mb)
+        handler = type("BoundControlHandler", (ControlHandler,), {"table": self.table})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self.playwright = None
+        self.browser = None
+        self._stop = threading.Event()
+
+    def launch(self):
+        # The profile's single-process flags don't mix with several attached clients
+        args = [arg for arg in self.profile["args"] if arg not in ("--single-process", "--no-zygote")]
+        self.browser = self.playwright.chromium.launch(
+            headless=self.headless,
+            args=args + [f"--remote-debugging-port={self.cdp_port}"]
+        )
+        if self.warm_url:
+            try:
+                self.browser.new_page().goto(self.warm_url, timeout=15000)
+            except Exception as e:
+                logging.warning(f"Could not open {self.warm_url}: {e}")
+        with self.table.lock:
+            self.table.cdp_url = f"http://127.0.0.1:{self.cdp_port}"
+            self.table.served = 0
+            self.table.needs_recycle = False
+        logging.info(f"✓ Chromium ready at {self.table.cdp_url}")
+
+    def recycle(self, reason):
+        logging.info(f"Restarting Chromium ({reason})")
+        with self.table.lock:
+            self.table.cdp_url = None
+        self.browser.close()
+        self.launch()
+
+    def serve_forever(self):
+        from playwright.sync_api import sync_playwright
+
+        before = child_pids()
+        self.playwright = sync_playwright().start()
+        self.table.browser_pids = sorted(child_pids() - before)
+        self.launch()
+        threading.Thread(target=self.httpd.serve_forever, name="browser-control", daemon=True).start()
+        logging.info(f"Browser server control API at http://127.0.0.1:{self.httpd.server_address[1]}")
+        try:
+            while not self._stop.wait(1.0):
+                if not self.table.idle():
+                    continue
+                if self.table.needs_recycle:
+                    self.recycle(f"{self.table.served} leases served")
+                elif browser_tree_rss_mb() > self.table.max_rss_mb:
+                    self.recycle(f"browser RSS over {self.table.max_rss_mb} MB")
+        finally:
+            self.httpd.shutdown()
+            self.browser.close()
+            self.playwright.stop()
+
+    def stop(self):
+        self._stop.set()
+
+
+class BrowserLease:
+    """Client side: lease a slot on a running browser server"""
+
+    def __init__(self, control_url=None):
+        self.control_url = (control_url or BROWSER_SERVER).rstrip("/")
+        self.lease_id = None
+        self.cdp_url = None
+        self.pids = []
+
+    def acquire(self, account, timeout=60):
+        """Wait up to timeout seconds for a free slot; returns the CDP URL"""
+        deadline = time.monotonic() + timeout
+        while True:
+            response = requests.post(f"{self.control_url}/lease", json={"account": account}, timeout=5)
+            if response.status_code == 200:
+                lease = response.json()
+                self.lease_id, self.cdp_url = lease["lease_id"], lease["cdp_url"]
+                self.pids = lease.get("pids", [])
+                return self.cdp_url
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"No browser lease available from {self.control_url} after {timeout}s")
+            time.sleep(0.5)
+
+    def release(self):
+        if not self.lease_id:
+            return
+        try:
+            requests.post(f"{self.control_url}/release", json={"lease_id": self.lease_id}, timeout=5)
+        except requests.RequestException as e:
+            # The lease expires on its own
+            logging.warning(f"Could not release browser lease {self.lease_id}: {e}")
+        self.lease_id = None
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    from bayclub_base import DASHBOARD_URL
+    server = BrowserServer(
+        port=int(arg('--port', 9300)),
+        cdp_port=int(arg('--cdp-port', 9301)),
+        max_leases=int(arg('--max-leases', 2)),
+        lease_ttl=float(arg('--lease-ttl', 900)),
+        recycle_after=int(arg('--recycle-after', 20)),
+        max_rss_mb=float(arg('--max-rss-mb', 1500)),
+        warm_url=DASHBOARD_URL,
+        headless='--headed' not in argv,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s',
+        datefmt='%d-%b-%y %H:%M:%S'
+    )
+    main(sys.argv[1:])
@@ -0,0 +1,241 @@
+"""
+Local mirror of the Google Calendar, kept current with incremental sync
+
+Instead of listing a day's events from the API on every call, events are kept in
+SQLite (~/.cache/bayclub/calendar.db). The first sync lists everything from
+SYNC_WINDOW_DAYS ago onwards and stores the nextSyncToken; after that, each sync
+only fetches the changes since the last one (new, edited and deleted events).
+A 410 Gone (token expired) clears the mirror and does a full sync again.
+
+Queries for any date range are answered from an indexed table and return events
+in the API's own shape, so availability.AvailabilityMask.add_events works as-is.
+Deleted events arrive as little more than an id, so the last copy of each is
+kept in a separate table for policy.py, which learns from cancellations.
+
+Usage:
+    python3 calendar_mirror.py sync
+    python3 calendar_mirror.py events 2026-10-24 [2026-10-25]
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import datetime
+import logging
+from availability import CLUB_TZ, parse_event_time
+
+MIRROR_DB = os.environ.get(
+    "BAYCLUB_CALENDAR_DB",
+    os.path.expanduser("~/.cache/bayclub/calendar.db")
+)
+SYNC_WINDOW_DAYS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    start_ts INTEGER,
+    end_ts INTEGER,
+    body TEXT
+);
+CREATE INDEX IF NOT EXISTS events_start ON events(start_ts, end_ts);
+CREATE TABLE IF NOT EXISTS cancelled (
+    id TEXT PRIMARY KEY,
+    start_ts INTEGER,
+    end_ts INTEGER,
+    body TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def event_bounds(event):
+    """(start, end) epoch seconds; all-day events span their local days"""
+    start, end = event.get("start", {}), event.get("end", {})
+    if "dateTime" in start:
+        return (int(parse_event_time(start["dateTime"]).timestamp()),
+                int(parse_event_time(end["dateTime"]).timestamp()))
+    if "date" in start:
+        first = datetime.datetime.combine(datetime.date.fromisoformat(start["date"]), datetime.time.min, tzinfo=CLUB_TZ)
+        last = datetime.datetime.combine(datetime.date.fromisoformat(end["date"]), datetime.time.min, tzinfo=CLUB_TZ)
+        return int(first.timestamp()), int(last.timestamp())
+    return None
+
+
+def is_sync_token_expired(error):
+    """The Calendar API answers 410 Gone when a sync token can no longer be used"""
+    return getattr(getattr(error, "resp", None), "status", None) == 410
+
+
+class CalendarMirror:
+    """SQLite mirror of one calendar"""
+
+    def __init__(self, path=MIRROR_DB, calendar_id="primary"):
+        self.path = path
+        self.calendar_id = calendar_id
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=10)
+        self.conn.executescript(SCHEMA)
+        self.synced = False
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def _apply(self, events):
+        upserts, deletes = [], []
+        for event in events:
+            bounds = event_bounds(event)
+            if event.get("status") == "cancelled" or bounds is None:
+                deletes.append((event["id"],))
+            else:
+                upserts.append((event["id"], *bounds, json.dumps(event)))
+        # Keep the last full copy of deleted events, which the API won't send again
+        self.conn.executemany("INSERT OR REPLACE INTO cancelled SELECT * FROM events WHERE id = ?", deletes)
+        self.conn.executemany("DELETE FROM events WHERE id = ?", deletes)
+        self.conn.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?)", upserts)
+        return len(upserts), len(deletes)
+
+    def _list_pages(self, service, **params):
+        """Yield each page of an events().list call, following nextPageToken"""
+        page_token = None
+        while True:
+            page = service.events().list(
+                calendarId=self.calendar_id, singleEvents=True, maxResults=2500, pageToken=page_token, **params
+            ).execute()
+            yield page
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return
+
+    def sync(self, service):
+        """Bring the mirror up to date: deltas if there is a sync token, otherwise a full listing
+
+        Returns:
+            tuple: (events added or changed, events removed, full resync?)
+        """
+        token = self._meta("sync_token")
+        full = token is None
+        try:
+            changed, removed = self._sync_pages(service, token)
+        except Exception as e:
+            if not is_sync_token_expired(e):
+                raise
+            logging.info("Calendar sync token expired, resyncing from scratch")
+            full = True
+            changed, removed = self._sync_pages(service, None)
+        self.synced = True
+        logging.info(f"✓ Calendar mirror {'full' if full else 'incremental'} sync: "
+                     f"{changed} changed, {removed} removed")
+        return changed, removed, full
+
+    def _sync_pages(self, service, token):
+        if token:
+            params = {"syncToken": token}
+        else:
+            since = datetime.datetime.now(CLUB_TZ) - datetime.timedelta(days=SYNC_WINDOW_DAYS)
+            params = {"timeMin": since.isoformat()}
+
+        changed = removed = 0
+        # Nothing is committed until the last page arrives, so a failed sync leaves the mirror as it was
+        with self.conn:
+            if not token:
+                self.conn.execute("DELETE FROM events")
+            for page in self._list_pages(service, **params):
+                page_changed, page_removed = self._apply(page.get("items", []))
+                changed += page_changed
+                removed += page_removed
+                if page.get("nextSyncToken"):
+                    self._set_meta("sync_token", page["nextSyncToken"])
+                    self._set_meta("synced_at", datetime.datetime.now(CLUB_TZ).isoformat(timespec="seconds"))
+        return changed, removed
+
+    def ensure_synced(self, service):
+        """Sync once per mirror instance (i.e. once per booking run); failures leave the last copy
+
+        Returns:
+            bool: False if the mirror has never completed a sync and can't be used
+        """
+        if not self.synced:
+            try:
+                self.sync(service)
+            except Exception as e:
+                logging.warning(f"Calendar sync failed, using the mirror as of {self._meta('synced_at')}: {e}")
+                self.synced = True
+        return self._meta("sync_token") is not None
+
+    def events_between(self, start, end):
+        """Events overlapping [start, end) (aware datetimes), ordered by start time"""
+        rows = self.conn.execute(
+            "SELECT body FROM events WHERE start_ts < ? AND end_ts > ? ORDER BY start_ts",
+            (int(end.timestamp()), int(start.timestamp()))
+        ).fetchall()
+        return [json.loads(body) for body, in rows]
+
+    def events_on(self, first_date, last_date=None):
+        """Events on the local days first_date through last_date"""
+        last_date = last_date or first_date
+        start = datetime.datetime.combine(first_date, datetime.time.min, tzinfo=CLUB_TZ)
+        end = datetime.datetime.combine(last_date + datetime.timedelta(days=1), datetime.time.min, tzinfo=CLUB_TZ)
+        return self.events_between(start, end)
+
+    def cancelled_between(self, start, end):
+        """Deleted events that started in [start, end), as stored before deletion, with status "cancelled" """
+        rows = self.conn.execute(
+            "SELECT body FROM cancelled WHERE start_ts >= ? AND start_ts < ? ORDER BY start_ts",
+            (int(start.timestamp()), int(end.timestamp()))
+        ).fetchall()
+        return [{**json.loads(body), "status": "cancelled"} for body, in rows]
+
+    def stored_events(self, ids):
+        """{id: event} for the given ids, live or deleted, from the last copies seen"""
+        ids, stored = set(ids), {}
+        for table in ("cancelled", "events"):
+            for event_id, body in self.conn.execute(f"SELECT id, body FROM {table}").fetchall():
+                if event_id in ids:
+                    stored[event_id] = json.loads(body)
+        return stored
+
+    def close(self):
+        self.conn.close()
+
+
+def main(argv):
+    mirror = CalendarMirror()
+    if argv and argv[0] == "sync":
+        from bayclub_base import build_calendar_service
+        service = build_calendar_service()
+        if not service:
+            return False
+        mirror.sync(service)
+    elif argv and argv[0] == "events" and len(argv) > 1:
+        first = datetime.date.fromisoformat(argv[1])
+        last = datetime.date.fromisoformat(argv[2]) if len(argv) > 2 else first
+        started = time.perf_counter()
+        events = mirror.events_on(first, last)
+        elapsed = (time.perf_counter() - started) * 1e6
+        for event in events:
+            when = event["start"].get("dateTime", event["start"].get("date"))
+            print(f"{when:<26} {event.get('summary', '(no title)')}")
+        print(f"{len(events)} events in {elapsed:.0f}µs (synced {mirror._meta('synced_at') or 'never'})")
+    else:
+        print(__doc__)
+        return False
+    mirror.close()
+    return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s',
+        datefmt='%d-%b-%y %H:%M:%S'
+    )
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
@@ -0,0 +1,135 @@
+"""
+Cached catalog of clubs and activity schedule pages
+
+The club context modal is slow to drive (open, pick a radio, save, then click
+through Schedule Activity), so the schedule page URL reached for each
+(club, activity) pair is cached here. BayClubBookingBase.goto_activity jumps
+straight to the cached URL and falls back to the modal when the entry is
+missing, too old, or doesn't load.
+
+The club is session state that the URL doesn't carry: the page opens for
+whichever club the account last picked. The catalog therefore also remembers
+each account's selected club. The cached URL is only used when the session
+is already on the wanted club. Otherwise the modal switches clubs, and the
+entry is kept, so accounts that alternate clubs don't evict it.
+
+Every successful trip through the modal records its URL, and a background
+discovery run refreshes all clubs at once:
+
+    python3 catalog.py --discover
+
+e.g. from cron once a day:
+    0 3 * * * cd /bayclub-schedule-ignite && python3 catalog.py --discover >> /tmp/bayclub.log 2>&1
+"""
+import os
+import sys
+import json
+import time
+import datetime
+import logging
+
+CATALOG_PATH = os.environ.get(
+    "BAYCLUB_CATALOG_PATH",
+    os.path.expanduser("~/.cache/bayclub/catalog.json")
+)
+# Entries older than this are treated as stale and the modal is used instead
+MAX_AGE = datetime.timedelta(days=7)
+
+
+def load_catalog(path=CATALOG_PATH):
+    """Load the catalog from disk, returning an empty catalog if missing or unreadable"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"clubs": {}, "sessions": {}}
+    except Exception as e:
+        logging.warning(f"Could not read club catalog {path}: {e}")
+        return {"clubs": {}, "sessions": {}}
+
+
+def save_catalog(catalog, path=CATALOG_PATH):
+    """Write the catalog atomically so a concurrent run never reads a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(catalog, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def lookup(club, activity, max_age=MAX_AGE, path=CATALOG_PATH):
+    """Return the cached schedule URL for (club, activity), or None if missing or stale"""
+    entry = load_catalog(path)["clubs"].get(club, {}).get("activities", {}).get(activity)
+    if not entry:
+        return None
+
+    discovered_at = datetime.datetime.fromisoformat(entry["discovered_at"])
+    if datetime.datetime.now() - discovered_at > max_age:
+        logging.info(f"Catalog entry for {club}/{activity} is stale ({discovered_at:%Y-%m-%d})")
+        return None
+
+    return entry["url"]
+
+
+def record(club, activity, url, path=CATALOG_PATH):
+    """Store the schedule URL reached for (club, activity)"""
+    catalog = load_catalog(path)
+    club_entry = catalog["clubs"].setdefault(club, {"activities": {}})
+    club_entry["activities"][activity] = {
+        "url": url,
+        "discovered_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    save_catalog(catalog, path)
+    logging.info(f"Catalog updated: {club}/{activity} -> {url}")
+
+
+def invalidate(club, activity, path=CATALOG_PATH):
+    """Drop a single entry after it failed the stale-cache check"""
+    catalog = load_catalog(path)
+    activities = catalog["clubs"].get(club, {}).get("activities", {})
+    if activities.pop(activity, None):
+        save_catalog(catalog, path)
+        logging.info(f"Catalog entry for {club}/{activity} invalidated")
+
+
+def session_club(account, path=CATALOG_PATH):
+    """The club an account's saved session was last switched to, or None if unknown"""
+    return load_catalog(path).get("sessions", {}).get(account or "")
+
+
+def record_session_club(account, club, path=CATALOG_PATH):
+    """Remember the club an account's session is on after the modal or a page showed it"""
+    catalog = load_catalog(path)
+    sessions = catalog.setdefault("sessions", {})
+    if sessions.get(account or "") != club:
+        sessions[account or ""] = club
+        save_catalog(catalog, path)
+
+
+def discover(headless=True):
+    """Walk every known club and activity through the modal and record the resulting URLs"""
+    from bayclub_base import BayClubBookingBase, CLUBS, ACTIVITY_BUTTONS
+
+    with BayClubBookingBase(headless=headless) as booking:
+        booking.login()
+        for club in CLUBS:
+            for activity in ACTIVITY_BUTTONS:
+                try:
+                    booking.page.goto(booking.dashboard_url, timeout=10000)
+                    time.sleep(3)
+                    booking.select_club(club)
+                    booking.open_activity(activity)
+                except Exception as e:
+                    logging.error(f"Discovery failed for {club}/{activity}: {e}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s',
+        datefmt='%d-%b-%y %H:%M:%S'
+    )
+    if '--discover' in sys.argv:
+        discover(headless='--headed' not in sys.argv)
+    else:
+        print(json.dumps(load_catalog(), indent=2, sort_keys=True))
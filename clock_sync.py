@@ -0,0 +1,225 @@
+"""
+Server clock offset estimation and release-time triggering
+
+Cron starts the scripts by the droplet's clock, but classes and courts open by
+Bay Club's clock. ClockSync estimates the difference (offset = server - local)
+and the round trip to the server, then fires at a given *server* time. It sends
+a few HEAD requests for a static asset (/favicon.ico, override with
+BAYCLUB_CLOCK_PATH) over the shared keep-alive connection and reads the time on
+each response, so the server never renders a page for it.
+
+- An exact timestamp header (X-Server-Time, epoch seconds), when the server sends
+  one, is used NTP-style: offset = server time - midpoint of the request, taken
+  from the probe with the shortest round trip.
+- Otherwise the Date header is used. It only has one-second resolution, so each
+  probe only bounds the offset: the server read D at some local instant between
+  sending and receiving, so D - received <= offset < D + 1 - sent. The bounds
+  of all probes are intersected. Each later probe is timed to reach the server
+  just as the estimated server second ticks over, which roughly halves the
+  interval per probe. Eight probes get within a few milliseconds plus half the
+  round trip. Because each probe waits for a second boundary, this takes a few seconds.
+
+wait_until(T) sleeps and then spins on the monotonic clock until the request
+sent next will reach the server no earlier than server time T. It errs late by
+the remaining uncertainty rather than early. wait_for(T) measures the offset
+again shortly before T; an estimate from an earlier sync() (e.g. on a thread
+while the browser logs in) is reused when T is closer than that, and a T that
+has already passed returns at once.
+
+Usage:
+    python3 clock_sync.py [URL] [--probes 8]      # print the offset estimate (default: the Bay Club site)
+"""
+import os
+import sys
+import time
+import logging
+import datetime
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from http_client import get_client
+
+TIMESTAMP_HEADER = "X-Server-Time"
+CLOCK_PROBES = int(os.environ.get("BAYCLUB_CLOCK_PROBES", "8"))
+# Probed with HEAD: any static file works, only the response headers are read
+CLOCK_PATH = os.environ.get("BAYCLUB_CLOCK_PATH", "/favicon.ico")
+# Start waiting for a release this long ahead; the offset is measured again just before
+RESYNC_BEFORE = float(os.environ.get("BAYCLUB_RESYNC_BEFORE", "30"))
+# Spin (instead of sleeping) for the last few milliseconds before firing
+SPIN_SECONDS = 0.005
+
+
+@dataclass(frozen=True)
+class Probe:
+    sent: float           # local epoch seconds
+    received: float
+    date: float = None    # Date header, whole epoch seconds
+    server: float = None  # exact timestamp header, epoch seconds
+
+    @property
+    def rtt(self):
+        return self.received - self.sent
+
+
+@dataclass(frozen=True)
+class ClockEstimate:
+    offset: float         # server - local, seconds
+    uncertainty: float    # the offset is within +/- this
+    rtt: float            # shortest round trip seen
+    source: str           # "timestamp" or "date"
+    probes: int
+
+    @property
+    def text(self):
+        return (f"offset {self.offset * 1000:+.1f}ms ±{self.uncertainty * 1000:.1f}ms, "
+                f"rtt {self.rtt * 1000:.1f}ms ({self.probes} probes, {self.source})")
+
+
+def estimate(probes):
+    """Offset estimate from a list of probes; None if none carried a usable time"""
+    timed = [p for p in probes if p.server is not None]
+    if timed:
+        best = min(timed, key=lambda p: p.rtt)
+        offset = best.server - (best.sent + best.received) / 2
+        return ClockEstimate(offset, best.rtt / 2, best.rtt, "timestamp", len(timed))
+
+    dated = [p for p in probes if p.date is not None]
+    if not dated:
+        return None
+    low = max(p.date - p.received for p in dated)
+    high = min(p.date + 1 - p.sent for p in dated)
+    rtt = min(p.rtt for p in dated)
+    if low > high:
+        # Inconsistent bounds (the server rounds its Date, or routes changed): trust the fastest probe
+        best = min(dated, key=lambda p: p.rtt)
+        return ClockEstimate(best.date + 0.5 - (best.sent + best.received) / 2, 0.5 + best.rtt / 2, rtt, "date",
+                             len(dated))
+    return ClockEstimate((low + high) / 2, (high - low) / 2, rtt, "date", len(dated))
+
+
+def sleep_until_local(epoch):
+    """Sleep most of the way to a local epoch time, then spin on perf_counter for the rest"""
+    deadline = time.perf_counter() + (epoch - time.time())
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return
+        if remaining > SPIN_SECONDS:
+            time.sleep(remaining - SPIN_SECONDS)
+
+
+class ClockSync:
+    """Offset between the local clock and a server's, and a scheduler that fires at server time"""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+        self.probes = []
+        self.estimate = None
+
+    def probe(self):
+        sent = time.time()
+        response = get_client().request("HEAD", self.url, timeout=self.timeout, allow_redirects=False)
+        received = time.time()
+        date = response.headers.get("Date")
+        stamp = response.headers.get(TIMESTAMP_HEADER)
+        probe = Probe(
+            sent, received,
+            date=parsedate_to_datetime(date).timestamp() if date else None,
+            server=float(stamp) if stamp else None,
+        )
+        self.probes.append(probe)
+        return probe
+
+    def sync(self, probes=CLOCK_PROBES):
+        """Probe the server and (re)estimate the offset
+
+        Returns:
+            ClockEstimate, or None if the server sent no usable time
+        """
+        self.probes = []
+        self.probe()
+        for _ in range(probes - 1):
+            current = estimate(self.probes)
+            if current is None:
+                break
+            if current.source == "date" and current.uncertainty > current.rtt / 2:
+                # Aim the next request at the next server second boundary, as far as we know where it is
+                server_now = time.time() + current.offset
+                boundary = int(server_now) + 1
+                sleep_until_local(boundary - current.offset - current.rtt / 2)
+            self.probe()
+        self.estimate = estimate(self.probes)
+        if self.estimate:
+            logging.info(f"✓ Server clock: {self.estimate.text}")
+        else:
+            logging.warning(f"{self.url} sent no Date or {TIMESTAMP_HEADER} header; using the local clock")
+        return self.estimate
+
+    def server_now(self):
+        return time.time() + (self.estimate.offset if self.estimate else 0)
+
+    def wait_until(self, server_epoch, arrive=True):
+        """Block until server_epoch on the server's clock
+
+        With arrive, returns early by half a round trip so that a request sent right
+        away reaches the server at server_epoch. Uncertainty is always added, so the
+        request may arrive late but never early.
+
+        Returns:
+            float: local epoch time it returned at
+        """
+        if self.estimate:
+            lead = self.estimate.rtt / 2 if arrive else 0
+            local = server_epoch - self.estimate.offset + self.estimate.uncertainty - lead
+        else:
+            local = server_epoch
+        sleep_until_local(local)
+        return time.time()
+
+    def wait_for(self, release_at, resync_before=RESYNC_BEFORE, arrive=True):
+        """Wait for an aware release datetime by the server's clock, measuring the offset again shortly before
+
+        Closer than resync_before, an earlier estimate is reused; without one, only as many
+        probes are sent as there are seconds left. A release already past returns at once.
+        """
+        release_epoch = release_at.timestamp()
+        remaining = release_epoch - self.server_now()
+        if remaining <= 0:
+            return time.time()
+        if remaining > resync_before:
+            sleep_until_local(release_epoch - resync_before - (self.estimate.offset if self.estimate else 0))
+            self.sync()
+        elif self.estimate is None:
+            # Date probes can each wait for a server second boundary
+            self.sync(max(1, min(CLOCK_PROBES, int(remaining))))
+        remaining = release_epoch - self.server_now()
+        if remaining > 0:
+            logging.info(f"Waiting {remaining:.3f}s for release at {release_at:%H:%M:%S} server time")
+        return self.wait_until(release_epoch, arrive=arrive)
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    from bayclub_base import BASE_URL
+
+    url = argv[0] if argv and not argv[0].startswith("-") else f"{BASE_URL}{CLOCK_PATH}"
+    clock = ClockSync(url)
+    result = clock.sync(int(arg('--probes', CLOCK_PROBES)))
+    if not result:
+        return False
+    server_now = datetime.datetime.fromtimestamp(clock.server_now()).astimezone()
+    print(f"{url}: {result.text}")
+    print(f"server time now: {server_now:%H:%M:%S.%f}")
+    return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s',
+        datefmt='%d-%b-%y %H:%M:%S'
+    )
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
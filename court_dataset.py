@@ -0,0 +1,280 @@
+"""
+Court availability history as an append-only Parquet dataset
+
+A booking run only keeps the court times it could book on the day it wants.
+To see when courts open up and how fast they fill, `scrape` walks the date
+slider for a club and records the whole slot grid, one row per slot: when it
+was seen, club, date, start, duration, court (when the app lists courts
+separately), whether it was available and how many courts were left. It runs
+every few minutes from cron.
+
+Each scrape appends one Parquet file under month=YYYY-MM/ in the dataset
+directory (~/.cache/bayclub/courts, override with BAYCLUB_COURT_DATASET).
+Strings are dictionary-encoded and times are small integers, so a slot row
+takes a few bytes. `compact` merges a finished month's files into one.
+
+fill_percentiles() reads only the columns it needs, with the date filter pushed
+down to the Parquet row groups. It works out, for every slot instance, when it
+was first seen open and when it was first seen full, and returns percentiles
+per club, weekday, start and duration:
+- how many hours before the start the slot filled;
+- how many minutes it stayed open.
+All of this is Arrow compute, with no Python loop over rows.
+
+Needs pyarrow, which the booking scripts don't (pip install pyarrow).
+
+Usage:
+    python3 court_dataset.py scrape [--club Gateway] [--days 7]
+    python3 court_dataset.py fill [--club Gateway] [--since 2026-07-01] [--until 2026-10-01]
+    python3 court_dataset.py compact [--before 2026-10]
+"""
+import os
+import sys
+import glob
+import logging
+import datetime
+from availability import CLUB_TZ
+from ledger import parse_start
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+DATASET_DIR = os.environ.get(
+    "BAYCLUB_COURT_DATASET",
+    os.path.expanduser("~/.cache/bayclub/courts")
+)
+SLOT_KEY = ["club", "date", "start_minute", "duration", "court"]
+QUANTILES = (0.1, 0.5, 0.9)
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("The court dataset needs pyarrow: pip install pyarrow")
+
+
+def dataset_schema():
+    require_pyarrow()
+    return pa.schema([
+        ("snapshot_at", pa.timestamp("s", tz="UTC")),
+        ("club", pa.dictionary(pa.int8(), pa.string())),
+        ("date", pa.date32()),
+        ("start_minute", pa.int16()),     # minutes after midnight, club time
+        ("duration", pa.int16()),         # minutes
+        ("court", pa.dictionary(pa.int16(), pa.string())),
+        ("available", pa.bool_()),
+        ("courts_left", pa.int8()),
+    ])
+
+
+def slot_rows(club, date, slots, snapshot_at, duration=90):
+    """Dataset rows for the CourtSlot records of one club and day"""
+    rows = []
+    for slot in slots:
+        start = parse_start(slot.start) or parse_start(slot.label or "")
+        if start is None:
+            continue
+        rows.append({
+            "snapshot_at": snapshot_at,
+            "club": club,
+            "date": date,
+            "start_minute": start.hour * 60 + start.minute,
+            "duration": int(slot.duration or duration),
+            "court": str(slot.court) if slot.court is not None else None,
+            "available": slot.available,
+            "courts_left": slot.courts_left,
+        })
+    return rows
+
+
+def append(rows, path=DATASET_DIR):
+    """Write rows as a new Parquet file in the current month's partition; returns its path"""
+    require_pyarrow()
+    if not rows:
+        return None
+    table = pa.Table.from_pylist(rows, schema=dataset_schema())
+    snapshot_at = min(row["snapshot_at"] for row in rows)
+    directory = os.path.join(path, f"month={snapshot_at:%Y-%m}")
+    os.makedirs(directory, exist_ok=True)
+    file_path = os.path.join(directory, f"{snapshot_at:%Y%m%dT%H%M%S}-{os.getpid()}.parquet")
+    # Write under a name the dataset doesn't read, then rename, so readers never see half a file
+    tmp_path = f"{file_path}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, file_path)
+    logging.info(f"✓ Recorded {len(rows)} court slots in {file_path}")
+    return file_path
+
+
+def compact(before=None, path=DATASET_DIR):
+    """Merge each month partition before `before` (YYYY-MM, default this month) into one file"""
+    require_pyarrow()
+    before = before or datetime.date.today().strftime("%Y-%m")
+    for directory in sorted(glob.glob(os.path.join(path, "month=*"))):
+        month = os.path.basename(directory).split("=", 1)[1]
+        files = sorted(glob.glob(os.path.join(directory, "*.parquet")))
+        if month >= before or len(files) < 2:
+            continue
+        table = pa.concat_tables(pq.read_table(f, schema=dataset_schema()) for f in files)
+        table = table.sort_by([("snapshot_at", "ascending")])
+        merged = os.path.join(directory, f"{month}-compacted.parquet")
+        pq.write_table(table, f"{merged}.tmp", compression="zstd", row_group_size=256 * 1024)
+        os.replace(f"{merged}.tmp", merged)
+        for f in files:
+            if f != merged:
+                os.remove(f)
+        logging.info(f"✓ Compacted {len(files)} files of {month} ({table.num_rows} rows)")
+
+
+def open_dataset(path=DATASET_DIR):
+    require_pyarrow()
+    return ds.dataset(path, format="parquet", partitioning="hive", schema=dataset_schema().append(
+        pa.field("month", pa.string())))
+
+
+def fill_times(path=DATASET_DIR, club=None, since=None, until=None):
+    """One row per slot instance that was seen open: when it opened, and when it filled (null if it didn't)"""
+    dataset = open_dataset(path)
+    condition = None
+    for part in (
+        ds.field("club") == club if club else None,
+        ds.field("date") >= since if since else None,
+        ds.field("date") < until if until else None,
+    ):
+        if part is not None:
+            condition = part if condition is None else condition & part
+    table = dataset.to_table(columns=["snapshot_at", "available"] + SLOT_KEY, filter=condition)
+    # Plain strings (and no null courts) so the slot key can be grouped and joined on
+    table = table.set_column(table.schema.get_field_index("club"), "club", table["club"].cast(pa.string()))
+    table = table.set_column(table.schema.get_field_index("court"), "court",
+                             pc.fill_null(table["court"].cast(pa.string()), ""))
+
+    opened = (table.filter(table["available"])
+              .group_by(SLOT_KEY).aggregate([("snapshot_at", "min")])
+              .rename_columns(SLOT_KEY + ["opened_at"]))
+    full = table.filter(pc.invert(table["available"])).select(SLOT_KEY + ["snapshot_at"])
+    after = full.join(opened, keys=SLOT_KEY, join_type="inner")
+    after = after.filter(pc.greater(after["snapshot_at"], after["opened_at"]))
+    filled = (after.group_by(SLOT_KEY).aggregate([("snapshot_at", "min")])
+              .rename_columns(SLOT_KEY + ["filled_at"]))
+    return opened.join(filled, keys=SLOT_KEY, join_type="left outer")
+
+
+def fill_percentiles(path=DATASET_DIR, club=None, since=None, until=None, quantiles=QUANTILES):
+    """Fill-time percentiles per club, weekday, start and duration
+
+    Returns:
+        pyarrow.Table: club, weekday (Monday = 0), start ("10:00 AM"), duration, opened
+        (slot instances seen open), filled, then lead_p<q> (hours before the start
+        that it filled) and open_p<q> (minutes it stayed open) for each quantile
+    """
+    slots = fill_times(path, club, since, until)
+    start_local = pc.add(slots["date"].cast(pa.timestamp("s")),
+                         pc.multiply(slots["start_minute"].cast(pa.int64()), 60).cast(pa.duration("s")))
+    starts = pc.assume_timezone(start_local, str(CLUB_TZ), ambiguous="earliest", nonexistent="earliest")
+    seconds = pa.duration("s")
+    lead_hours = pc.divide(pc.subtract(starts, slots["filled_at"]).cast(seconds).cast(pa.int64()).cast(pa.float64()), 3600)
+    open_minutes = pc.divide(
+        pc.subtract(slots["filled_at"], slots["opened_at"]).cast(seconds).cast(pa.int64()).cast(pa.float64()), 60)
+    slots = (slots.append_column("weekday", pc.day_of_week(slots["date"]))
+             .append_column("lead_hours", lead_hours)
+             .append_column("open_minutes", open_minutes))
+
+    digest = pc.TDigestOptions(q=list(quantiles), skip_nulls=True)
+    group = ["club", "weekday", "start_minute", "duration"]
+    stats = slots.group_by(group).aggregate([
+        ("opened_at", "count"),
+        ("filled_at", "count"),
+        ("lead_hours", "tdigest", digest),
+        ("open_minutes", "tdigest", digest),
+    ]).sort_by([(name, "ascending") for name in group])
+
+    columns = {
+        "club": stats["club"],
+        "weekday": stats["weekday"],
+        "start": pa.array([f"{m // 60 % 12 or 12}:{m % 60:02d} {'AM' if m < 720 else 'PM'}"
+                           for m in stats["start_minute"].to_pylist()]),
+        "duration": stats["duration"],
+        "opened": stats["opened_at_count"],
+        "filled": stats["filled_at_count"],
+    }
+    for prefix, name in (("lead", "lead_hours_tdigest"), ("open", "open_minutes_tdigest")):
+        for i, q in enumerate(quantiles):
+            columns[f"{prefix}_p{round(q * 100)}"] = pc.list_element(stats[name], i)
+    return pa.table(columns)
+
+
+def scrape(club="Gateway", days=7, path=DATASET_DIR, headless=True):
+    """Record the court slot grid of the next `days` days at one club
+
+    Returns:
+        int: slot rows recorded
+    """
+    from tennisbookapp import BayClubTennisBooking
+
+    require_pyarrow()
+    today = datetime.datetime.now(CLUB_TZ).date()
+    rows = []
+    with BayClubTennisBooking(headless=headless) as booking:
+        booking.run.target = f"scrape {club} {days}d"
+        with booking.step("login"):
+            booking.login()
+        with booking.step("select_location"):
+            booking.select_location(club)
+        for offset in range(days):
+            date = today + datetime.timedelta(days=offset)
+            with booking.step("select_day"):
+                if not booking.select_date(date):
+                    continue
+            slots = booking.feed.wait(booking.page, "courts", timeout=10)
+            if slots is None:
+                logging.warning(f"No court slot data for {date}; is BAYCLUB_SLOT_FEED off?")
+                continue
+            snapshot_at = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+            rows.extend(slot_rows(club, date, slots, snapshot_at))
+        booking.run.outcome = "scraped" if rows else "no_slots"
+    append(rows, path)
+    return len(rows)
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    def date_arg(name):
+        value = arg(name, None)
+        return datetime.date.fromisoformat(value) if value else None
+
+    command = argv[0] if argv else None
+    if command == "scrape":
+        return scrape(arg('--club', "Gateway"), int(arg('--days', 7)), headless='--headed' not in argv) > 0
+    if command == "compact":
+        compact(arg('--before', None))
+        return True
+    if command == "fill":
+        table = fill_percentiles(club=arg('--club', None), since=date_arg('--since'), until=date_arg('--until'))
+        weekdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+        print(f"{'club':<14} {'day':<4} {'start':>8} {'min':>4} {'filled':>9} "
+              f"{'lead p10/p50/p90 (h)':>22} {'open p50 (min)':>15}")
+        for row in table.to_pylist():
+            leads = "/".join(f"{row[f'lead_p{round(q * 100)}']:.1f}" if row[f'lead_p{round(q * 100)}'] is not None
+                             else "-" for q in QUANTILES)
+            open_p50 = f"{row['open_p50']:.0f}" if row["open_p50"] is not None else "-"
+            print(f"{row['club']:<14} {weekdays[row['weekday']]:<4} {row['start']:>8} {row['duration']:>4} "
+                  f"{row['filled']:>4}/{row['opened']:<4} {leads:>22} {open_p50:>15}")
+        return True
+    print(__doc__)
+    return False
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s',
+        datefmt='%d-%b-%y %H:%M:%S'
+    )
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
@@ -0,0 +1,201 @@
+"""
+Run booking jobs for several members across several clubs with a bounded worker pool
+
+Jobs are described in a JSON config:
+
+    {
+        "max_contexts": 2,
+        "accounts": {
+            "liz": {"username_env": "LIZ_BAYCLUB_USERNAME", "password_env": "LIZ_BAYCLUB_PASSWORD"}
+        },
+        "jobs": [
+            {"account": "liz", "club": "San Francisco", "activity": "ignite",
+             "day": "We", "time": "5:30 PM", "release_at": "2026-10-20T00:01:00"},
+            {"account": "liz", "club": "Gateway", "activity": "tennis",
+             "day": "Friday", "time": "10:00 AM"}
+        ]
+    }
+
+Credentials are never stored in the config, only the names of the environment
+variables that hold them. Jobs sharing the same release_at are started together.
+
+Usage: python3 fleet.py jobs.json [--max-contexts N]
+"""
+import os
+import sys
+import json
+import time
+import datetime
+import logging
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from bayclub_base import CLUBS, CLOCK_URL
+from clock_sync import ClockSync
+from jobspec import ACTIVITIES, plan_for_day, execute
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(threadName)s - %(message)s',
+    datefmt='%d-%b-%y %H:%M:%S'
+)
+
+
+@dataclass(frozen=True)
+class Account:
+    name: str
+    username: str
+    password: str
+
+
+@dataclass(frozen=True)
+class BookingJob:
+    account: str
+    club: str
+    activity: str
+    day: str
+    time: str = None
+    release_at: datetime.datetime = None
+
+    @property
+    def label(self):
+        return f"{self.account}/{self.club}/{self.activity}/{self.day} {self.time or ''}".strip()
+
+
+@dataclass
+class JobResult:
+    job: BookingJob
+    success: bool
+    error: str = None
+    started_at: datetime.datetime = None
+    duration: float = 0.0
+
+
+def load_config(path):
+    """Load accounts and jobs from a JSON config file
+
+    Returns:
+        tuple: (accounts dict keyed by name, list of BookingJob, max_contexts or None)
+    """
+    with open(path) as f:
+        config = json.load(f)
+
+    accounts = {}
+    for name, spec in config.get("accounts", {}).items():
+        username = os.environ.get(spec.get("username_env", ""))
+        password = os.environ.get(spec.get("password_env", ""))
+        if not username or not password:
+            raise ValueError(f"Account '{name}': credentials not found in {spec.get('username_env')} / {spec.get('password_env')}")
+        accounts[name] = Account(name, username, password)
+
+    jobs = []
+    for i, spec in enumerate(config.get("jobs", [])):
+        release_at = spec.get("release_at")
+        job = BookingJob(
+            account=spec["account"],
+            club=spec["club"],
+            activity=spec["activity"],
+            day=spec["day"],
+            time=spec.get("time"),
+            release_at=datetime.datetime.fromisoformat(release_at) if release_at else None,
+        )
+        if job.account not in accounts:
+            raise ValueError(f"Job {i}: unknown account '{job.account}'")
+        if job.club not in CLUBS:
+            raise ValueError(f"Job {i}: unknown club '{job.club}', expected one of: {', '.join(CLUBS)}")
+        if job.activity not in ACTIVITIES:
+            raise ValueError(f"Job {i}: unknown activity '{job.activity}', expected one of: {', '.join(ACTIVITIES)}")
+        jobs.append(job)
+
+    return accounts, jobs, config.get("max_contexts")
+
+
+def run_job(job, account, headless=True):
+    """Run a single booking job in its own browser (one Playwright instance per worker thread)"""
+    started_at = datetime.datetime.now()
+    start = time.monotonic()
+    logging.info(f"Starting job {job.label}")
+
+    try:
+        planned = plan_for_day(job.activity, job.club, job.day, job.time)
+        success = execute(planned, username=account.username, password=account.password, headless=headless)
+        error = None if success else "booking flow returned failure"
+    except Exception as e:
+        success = False
+        error = f"{type(e).__name__}: {e}"
+
+    duration = time.monotonic() - start
+    logging.info(f"{'✓' if success else '✗'} Job {job.label} finished in {duration:.1f}s")
+    return JobResult(job, success, error, started_at, duration)
+
+
+def group_by_release(jobs):
+    """Group jobs by release instant, earliest first; jobs without one form an immediate group"""
+    groups = {}
+    for job in jobs:
+        groups.setdefault(job.release_at, []).append(job)
+    return sorted(groups.items(), key=lambda item: (item[0] is not None, item[0] or datetime.datetime.min))
+
+
+def wait_until(release_at, clock):
+    """Sleep until the release instant (naive means local time) by the Bay Club server's clock"""
+    clock.wait_for(release_at if release_at.tzinfo else release_at.astimezone())
+
+
+def run_fleet(accounts, jobs, max_contexts=2, headless=True):
+    """Run all jobs with at most max_contexts browsers open at once
+
+    Each release group is submitted at its own release instant, whether or not
+    earlier groups have finished; jobs beyond max_contexts queue for a free browser.
+
+    Returns:
+        list: JobResult for every job, in submission order
+    """
+    futures = []
+    # One clock for every group: a group released soon after another reuses its estimate
+    clock = ClockSync(CLOCK_URL)
+    with ThreadPoolExecutor(max_workers=max_contexts, thread_name_prefix="job") as pool:
+        for release_at, group in group_by_release(jobs):
+            if release_at:
+                wait_until(release_at, clock)
+            logging.info(f"Releasing {len(group)} job(s) together")
+            # Don't wait for the group: a later release must fire on time even if these jobs run long
+            futures.extend(pool.submit(run_job, job, accounts[job.account], headless) for job in group)
+        return [future.result() for future in futures]
+
+
+def summarize(results):
+    """Log a per-job summary table and return aggregate counts"""
+    logging.info("=" * 50)
+    for result in results:
+        status = "OK  " if result.success else "FAIL"
+        detail = f" ({result.error})" if result.error else ""
+        logging.info(f"{status} {result.job.label} - {result.duration:.1f}s{detail}")
+
+    succeeded = sum(1 for r in results if r.success)
+    summary = {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+    }
+    logging.info(f"{succeeded}/{len(results)} jobs succeeded")
+    logging.info("=" * 50)
+    return summary
+
+
+def main(argv):
+    if not argv or argv[0].startswith("-"):
+        print(__doc__)
+        return False
+
+    accounts, jobs, max_contexts = load_config(argv[0])
+    if '--max-contexts' in argv:
+        max_contexts = int(argv[argv.index('--max-contexts') + 1])
+
+    results = run_fleet(accounts, jobs, max_contexts=max_contexts or 2, headless='--headed' not in argv)
+    summary = summarize(results)
+    return summary["failed"] == 0
+
+
+if __name__ == "__main__":
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
@@ -0,0 +1,169 @@
+"""
+Shared HTTP client for the LLM and other API calls
+
+One keep-alive requests.Session per process, with a connection pool sized for the
+fleet's worker threads, so the TLS handshake to an API host happens once rather than
+in the middle of a booking. Every call has a deadline covering all of its retries;
+429 and 5xx responses (and dropped connections) are retried with exponential
+backoff, honouring Retry-After. Latencies are kept per host in a small histogram.
+
+prewarm(url) opens the connection on a background thread, so it can be started
+while the browser is still logging in and navigating.
+"""
+import os
+import time
+import logging
+import threading
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = int(os.environ.get("BAYCLUB_HTTP_POOL_SIZE", "8"))
+RETRY_STATUS = (429, 500, 502, 503, 504)
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (thread-safe)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms):
+        with self._lock:
+            self.count += 1
+            self.total_ms += ms
+            for i, bound in enumerate(self.buckets):
+                if ms <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile"""
+        with self._lock:
+            if not self.count:
+                return None
+            seen = 0
+            for bound, count in zip(self.buckets, self.counts):
+                seen += count
+                if seen >= q * self.count:
+                    return bound
+            return self.buckets[-1]
+
+    def summary(self):
+        mean = self.total_ms / self.count if self.count else 0
+        return f"n={self.count} mean={mean:.0f}ms p50<={self.quantile(0.5)}ms p90<={self.quantile(0.9)}ms"
+
+
+class HttpClient:
+    """Pooled session with per-call deadlines, retry with backoff, and latency histograms"""
+
+    def __init__(self, pool_size=POOL_SIZE, retries=3, backoff=0.25):
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        # Retries are done here, not by urllib3, so they stay inside the call's deadline
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.latency = {}
+        self._lock = threading.Lock()
+
+    def _observe(self, url, started):
+        host = urlsplit(url).netloc
+        with self._lock:
+            histogram = self.latency.setdefault(host, LatencyHistogram())
+        histogram.observe((time.monotonic() - started) * 1000)
+
+    def _retry_delay(self, attempt, response):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * (2 ** attempt)
+
+    def request(self, method, url, timeout=10, deadline=None, **kwargs):
+        """Send a request, retrying 429/5xx and connection errors until the deadline
+
+        Args:
+            timeout: Seconds allowed for the whole call, retries included
+            deadline: Absolute time.monotonic() cut-off; overrides timeout if sooner
+
+        Returns:
+            requests.Response: the last response (which may still be a 429/5xx)
+        """
+        deadline = min(deadline or float("inf"), time.monotonic() + timeout)
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout(f"{method} {url}: deadline exceeded after {attempt} attempts")
+
+            started = time.monotonic()
+            response = None
+            try:
+                response = self.session.request(method, url, timeout=remaining, **kwargs)
+                if response.status_code not in RETRY_STATUS:
+                    return response
+                error = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+            finally:
+                self._observe(url, started)
+
+            delay = self._retry_delay(attempt, response)
+            if attempt >= self.retries or time.monotonic() + delay >= deadline:
+                if response is not None:
+                    return response
+                raise requests.ConnectionError(f"{method} {url} failed after {attempt + 1} attempts: {error}")
+            logging.warning(f"{method} {urlsplit(url).netloc} failed ({error}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def prewarm(self, url, timeout=5):
+        """Open a pooled connection to url's host in the background; returns the thread"""
+        def warm():
+            started = time.monotonic()
+            try:
+                # Any response will do, it's only the TCP/TLS connection we want to keep
+                self.session.head(url, timeout=timeout)
+                logging.debug(f"Pre-warmed {urlsplit(url).netloc} in {(time.monotonic() - started) * 1000:.0f}ms")
+            except requests.RequestException as e:
+                logging.debug(f"Pre-warm of {urlsplit(url).netloc} failed: {e}")
+
+        thread = threading.Thread(target=warm, name="http-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def log_latency(self):
+        for host, histogram in self.latency.items():
+            logging.info(f"HTTP latency {host}: {histogram.summary()}")
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide shared client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def log_latency():
+    """Log the latency histograms, if anything used the shared client"""
+    if _client is not None:
+        _client.log_latency()
@@ -0,0 +1,266 @@
+"""
+Declarative booking schedule
+
+The jobs each script runs (activity, club, which day, time, duration, calendar
+text) live in schedule.toml instead of weekday if/else chains in the scripts.
+The file is validated and parsed once into frozen JobSpecs; plan_jobs() turns
+the ones due today into PlannedJobs with their target dates worked out, and
+execute() runs any PlannedJob through the matching booking flow.
+
+    [[job]]
+    name = "ignite-wednesday"
+    activity = "ignite"          # ignite | tennis
+    club = "San Francisco"
+    run_on = "Monday"            # day the script is started (by cron)
+    day_offset = 2               # book run_on + day_offset
+    time = "5:30 PM"             # class time (default 5:30 PM) / preferred court time (optional)
+    release = "5:30 PM"          # optional: when booking opens on run_on, by the club's clock
+    duration = 50                # minutes
+    calendar_summary = "Ignite - Bay Club {club}"   # optional
+    calendar_description = "..."                    # optional
+    enabled = true               # optional
+
+Usage: python3 jobspec.py [schedule.toml] [--date 2026-10-19]   (print the plan)
+"""
+import os
+import sys
+import datetime
+import tomllib
+from dataclasses import dataclass
+from dateutil import parser
+from bayclub_base import CLUBS
+from availability import CLUB_TZ
+
+SPEC_PATH = os.environ.get(
+    "BAYCLUB_SCHEDULE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "schedule.toml")
+)
+
+ACTIVITIES = ("ignite", "tennis")
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+# Day codes used by the class date slider
+DAY_CODES = ["Mo", "Tu", "We", "Th", "Fr", "Sa", "Su"]
+DEFAULT_DURATION = {"ignite": 50, "tennis": 90}
+DEFAULT_TIME = {"ignite": "5:30 PM"}
+DEFAULT_SUMMARY = {"ignite": "Ignite - Bay Club {club}", "tennis": "Tennis Court - Bay Club {club}"}
+FIELDS = {
+    "name": str, "activity": str, "club": str, "run_on": str, "day_offset": int, "time": str,
+    "duration": int, "calendar_summary": str, "calendar_description": str, "enabled": bool, "partner": str,
+    "release": str,
+}
+REQUIRED = ("name", "activity", "club", "run_on", "day_offset")
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    name: str
+    activity: str
+    club: str
+    run_on: int            # weekday number, Monday = 0
+    day_offset: int
+    time: datetime.time = None
+    duration: int = 90
+    calendar_summary: str = None
+    calendar_description: str = None
+    enabled: bool = True
+    partner: str = None    # tennis: who to add on the confirmation page (default BAYCLUB_PARTNER)
+    release: datetime.time = None   # when booking opens on run_on (club time); the flow waits for it
+
+    @property
+    def target_weekday(self):
+        return (self.run_on + self.day_offset) % 7
+
+
+@dataclass(frozen=True)
+class PlannedJob:
+    spec: JobSpec
+    target_date: datetime.date
+    day_name: str          # "Friday"
+    day_code: str          # "Fr"
+    start: datetime.datetime = None   # aware club-local start, when the spec has a time
+    release_at: datetime.datetime = None   # aware release instant, when due today and the spec has one
+
+    @property
+    def time_text(self):
+        return self.spec.time.strftime("%-I:%M %p") if self.spec.time else None
+
+    @property
+    def calendar_summary(self):
+        return self.spec.calendar_summary.format(club=self.spec.club)
+
+    @property
+    def calendar_description(self):
+        if self.spec.calendar_description:
+            return self.spec.calendar_description.format(club=self.spec.club)
+        return None
+
+    @property
+    def label(self):
+        return f"{self.spec.name}: {self.spec.activity} at {self.spec.club} on {self.target_date:%a %b %d} {self.time_text or ''}".strip()
+
+
+def parse_job(index, raw):
+    """Validate one [[job]] table into a JobSpec"""
+    where = f"Job {index} ({raw.get('name', 'unnamed')})"
+    unknown = set(raw) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"{where}: unknown field(s) {', '.join(sorted(unknown))}")
+    missing = [field for field in REQUIRED if field not in raw]
+    if missing:
+        raise ValueError(f"{where}: missing {', '.join(missing)}")
+    for field, value in raw.items():
+        # bool is an int subclass, so check it explicitly
+        if not isinstance(value, FIELDS[field]) or (FIELDS[field] is int and isinstance(value, bool)):
+            raise ValueError(f"{where}: {field} must be {FIELDS[field].__name__}, got {value!r}")
+
+    activity = raw["activity"]
+    if activity not in ACTIVITIES:
+        raise ValueError(f"{where}: unknown activity '{activity}', expected one of: {', '.join(ACTIVITIES)}")
+    if raw["club"] not in CLUBS:
+        raise ValueError(f"{where}: unknown club '{raw['club']}', expected one of: {', '.join(CLUBS)}")
+    if raw["run_on"] not in WEEKDAYS:
+        raise ValueError(f"{where}: run_on must be a weekday name, got '{raw['run_on']}'")
+    if not 0 <= raw["day_offset"] <= 14:
+        raise ValueError(f"{where}: day_offset must be between 0 and 14")
+
+    start_time = None
+    time_text = raw.get("time", DEFAULT_TIME.get(activity))
+    if time_text:
+        try:
+            start_time = parser.parse(time_text).time()
+        except (ValueError, OverflowError):
+            raise ValueError(f"{where}: can't parse time '{time_text}'")
+
+    release = None
+    if "release" in raw:
+        try:
+            release = parser.parse(raw["release"]).time()
+        except (ValueError, OverflowError):
+            raise ValueError(f"{where}: can't parse release '{raw['release']}'")
+
+    if "partner" in raw and activity != "tennis":
+        raise ValueError(f"{where}: partner only applies to tennis jobs")
+
+    duration = raw.get("duration", DEFAULT_DURATION[activity])
+    if duration <= 0:
+        raise ValueError(f"{where}: duration must be positive")
+
+    return JobSpec(
+        name=raw["name"],
+        activity=activity,
+        club=raw["club"],
+        run_on=WEEKDAYS.index(raw["run_on"]),
+        day_offset=raw["day_offset"],
+        time=start_time,
+        duration=duration,
+        calendar_summary=raw.get("calendar_summary", DEFAULT_SUMMARY[activity]),
+        calendar_description=raw.get("calendar_description"),
+        enabled=raw.get("enabled", True),
+        partner=raw.get("partner"),
+        release=release,
+    )
+
+
+def load_spec(path=SPEC_PATH):
+    """Parse and validate a schedule file
+
+    Returns:
+        tuple: JobSpec per [[job]], in file order
+    """
+    with open(path, "rb") as f:
+        document = tomllib.load(f)
+    # [speculation] holds club rules for speculate.py
+    unknown = set(document) - {"job", "speculation"}
+    if unknown:
+        raise ValueError(f"{path}: unknown top-level key(s) {', '.join(sorted(unknown))}")
+    specs = tuple(parse_job(i, raw) for i, raw in enumerate(document.get("job", [])))
+    names = [spec.name for spec in specs]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"{path}: duplicate job name(s) {', '.join(sorted(duplicates))}")
+    return specs
+
+
+def plan_job(spec, target_date, run_date=None):
+    start = None
+    if spec.time:
+        start = datetime.datetime.combine(target_date, spec.time, tzinfo=CLUB_TZ)
+    release_at = None
+    if spec.release and run_date:
+        release_at = datetime.datetime.combine(run_date, spec.release, tzinfo=CLUB_TZ)
+    weekday = target_date.weekday()
+    return PlannedJob(spec, target_date, WEEKDAYS[weekday], DAY_CODES[weekday], start, release_at)
+
+
+def plan_jobs(specs, today=None, activity=None, force=False):
+    """The enabled jobs to run today, with their target dates
+
+    With force, jobs not due today are planned for the next date after today on
+    their target weekday instead (for testing and manual runs); those don't wait
+    for a release.
+
+    Returns:
+        tuple: PlannedJob, in spec order
+    """
+    today = today or datetime.datetime.now(CLUB_TZ).date()
+    planned = []
+    for spec in specs:
+        if not spec.enabled or (activity and spec.activity != activity):
+            continue
+        if spec.run_on == today.weekday():
+            planned.append(plan_job(spec, today + datetime.timedelta(days=spec.day_offset), run_date=today))
+        elif force:
+            days_ahead = (spec.target_weekday - today.weekday() - 1) % 7 + 1
+            planned.append(plan_job(spec, today + datetime.timedelta(days=days_ahead)))
+    return tuple(planned)
+
+
+def plan_for_day(activity, club, day, time_text=None, today=None):
+    """A PlannedJob for the next `day` (name like "Friday" or code like "Fr"), e.g. for fleet jobs"""
+    today = today or datetime.datetime.now(CLUB_TZ).date()
+    weekday = DAY_CODES.index(day) if day in DAY_CODES else WEEKDAYS.index(day)
+    raw = {"name": f"{activity}-{day}", "activity": activity, "club": club,
+           "run_on": WEEKDAYS[today.weekday()], "day_offset": (weekday - today.weekday()) % 7}
+    if time_text:
+        raw["time"] = time_text
+    return plan_jobs((parse_job(0, raw),), today)[0]
+
+
+def execute(job, username=None, password=None, headless=False, dry_run=False):
+    """Run a PlannedJob through its booking flow (stopping short of confirming with dry_run)
+
+    Returns:
+        bool: True if the booking succeeded
+    """
+    spec = job.spec
+    if spec.activity == "ignite":
+        from app import book_ignite
+        return book_ignite(job.day_code, club=spec.club, username=username, password=password, headless=headless,
+                           class_time=job.time_text, duration=spec.duration,
+                           calendar_summary=job.calendar_summary, calendar_description=job.calendar_description,
+                           dry_run=dry_run, target_date=job.target_date, release_at=job.release_at)
+
+    from tennisbookapp import book_tennis
+    return book_tennis(job.day_name, club=spec.club, preferred_time=job.time_text, username=username,
+                       password=password, headless=headless, target_date=job.target_date, duration=spec.duration,
+                       calendar_summary=job.calendar_summary, calendar_description=job.calendar_description,
+                       dry_run=dry_run, partner=spec.partner, release_at=job.release_at)
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    path = argv[0] if argv and not argv[0].startswith("-") else SPEC_PATH
+    today = datetime.date.fromisoformat(arg('--date', datetime.datetime.now(CLUB_TZ).date().isoformat()))
+    specs = load_spec(path)
+    print(f"{len(specs)} jobs in {path}, due on {today:%A %Y-%m-%d}:")
+    for job in plan_jobs(specs, today):
+        release = f", opens {job.release_at:%H:%M:%S}" if job.release_at else ""
+        print(f"  {job.label} ({job.spec.duration} min{release})")
+    return True
+
+
+if __name__ == "__main__":
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
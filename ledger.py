@@ -0,0 +1,237 @@
+"""
+Reservation ledger: what each account already has booked
+
+Retries and overlapping cron runs used to go through the whole browser flow
+for a class or court that was already reserved. The ledger is a small SQLite
+table (~/.cache/bayclub/ledger.db, override with BAYCLUB_LEDGER_DB) holding each
+account's upcoming reservations. It gets them from two places: the My
+Reservations page, read by `python3 ledger.py sync` (and after every confirmed
+booking with BAYCLUB_VERIFY_RESERVATIONS=1), and a local record of bookings that
+were confirmed but not listed there yet. BayClubBookingBase checks it before launching the
+browser, so a run whose target is already reserved ends in a few milliseconds.
+
+BAYCLUB_LEDGER=0 turns it off. Dry runs never consult it.
+
+read_reservations was written against the mock server's My Reservations page and
+hasn't been checked against the real one yet, so reading it back after each
+booking is off unless BAYCLUB_VERIFY_RESERVATIONS=1. A sync replaces an account's
+rows when the page listed reservations or showed its empty state, so a reservation
+cancelled on the site stops blocking the next run; a page that didn't load changes
+nothing.
+
+Usage:
+    python3 ledger.py show [--account NAME]
+    python3 ledger.py sync        # log in headless and read My Reservations
+"""
+import os
+import re
+import sys
+import sqlite3
+import datetime
+import logging
+from dataclasses import dataclass
+from availability import CLUB_TZ
+
+LEDGER_DB = os.environ.get(
+    "BAYCLUB_LEDGER_DB",
+    os.path.expanduser("~/.cache/bayclub/ledger.db")
+)
+LEDGER = os.environ.get("BAYCLUB_LEDGER", "1") == "1"
+VERIFY_RESERVATIONS = os.environ.get("BAYCLUB_VERIFY_RESERVATIONS", "0") == "1"
+ACTIVITIES = ("ignite", "tennis")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reservations (
+    account TEXT,
+    activity TEXT,
+    club TEXT,
+    date TEXT,
+    start TEXT,
+    label TEXT,
+    source TEXT,
+    recorded_at TEXT,
+    PRIMARY KEY (account, activity, club, date, start)
+);
+"""
+TIME_PATTERN = re.compile(r"(\d{1,2}:\d{2})\s*([AP]M)?", re.IGNORECASE)
+
+
+class AlreadyReserved(Exception):
+    """The run's target is already in the ledger, so there is nothing to book"""
+
+
+@dataclass(frozen=True)
+class Target:
+    """What a run is trying to book; time None means any time that day (best available court)"""
+    activity: str               # "ignite" or "tennis"
+    club: str
+    date: datetime.date
+    time: datetime.time = None
+
+    @property
+    def text(self):
+        when = f" {self.time.strftime('%-I:%M %p')}" if self.time else ""
+        return f"{self.activity} at {self.club} on {self.date:%a %b %d}{when}"
+
+    def matches(self, reservation):
+        return (reservation["activity"] == self.activity and reservation["club"] == self.club
+                and reservation["date"] == self.date.isoformat()
+                and (self.time is None or reservation["start"] == self.time.strftime("%H:%M")))
+
+
+def parse_start(label):
+    """Start time of a reservation label like "10:00 - 11:30 AM" or "5:30 PM"; None if there isn't one"""
+    times = TIME_PATTERN.findall(label)
+    if not times:
+        return None
+    clock, meridiem = times[0]
+    # "10:00 - 11:30 AM": the start shares the end's AM/PM
+    meridiem = meridiem or next((m for _, m in times[1:] if m), "")
+    fmt = "%I:%M %p" if meridiem else "%H:%M"
+    return datetime.datetime.strptime(f"{clock} {meridiem}".strip().upper(), fmt).time()
+
+
+def parse_date(text, today=None):
+    """A "Friday, October 23" heading as the nearest such date from a week ago on"""
+    today = today or datetime.datetime.now(CLUB_TZ).date()
+    day = datetime.datetime.strptime(text.split(",", 1)[1].strip(), "%B %d")
+    for year in (today.year, today.year + 1):
+        date = day.replace(year=year).date()
+        if date >= today - datetime.timedelta(days=7):
+            return date
+    return date
+
+
+def activity_of(text):
+    """Ledger activity for the kind shown on a reservation ("Tennis", "Ignite", ...); "unknown" if it's neither
+
+    An unknown reservation never satisfies a target, so it can't stop a booking.
+    """
+    text = text.strip().lower()
+    return next((activity for activity in ACTIVITIES if activity in text), "unknown")
+
+
+def read_reservations(page, today=None):
+    """Reservations listed on the My Reservations page, in one round trip"""
+    rows = page.eval_on_selector_all(
+        "app-reservation-item",
+        """items => items.map(item => Array.from(item.querySelectorAll(':scope > div > div:first-child > span'))
+                                        .map(span => span.textContent.trim()))"""
+    )
+    reservations = []
+    for spans in rows:
+        if len(spans) < 3:
+            continue
+        club, day, label = spans[:3]
+        try:
+            start = parse_start(label)
+            date = parse_date(day, today)
+        except ValueError as e:
+            logging.debug(f"Skipping reservation {spans}: {e}")
+            continue
+        reservations.append({
+            "activity": activity_of(spans[3] if len(spans) > 3 else ""),
+            "club": club.removeprefix("Bay Club ").strip(),
+            "date": date.isoformat(),
+            "start": start.strftime("%H:%M") if start else "",
+            "label": label,
+        })
+    return reservations
+
+
+class Ledger:
+    def __init__(self, path=LEDGER_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=10)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def satisfied(self, account, target):
+        """Description of the reservation that already covers target, or None"""
+        query = "SELECT club, date, label, source FROM reservations WHERE account = ? AND activity = ? AND club = ? AND date = ?"
+        params = [account or "", target.activity, target.club, target.date.isoformat()]
+        if target.time:
+            query += " AND start = ?"
+            params.append(target.time.strftime("%H:%M"))
+        row = self.conn.execute(query + " LIMIT 1", params).fetchone()
+        return f"{row[0]} {row[1]} {row[2]} ({row[3]})" if row else None
+
+    def count_on(self, account, activity, date):
+        """How many reservations of an activity the account has on a date, at any club"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM reservations WHERE account = ? AND activity = ? AND date = ?",
+            (account or "", activity, date.isoformat())
+        ).fetchone()[0]
+
+    def record(self, account, target, label=None, source="confirmed"):
+        """Record a confirmed booking that My Reservations doesn't show (yet)"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO reservations VALUES (?,?,?,?,?,?,?,?)",
+                (account or "", target.activity, target.club, target.date.isoformat(),
+                 target.time.strftime("%H:%M") if target.time else "", label or target.text, source,
+                 datetime.datetime.now().isoformat(timespec="seconds"))
+            )
+
+    def replace(self, account, reservations, today=None):
+        """Take My Reservations as the truth for today onwards; past rows are dropped
+
+        Only call this with a list the page actually rendered: an empty one clears the account
+        (e.g. after its only reservation was cancelled on the site).
+        """
+        today = (today or datetime.datetime.now(CLUB_TZ).date()).isoformat()
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        with self.conn:
+            self.conn.execute("DELETE FROM reservations WHERE account = ? OR date < ?", (account or "", today))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO reservations VALUES (?,?,?,?,?,?,?,?)",
+                [(account or "", r["activity"], r["club"], r["date"], r["start"], r["label"], "synced", now)
+                 for r in reservations if r["date"] >= today]
+            )
+
+    def upcoming(self, account=None):
+        query = "SELECT account, activity, club, date, start, label, source, recorded_at FROM reservations"
+        params = []
+        if account is not None:
+            query += " WHERE account = ?"
+            params.append(account)
+        return self.conn.execute(query + " ORDER BY date, start", params).fetchall()
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    if argv and argv[0] == "sync":
+        from bayclub_base import BayClubBookingBase
+
+        with BayClubBookingBase(headless=True) as booking:
+            booking.run.target = "ledger sync"
+            with booking.step("login"):
+                booking.login()
+            with booking.step("sync_ledger"):
+                reservations = booking.sync_ledger()
+            booking.run.outcome = "synced"
+        if reservations is None:
+            print("Could not read My Reservations; the ledger is unchanged")
+            return False
+        print(f"{len(reservations)} upcoming reservations")
+        return True
+
+    ledger = Ledger()
+    for account, activity, club, date, start, label, source, recorded_at in ledger.upcoming(arg('--account', None)):
+        print(f"{date} {start or '-':<6} {activity:<8} {club:<14} {label:<22} {source:<9} {account} ({recorded_at})")
+    ledger.close()
+    return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s',
+        datefmt='%d-%b-%y %H:%M:%S'
+    )
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
@@ -0,0 +1,170 @@
+"""
+Local OpenAI-compatible chat completions stub
+
+Answers POST /v1/chat/completions like a reasoning model: some reasoning tokens,
+then the answer, then trailing tokens, each after a configurable delay. With
+"stream": true the tokens are sent as server-sent events as they are "generated",
+and generation stops when the client disconnects (counted in `cancelled`).
+
+Usage: python3 llm_stub.py [--port 8766] [--token-delay 0.03] [--answer "2:30 PM"]
+    MODEL_ACCESS_KEY=x BAYCLUB_LLM_URL=http://127.0.0.1:8766/v1/chat/completions python3 tennisbookapp.py
+"""
+import sys
+import json
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+@dataclass
+class StubConfig:
+    token_delay: float = 0.03       # seconds per generated token
+    first_token_delay: float = 0.2  # time to first token (prompt processing)
+    reasoning_tokens: int = 30
+    answer: str = "2:30 PM"
+    trailing_tokens: int = 20       # explanation the model adds despite being told not to
+
+
+class StubState:
+    def __init__(self, config):
+        self.config = config
+        self.requests = 0
+        self.tokens_sent = 0
+        self.cancelled = 0
+        self.lock = threading.Lock()
+
+    def tokens(self):
+        """(field, text) per token, in generation order"""
+        config = self.config
+        reasoning = [("reasoning_content", f"thought{i} ") for i in range(config.reasoning_tokens)]
+        answer = [("content", word + " ") for word in config.answer.split()]
+        trailing = [("content", f"because{i} ") for i in range(config.trailing_tokens)]
+        return reasoning + answer + trailing
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "LLMStub/1.0"
+    state = None  # set per server
+
+    def log_message(self, format, *args):
+        logging.debug("llm stub: " + format % args)
+
+    def do_HEAD(self):
+        # Connection pre-warming
+        self.send_response(405)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self.state.lock:
+            self.state.requests += 1
+        time.sleep(self.state.config.first_token_delay)
+        if body.get("stream"):
+            self._stream()
+        else:
+            self._complete()
+
+    def _complete(self):
+        message = {"role": "assistant", "content": "", "reasoning_content": ""}
+        tokens = self.state.tokens()
+        for field, text in tokens:
+            time.sleep(self.state.config.token_delay)
+            message[field] += text
+        with self.state.lock:
+            self.state.tokens_sent += len(tokens)
+        data = json.dumps({"choices": [{"index": 0, "message": message, "finish_reason": "stop"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, text):
+        data = text.encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for field, text in self.state.tokens():
+                time.sleep(self.state.config.token_delay)
+                event = {"choices": [{"index": 0, "delta": {field: text}, "finish_reason": None}]}
+                self._chunk(f"data: {json.dumps(event)}\n\n")
+                with self.state.lock:
+                    self.state.tokens_sent += 1
+            self._chunk("data: [DONE]\n\n")
+            self._chunk("")
+        except (BrokenPipeError, ConnectionResetError):
+            with self.state.lock:
+                self.state.cancelled += 1
+            self.close_connection = True
+
+
+class LLMStubServer:
+    """Runs the stub on a background thread; use as a context manager"""
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or StubConfig()
+        self.state = StubState(self.config)
+        handler = type("BoundStubHandler", (StubHandler,), {"state": self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="llm-stub", daemon=True)
+        self.thread.start()
+        logging.info(f"LLM stub running at {self.url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    config = StubConfig(
+        token_delay=float(arg('--token-delay', 0.03)),
+        first_token_delay=float(arg('--first-token-delay', 0.2)),
+        reasoning_tokens=int(arg('--reasoning-tokens', 30)),
+        answer=arg('--answer', "2:30 PM"),
+        trailing_tokens=int(arg('--trailing-tokens', 20)),
+    )
+    server = LLMStubServer(config, port=int(arg('--port', 8766)))
+    print(f"LLM stub running at {server.url} (Ctrl-C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s',
+        datefmt='%d-%b-%y %H:%M:%S'
+    )
+    main(sys.argv[1:])
@@ -0,0 +1,167 @@
+"""
+Browser memory profiles and peak RSS measurement
+
+The droplet is small, so each run reports the peak resident memory of the Python
+process and of its session's browser process tree: the Playwright driver this
+session started plus the Chromium under it. Fleet jobs and speculative helpers
+run sessions on other threads of the same process, and their browsers are not
+counted. When attached to browser_server.py, the server's tree is sampled
+instead, and that tree is shared with any other leases. Sampling reads /proc
+directly on a background thread.
+
+BAYCLUB_BROWSER_PROFILE picks the launch profile:
+    default     - what the scripts always used: 1280x720, normal Chromium
+    low-memory  - single renderer process, smaller viewport, HTTP cache off,
+                  V8 heap capped, and the context recycled every few pages
+"""
+import os
+import logging
+import resource
+import threading
+
+BROWSER_PROFILE = os.environ.get("BAYCLUB_BROWSER_PROFILE", "default")
+# Held while starting a Playwright driver, so concurrent sessions can tell whose driver is whose
+SPAWN_LOCK = threading.Lock()
+
+PROFILES = {
+    "default": {
+        "args": ["--no-sandbox", "--disable-dev-shm-usage"],
+        "viewport": {"width": 1280, "height": 720},
+        "disable_cache": False,
+        "context_page_limit": None,
+    },
+    "low-memory": {
+        "args": [
+            "--no-sandbox", "--disable-dev-shm-usage",
+            "--single-process", "--no-zygote", "--renderer-process-limit=1",
+            "--disable-gpu", "--disable-extensions", "--disable-background-networking",
+            "--disable-features=site-per-process,TranslateUI,BackForwardCache",
+            "--disk-cache-size=1", "--media-cache-size=1",
+            "--js-flags=--max-old-space-size=128",
+        ],
+        "viewport": {"width": 1024, "height": 600},
+        "disable_cache": True,
+        "context_page_limit": 3,
+    },
+}
+
+
+def get_profile(name=None):
+    name = name or BROWSER_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown browser profile '{name}', expected one of: {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+
+def _rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        pass
+    return 0
+
+
+def descendant_pids(root_pid):
+    """All live descendants of root_pid, read from /proc/*/stat"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces, so split after its closing paren
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (FileNotFoundError, ProcessLookupError, PermissionError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    pids, stack = [], [root_pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            pids.append(child)
+            stack.append(child)
+    return pids
+
+
+def child_pids(pid=None):
+    """Direct children of pid (default: this process)"""
+    pid = pid or os.getpid()
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return {int(child) for child in f.read().split()}
+    except (FileNotFoundError, PermissionError):
+        # Kernels without the children file: fall back to scanning every process
+        return {child for child in descendant_pids(pid) if _parent_pid(child) == pid}
+
+
+def _parent_pid(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return int(f.read().rsplit(")", 1)[1].split()[1])
+    except (FileNotFoundError, ProcessLookupError, PermissionError, IndexError, ValueError):
+        return None
+
+
+def tree_rss_mb(root_pids):
+    """Current RSS of the given processes and all their descendants"""
+    pids = set(root_pids)
+    for pid in root_pids:
+        pids.update(descendant_pids(pid))
+    return sum(_rss_kb(pid) for pid in pids) / 1024
+
+
+def browser_tree_rss_mb(root_pid=None):
+    """Current RSS of every process started under root_pid (default: this process)"""
+    return sum(_rss_kb(pid) for pid in descendant_pids(root_pid or os.getpid())) / 1024
+
+
+def python_peak_rss_mb():
+    """Peak RSS of this Python process (ru_maxrss is in KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class MemorySampler:
+    """Tracks the peak RSS of one session's browser tree on a background thread
+
+    root_pids is filled in once the session knows its driver (or browser server)
+    process; until then nothing is counted.
+    """
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.browser_peak_mb = 0.0
+        self.root_pids = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if not os.path.isdir("/proc"):
+            logging.debug("No /proc, browser memory sampling disabled")
+            return self
+        self._thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def sample(self):
+        try:
+            if self.root_pids:
+                self.browser_peak_mb = max(self.browser_peak_mb, tree_rss_mb(self.root_pids))
+        except Exception as e:
+            logging.debug(f"Memory sample failed: {e}")
+
+    def stop(self):
+        """Stop sampling and return (python_peak_mb, browser_peak_mb)"""
+        if self._thread:
+            # One last sample so short runs still get a reading
+            self.sample()
+            self._stop.set()
+            self._thread.join(timeout=2)
+        return python_peak_rss_mb(), self.browser_peak_mb
@@ -0,0 +1,243 @@
+"""
+Prometheus metrics for booking runs
+
+The counters, histograms and gauges are computed from the run history
+(run_history.py) rather than kept in each process. Every script that records a
+run (app.py, tennisbookapp.py, planner, fleet jobs) contributes, and the counters
+keep counting across cron runs and restarts. Two ways to expose them:
+
+    textfile   - BAYCLUB_METRICS_TEXTFILE=/var/lib/node_exporter/textfile_collector/bayclub.prom
+                 rewrites that file at the end of every run, for node_exporter's textfile collector
+    HTTP       - python3 metrics.py serve [--port 9310] answers GET /metrics from the history
+
+Exported (labelled by script, i.e. the booking class):
+    bayclub_runs_total{outcome}            every recorded run, dry runs and speculative helpers included
+    bayclub_attempts_total                 real booking attempts (no dry runs, helper sessions or ledger skips)
+    bayclub_successes_total                attempts that booked or joined the waitlist
+    bayclub_waitlists_total                attempts that joined the waitlist
+    bayclub_fallbacks_total                ranked court times lost before the one that was booked
+    bayclub_step_seconds{step}             histogram of successful step durations
+    bayclub_step_failures_total{step}      steps that raised
+    bayclub_time_to_confirm_seconds        histogram of run start to confirmation
+    bayclub_python_peak_rss_bytes          peak RSS of Python in the latest run
+    bayclub_browser_peak_rss_bytes         peak RSS of the browser process tree in the latest run
+    bayclub_last_run_timestamp_seconds     when the latest run started
+    bayclub_last_success_timestamp_seconds when the latest successful attempt started
+
+Usage:
+    python3 metrics.py                     # print the metrics
+    python3 metrics.py write [--path FILE]
+    python3 metrics.py serve [--port 9310]
+"""
+import os
+import sys
+import datetime
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from run_history import connect, HISTORY_DB, HELPER_OUTCOMES, SKIPPED_OUTCOMES, SUCCESS_OUTCOMES
+
+METRICS_TEXTFILE = os.environ.get("BAYCLUB_METRICS_TEXTFILE")
+METRICS_PORT = int(os.environ.get("BAYCLUB_METRICS_PORT", 9310))
+
+STEP_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+CONFIRM_BUCKETS = (5, 10, 20, 30, 45, 60, 90, 120, 180, 300)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Exposition:
+    """Prometheus text format, one metric family at a time"""
+
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, kind, help_text, samples):
+        """samples: (labels dict, value) pairs"""
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+    def histogram(self, name, help_text, observations, buckets):
+        """observations: labels tuple (as sorted items) -> list of values"""
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} histogram")
+        for label_items, values in sorted(observations.items()):
+            labels = dict(label_items)
+            for bound in buckets:
+                count = sum(1 for v in values if v <= bound)
+                self.lines.append(f"{name}_bucket{format_labels({**labels, 'le': bound})} {count}")
+            self.lines.append(f"{name}_bucket{format_labels({**labels, 'le': '+Inf'})} {len(values)}")
+            self.lines.append(f"{name}_sum{format_labels(labels)} {format_value(float(sum(values)))}")
+            self.lines.append(f"{name}_count{format_labels(labels)} {len(values)}")
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def timestamp(started_at):
+    return datetime.datetime.fromisoformat(started_at).timestamp()
+
+
+def render(path=HISTORY_DB):
+    """The metrics for every run in the history, in the Prometheus text format"""
+    conn = connect(path)
+    try:
+        runs = conn.execute(
+            "SELECT script, outcome, COALESCE(dry_run, 0), COALESCE(fallbacks, 0), time_to_confirm,"
+            " python_peak_mb, browser_peak_mb, started_at FROM runs ORDER BY started_at"
+        ).fetchall()
+        steps = conn.execute(
+            "SELECT runs.script, steps.name, steps.seconds, steps.ok FROM steps JOIN runs ON runs.id = steps.run_id"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    runs_total, attempts, successes, waitlists, fallbacks = {}, {}, {}, {}, {}
+    confirm_times, python_rss, browser_rss, last_run, last_success = {}, {}, {}, {}, {}
+    for script, outcome, dry_run, lost, to_confirm, python_mb, browser_mb, started_at in runs:
+        runs_total[script, outcome] = runs_total.get((script, outcome), 0) + 1
+        last_run[script] = timestamp(started_at)
+        if python_mb is not None:
+            python_rss[script] = python_mb
+        if browser_mb is not None:
+            browser_rss[script] = browser_mb
+        if dry_run or outcome in HELPER_OUTCOMES or outcome in SKIPPED_OUTCOMES:
+            continue
+        attempts[script] = attempts.get(script, 0) + 1
+        # Scripts that have attempted but never succeeded still get 0 series for alerting
+        for counter in (successes, waitlists, fallbacks):
+            counter.setdefault(script, 0)
+        if outcome in SUCCESS_OUTCOMES:
+            successes[script] += 1
+            waitlists[script] += outcome == "waitlisted"
+            fallbacks[script] += lost
+            last_success[script] = timestamp(started_at)
+            if to_confirm is not None:
+                confirm_times.setdefault((("script", script),), []).append(to_confirm)
+
+    step_times, step_failures = {}, {}
+    for script, name, seconds, ok in steps:
+        if ok:
+            step_times.setdefault((("script", script), ("step", name)), []).append(seconds)
+        else:
+            step_failures[script, name] = step_failures.get((script, name), 0) + 1
+
+    def per_script(values, scale=1):
+        return [({"script": script}, value * scale) for script, value in sorted(values.items())]
+
+    out = Exposition()
+    out.family("bayclub_runs_total", "counter", "Recorded booking runs by outcome",
+               [({"script": script, "outcome": outcome}, count) for (script, outcome), count in sorted(runs_total.items())])
+    out.family("bayclub_attempts_total", "counter", "Booking attempts, excluding dry runs, helper sessions and ledger skips",
+               per_script(attempts))
+    out.family("bayclub_successes_total", "counter", "Attempts that booked or joined the waitlist",
+               per_script(successes))
+    out.family("bayclub_waitlists_total", "counter", "Attempts that joined the waitlist", per_script(waitlists))
+    out.family("bayclub_fallbacks_total", "counter", "Ranked court times lost before the one that was booked",
+               per_script(fallbacks))
+    out.histogram("bayclub_step_seconds", "Duration of successful booking steps", step_times, STEP_BUCKETS)
+    out.family("bayclub_step_failures_total", "counter", "Booking steps that raised",
+               [({"script": script, "step": name}, count) for (script, name), count in sorted(step_failures.items())])
+    out.histogram("bayclub_time_to_confirm_seconds", "Seconds from run start to a confirmed booking",
+                  confirm_times, CONFIRM_BUCKETS)
+    out.family("bayclub_python_peak_rss_bytes", "gauge", "Peak RSS of Python in the latest run",
+               per_script(python_rss, 1024 * 1024))
+    out.family("bayclub_browser_peak_rss_bytes", "gauge", "Peak RSS of the browser process tree in the latest run",
+               per_script(browser_rss, 1024 * 1024))
+    out.family("bayclub_last_run_timestamp_seconds", "gauge", "Start time of the latest run", per_script(last_run))
+    out.family("bayclub_last_success_timestamp_seconds", "gauge", "Start time of the latest successful attempt",
+               per_script(last_success))
+    return out.text()
+
+
+def write_textfile(path=METRICS_TEXTFILE, history=HISTORY_DB):
+    """Rewrite the textfile collector file atomically; never raises"""
+    if not path:
+        return
+    try:
+        text = render(history)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # node_exporter only reads *.prom, so the temporary file is never picked up half-written
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logging.warning(f"Failed to write metrics to {path}: {e}")
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    history = HISTORY_DB
+
+    def log_message(self, format, *args):
+        logging.debug("metrics: " + format % args)
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        try:
+            body = render(self.history).encode()
+            self.send_response(200)
+        except Exception as e:
+            logging.warning(f"Failed to render metrics: {e}")
+            body = f"# error: {e}\n".encode()
+            self.send_response(500)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(port=METRICS_PORT, host="127.0.0.1", history=HISTORY_DB):
+    handler = type("Handler", (MetricsHandler,), {"history": history})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    logging.info(f"Serving metrics at http://{host}:{httpd.server_address[1]}/metrics")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    if argv and argv[0] == "serve":
+        serve(port=int(arg('--port', METRICS_PORT)), host=arg('--host', "127.0.0.1"))
+    elif argv and argv[0] == "write":
+        path = arg('--path', METRICS_TEXTFILE)
+        if not path:
+            print("Set BAYCLUB_METRICS_TEXTFILE or pass --path")
+            return 1
+        write_textfile(path)
+    else:
+        sys.stdout.write(render())
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s',
+        datefmt='%d-%b-%y %H:%M:%S'
+    )
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,143 @@
+"""
+Fake Google Calendar service for exercising calendar_mirror.py without the API
+
+Implements the slice of the googleapiclient interface the scripts use
+(service.events().list(...).execute() and .insert(...).execute()), with small
+pages, sync tokens that return only the changes since they were issued, deleted
+events reported as status "cancelled", and 410 Gone once tokens are expired.
+"""
+import time
+import random
+import datetime
+from availability import CLUB_TZ, parse_event_time
+
+
+class FakeHttpError(Exception):
+    """Stands in for googleapiclient.errors.HttpError (only .resp.status is used)"""
+
+    class _Resp:
+        def __init__(self, status):
+            self.status = status
+
+    def __init__(self, status, message=""):
+        super().__init__(f"HTTP {status} {message}".strip())
+        self.resp = self._Resp(status)
+
+
+class _Request:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def execute(self):
+        return self.fn()
+
+
+class _Events:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, **params):
+        return _Request(lambda: self.service.list_events(**params))
+
+    def insert(self, calendarId, body):
+        return _Request(lambda: self.service.add_event(body))
+
+
+class FakeCalendarService:
+    """In-memory calendar with a change log; every mutation gets a sequence number"""
+
+    def __init__(self, page_size=50, latency=0.0):
+        self.page_size = page_size
+        self.latency = latency
+        self.by_id = {}           # id -> event
+        self.changed_at = {}      # id -> sequence number of last change
+        self.seq = 0
+        self.expired_before = 0   # tokens issued before this sequence number get 410
+        self.calls = 0
+        self._next_id = 0
+
+    def events(self):
+        return _Events(self)
+
+    # --- mutations -----------------------------------------------------------------
+
+    def _touch(self, event_id):
+        self.seq += 1
+        self.changed_at[event_id] = self.seq
+
+    def add_event(self, body):
+        self._next_id += 1
+        event = dict(body, id=body.get("id", f"evt{self._next_id}"), status="confirmed")
+        self.by_id[event["id"]] = event
+        self._touch(event["id"])
+        return event
+
+    def move_event(self, event_id, minutes):
+        event = self.by_id[event_id]
+        for side in ("start", "end"):
+            moved = parse_event_time(event[side]["dateTime"]) + datetime.timedelta(minutes=minutes)
+            event[side] = {"dateTime": moved.isoformat()}
+        self._touch(event_id)
+
+    def delete_event(self, event_id):
+        self.by_id[event_id]["status"] = "cancelled"
+        self._touch(event_id)
+
+    def expire_tokens(self):
+        """Make every sync token issued so far return 410 Gone"""
+        self.expired_before = self.seq + 1
+
+    def populate(self, start_date, days, per_day=4, seed=0):
+        """Random 30-120 minute events between 7am and 9pm"""
+        rng = random.Random(seed)
+        for offset in range(days):
+            date = start_date + datetime.timedelta(days=offset)
+            for _ in range(per_day):
+                start = datetime.datetime.combine(date, datetime.time(rng.randint(7, 20), rng.choice((0, 30))), tzinfo=CLUB_TZ)
+                end = start + datetime.timedelta(minutes=rng.choice((30, 60, 90, 120)))
+                self.add_event({"summary": f"Event {self._next_id + 1}",
+                                "start": {"dateTime": start.isoformat()}, "end": {"dateTime": end.isoformat()}})
+
+    # --- listing -------------------------------------------------------------------
+
+    def list_events(self, calendarId="primary", syncToken=None, timeMin=None, timeMax=None, pageToken=None,
+                    showDeleted=False, **_):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if pageToken:
+            # Page tokens carry the original query: "<offset>|<since seq>|<snapshot seq>|<timeMin>|<timeMax>"
+            offset, since, snapshot, timeMin, timeMax = pageToken.split("|")
+            offset, since, snapshot = int(offset), int(since), int(snapshot)
+            timeMin, timeMax = timeMin or None, timeMax or None
+        else:
+            offset, snapshot = 0, self.seq
+            if syncToken:
+                since = int(syncToken.removeprefix("sync-"))
+                if since < self.expired_before:
+                    raise FakeHttpError(410, "Sync token is no longer valid, a full sync is required.")
+            else:
+                since = 0
+
+        lower = parse_event_time(timeMin) if timeMin else None
+        upper = parse_event_time(timeMax) if timeMax else None
+        matching = []
+        for event_id, event in self.by_id.items():
+            if not since < self.changed_at[event_id] <= snapshot:
+                continue
+            if event["status"] == "cancelled" and not (since or showDeleted):
+                continue
+            if lower and parse_event_time(event["end"]["dateTime"]) <= lower:
+                continue
+            if upper and parse_event_time(event["start"]["dateTime"]) >= upper:
+                continue
+            matching.append(event)
+        matching.sort(key=lambda event: event["start"]["dateTime"])
+
+        page = {"items": [dict(event) for event in matching[offset:offset + self.page_size]]}
+        if offset + self.page_size < len(matching):
+            page["nextPageToken"] = f"{offset + self.page_size}|{since}|{snapshot}|{timeMin or ''}|{timeMax or ''}"
+        else:
+            page["nextSyncToken"] = f"sync-{snapshot}"
+        return page
@@ -0,0 +1,700 @@
+"""
+Local mock of Bay Club Connect for end-to-end runs and benchmarks
+
+Serves the login, dashboard, club modal, Schedule Activity, Fitness class list,
+court time slot, confirmation and My Reservations pages with the same element
+paths the booking scripts click through, plus the JSON API behind them (the
+class and court pages fetch their data from it, like the real app). Latency,
+class capacity, court count, failures, the booking release instant, the
+club's court rules (reservations per member per day, cancellation notice) and
+a skewed server clock are configurable.
+
+Point the booking scripts at it with BAYCLUB_BASE_URL:
+
+    python3 mock_server.py --port 8765 --latency 0.2 --capacity 20 --failure-rate 0.05
+    BAYCLUB_BASE_URL=http://127.0.0.1:8765 BAYCLUB_HEADLESS=1 \\
+        BAYCLUB_USERNAME=test BAYCLUB_PASSWORD=test python3 app.py --force
+
+Or in-process:
+
+    with MockBayClubServer(MockConfig(latency=0.1)) as server:
+        os.environ["BAYCLUB_BASE_URL"] = server.base_url
+"""
+import sys
+import json
+import time
+import html
+import random
+import datetime
+import logging
+import threading
+from dataclasses import dataclass, field
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, urlencode
+
+# Same order as the real modal, so bayclub_base.CLUBS indexes line up (Gateway = 2, San Francisco = 4)
+CLUB_NAMES = ["Broadway", "Gateway", "Redwood Shores", "San Francisco", "Santa Clara"]
+DAY_CODES = ["Mo", "Tu", "We", "Th", "Fr", "Sa", "Su"]
+PLAYERS = [
+    "Alex Chen", "Sam Patel", "Jordan Lee", "Taylor Kim", "Morgan Diaz", "Casey Nguyen",
+    "Riley Brooks", "Jamie Park", "Avery Shah", "Quinn Rivera", "Drew Martin", "Reese Wong",
+    "Skyler Adams", "Rowan Ali", "Partner Player", "Emerson Cruz", "Hayden Moore", "Parker Silva",
+]
+# Position of the Ignite class in the class list (app-classes-list/div/div[24])
+IGNITE_INDEX = 24
+CLASSES_PER_DAY = 30
+
+
+@dataclass
+class MockConfig:
+    latency: float = 0.0          # seconds added to every page load
+    api_latency: float = 0.0      # seconds added to every /api call
+    capacity: int = 20            # spots per class
+    courts: int = 4               # courts per time slot
+    prebooked: float = 0.3        # fraction of court slots already taken
+    failure_rate: float = 0.0     # chance any page or API call returns a 500
+    fail: set = field(default_factory=set)  # route names that always fail (e.g. {"book", "court-book"})
+    release_at: float = None      # epoch seconds (server clock) when booking opens; None means always open
+    seed: int = 1
+    # Club rules for courts: reservations per member per day, and how late one can still be cancelled
+    max_court_bookings_per_day: int = None
+    min_cancel_notice_hours: float = 0.0
+    # The server's clock runs this many seconds ahead of the local one (Date headers, release_at)
+    clock_skew: float = 0.0
+    timestamp_header: bool = False  # also send the exact server time in X-Server-Time
+
+
+def nest(root, path):
+    """Walk/create children of root along an XPath-like path ("div/div[2]/span"), returning the last node"""
+    node = root
+    for step in path.strip("/").split("/"):
+        tag, _, index = step.partition("[")
+        index = int(index.rstrip("]")) if index else 1
+        matches = [c for c in node.children if c.tag == tag]
+        while len(matches) < index:
+            filler = Node(tag)
+            node.children.append(filler)
+            matches.append(filler)
+        node = matches[index - 1]
+    return node
+
+
+class Node:
+    """Tiny HTML tree so positional paths are correct by construction"""
+
+    VOID = {"img", "input", "br", "meta"}
+
+    def __init__(self, tag, text="", **attrs):
+        self.tag = tag
+        self.text = text
+        self.attrs = attrs
+        self.children = []
+
+    def at(self, path, text=None, **attrs):
+        node = nest(self, path)
+        if text is not None:
+            node.text = text
+        node.attrs.update(attrs)
+        return node
+
+    def add(self, tag, text="", **attrs):
+        child = Node(tag, text, **attrs)
+        self.children.append(child)
+        return child
+
+    def render(self):
+        attrs = "".join(
+            f' {k.rstrip("_").replace("_", "-")}="{html.escape(str(v))}"' for k, v in self.attrs.items() if v is not None
+        )
+        if self.tag in self.VOID:
+            return f"<{self.tag}{attrs}>"
+        text = self.text if self.tag == "script" else html.escape(self.text)
+        inner = text + "".join(c.render() for c in self.children)
+        return f"<{self.tag}{attrs}>{inner}</{self.tag}>"
+
+
+SCRIPT = """
+function show(id) { document.getElementById(id).style.display = 'block'; }
+function hide(id) { document.getElementById(id).style.display = 'none'; }
+async function post(url, body) {
+  const r = await fetch(url, {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(body)});
+  return [r.status, await r.json().catch(() => ({}))];
+}
+function showClass(id, name, when, full) {
+  document.getElementById('class-title').textContent = name + ' ' + when;
+  const b = document.getElementById('book-class');
+  b.dataset.classId = id;
+  b.textContent = full ? 'Add to waitlist' : 'Book class';
+  show('class-details');
+}
+async function confirmClass() {
+  const [status, body] = await post('/api/book', {classId: document.getElementById('book-class').dataset.classId});
+  hide('modal');
+  document.getElementById('result').textContent = body.message || ('Error ' + status);
+}
+function selectSlot(el, id) {
+  document.querySelectorAll('app-court-time-slot-item').forEach(e => e.classList.remove('selected'));
+  el.classList.add('selected');
+  const next = document.getElementById('slot-next');
+  next.disabled = false;
+  next.dataset.slotId = id;
+}
+async function confirmCourt(id) {
+  const [status, body] = await post('/api/court-book', {slotId: id});
+  document.getElementById('result').textContent = body.message || ('Error ' + status);
+}
+async function cancelCourt(el, id) {
+  const [status, body] = await post('/api/court-cancel', {slotId: id});
+  document.getElementById('result').textContent = body.message || ('Error ' + status);
+  if (status == 200) el.closest('app-reservation-item').remove();
+}
+"""
+
+
+class MockState:
+    """Bookings and sessions shared by all request threads"""
+
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self.class_bookings = {}   # class id -> list of users
+        self.court_bookings = {}   # slot id -> list of users
+        self.rng = random.Random(config.seed)
+        self.prebooked = {}
+        self.booking_log = []      # (arrived, user, class or slot id, status) for every booking request
+
+    def now(self):
+        """Epoch seconds by the server's (possibly skewed) clock"""
+        return time.time() + self.config.clock_skew
+
+    def released(self):
+        return self.config.release_at is None or self.now() >= self.config.release_at
+
+    def classes(self, club, date):
+        """Classes for a club and date; the Ignite class sits at IGNITE_INDEX"""
+        result = []
+        for i in range(1, CLASSES_PER_DAY + 1):
+            if i == IGNITE_INDEX:
+                name, start = "Ignite", datetime.time(17, 30)
+            else:
+                name = ["Cycle", "Yoga", "Pilates", "Barre", "Strength", "HIIT"][i % 6]
+                minutes = 6 * 60 + (i * 30) % (14 * 60)
+                start = datetime.time(minutes // 60, minutes % 60)
+            class_id = f"{club}|{date}|{i}"
+            booked = len(self.class_bookings.get(class_id, []))
+            result.append({
+                "id": class_id,
+                "name": name,
+                "startTime": start.strftime("%-I:%M %p"),
+                "date": date.isoformat(),
+                "spotsLeft": max(0, self.config.capacity - booked),
+                "isBookable": self.released() and booked < self.config.capacity,
+            })
+        return result
+
+    def court_slots(self, club, date, duration=90):
+        """90-minute court slots every 30 minutes from 7 AM, with the remaining court count"""
+        slots = []
+        for minutes in range(7 * 60, 20 * 60 + 1, 30):
+            start = datetime.datetime.combine(date, datetime.time(minutes // 60, minutes % 60))
+            end = start + datetime.timedelta(minutes=duration)
+            slot_id = f"{club}|{start.isoformat()}|{duration}"
+            if slot_id not in self.prebooked:
+                self.prebooked[slot_id] = sum(self.rng.random() < self.config.prebooked for _ in range(self.config.courts))
+            taken = self.prebooked[slot_id] + len(self.court_bookings.get(slot_id, []))
+            slots.append({
+                "id": slot_id,
+                "startTime": start.strftime("%-I:%M %p"),
+                "label": slot_label(start, end),
+                "duration": duration,
+                "courtsLeft": max(0, self.config.courts - taken),
+                "isAvailable": self.released() and taken < self.config.courts,
+            })
+        return slots
+
+    def book_class(self, user, class_id):
+        club, date, _ = class_id.split("|")
+        if not self.released():
+            return 403, {"message": "Booking not open yet"}
+        with self.lock:
+            cls = next((c for c in self.classes(club, datetime.date.fromisoformat(date)) if c["id"] == class_id), None)
+            if not cls:
+                return 404, {"message": "Class not found"}
+            if user in self.class_bookings.get(class_id, []):
+                return 200, {"message": "Already booked"}
+            if not cls["isBookable"]:
+                return 409, {"message": "Added to waitlist", "waitlisted": True}
+            self.class_bookings.setdefault(class_id, []).append(user)
+            return 200, {"message": "Class booked", "booked": True}
+
+    def book_court(self, user, slot_id):
+        club, start, duration = slot_id.split("|")
+        date = datetime.datetime.fromisoformat(start).date()
+        if not self.released():
+            return 403, {"message": "Booking not open yet"}
+        with self.lock:
+            slot = next((s for s in self.court_slots(club, date, int(duration)) if s["id"] == slot_id), None)
+            if not slot:
+                return 404, {"message": "Slot not found"}
+            if user in self.court_bookings.get(slot_id, []):
+                return 200, {"message": "Already booked"}
+            if not slot["isAvailable"]:
+                return 409, {"message": "Slot no longer available"}
+            limit = self.config.max_court_bookings_per_day
+            if limit is not None and sum(1 for r in self.reservations(user)
+                                        if r["date"] == date.isoformat() and r["activity"] == "Tennis") >= limit:
+                return 409, {"message": "Reservation limit reached for this day"}
+            self.court_bookings.setdefault(slot_id, []).append(user)
+            return 200, {"message": "Reservation confirmed", "booked": True}
+
+    def cancel_court(self, user, slot_id):
+        with self.lock:
+            if user not in self.court_bookings.get(slot_id, []):
+                return 404, {"message": "Reservation not found"}
+            start = datetime.datetime.fromisoformat(slot_id.split("|")[1])
+            if start - datetime.datetime.now() < datetime.timedelta(hours=self.config.min_cancel_notice_hours):
+                return 409, {"message": "Too late to cancel this reservation"}
+            self.court_bookings[slot_id].remove(user)
+            return 200, {"message": "Reservation cancelled", "cancelled": True}
+
+    def reservations(self, user):
+        """A member's class and court reservations, soonest first"""
+        result = []
+        for class_id, users in self.class_bookings.items():
+            if user in users:
+                club, date, index = class_id.split("|")
+                cls = self.classes(club, datetime.date.fromisoformat(date))[int(index) - 1]
+                result.append({
+                    "id": class_id,
+                    "club": club,
+                    "date": date,
+                    "startTime": cls["startTime"],
+                    "label": cls["startTime"],
+                    "activity": cls["name"],
+                })
+        for slot_id, users in self.court_bookings.items():
+            if user in users:
+                club, start, duration = slot_id.split("|")
+                start = datetime.datetime.fromisoformat(start)
+                result.append({
+                    "id": slot_id,
+                    "club": club,
+                    "date": start.date().isoformat(),
+                    "startTime": start.strftime("%-I:%M %p"),
+                    "label": slot_label(start, start + datetime.timedelta(minutes=int(duration))),
+                    "activity": "Tennis",
+                })
+        return sorted(result, key=lambda r: (r["date"], datetime.datetime.strptime(r["startTime"], "%I:%M %p")))
+
+
+def slot_label(start, end):
+    """Court slot text as the site shows it, e.g. "10:00 - 11:30 AM" or "11:30 AM - 1:00 PM\""""
+    if start.strftime("%p") == end.strftime("%p"):
+        return f"{start.strftime('%-I:%M')} - {end.strftime('%-I:%M %p')}"
+    return f"{start.strftime('%-I:%M %p')} - {end.strftime('%-I:%M %p')}"
+
+
+def week_slider(root, path, selected, href):
+    """Date slider of two Monday-based weeks; past days have no label, like the real slider"""
+    today = datetime.date.today()
+    monday = today - datetime.timedelta(days=today.weekday())
+    for week in range(2):
+        for offset in range(7):
+            day = monday + datetime.timedelta(days=week * 7 + offset)
+            item = root.at(f"{path}/gallery-item[{week + 1}]/div/div/div[{offset + 1}]",
+                           onclick=f"location.href='{href(day)}'",
+                           class_="selected" if day == selected else None)
+            item.at("div[1]", text=DAY_CODES[offset] if day >= today else "")
+            item.at("div[2]", text=str(day.day))
+
+
+class Page:
+    """Builds one HTML page around the shared app-root layout"""
+
+    def __init__(self, club=None):
+        self.root = Node("html")
+        self.root.at("head/title", text="Bay Club Connect")
+        self.root.at("head/script", text=SCRIPT)
+        self.body = self.root.at("body")
+        self.app = self.root.at("body/app-root/div")
+        if club:
+            self.app.at("app-navbar/nav/div/div/button/span", text="Schedule Activity",
+                        onclick="location.href='/home/schedule'")
+            self.app.at("app-navbar/nav/div/span", text=f"Bay Club {club}", id="club-name")
+        self.body.add("div", id="result")
+
+    def render(self):
+        return "<!DOCTYPE html>" + self.root.render()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server_version = "MockBayClub/1.0"
+    state = None  # set per server
+
+    def log_message(self, format, *args):
+        logging.debug("mock: " + format % args)
+
+    def date_time_string(self, timestamp=None):
+        # Date headers come from the server's clock
+        return super().date_time_string(self.state.now() if timestamp is None else timestamp)
+
+    def end_headers(self):
+        if self.state.config.timestamp_header:
+            self.send_header("X-Server-Time", f"{self.state.now():.6f}")
+        super().end_headers()
+
+    # --- plumbing -------------------------------------------------------------------------
+
+    def _session(self):
+        cookie = self.headers.get("Cookie", "")
+        for part in cookie.split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "mock_session" and value in self.state.sessions:
+                return self.state.sessions[value]
+        return None
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        data = body.encode() if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self, status, payload):
+        self._send(status, json.dumps(payload), "application/json")
+
+    def _redirect(self, location, headers=None):
+        self.send_response(303)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _inject(self, route, is_api):
+        """Apply configured latency and failures; returns True if the request was failed"""
+        config = self.state.config
+        delay = config.api_latency if is_api else config.latency
+        if delay:
+            time.sleep(delay)
+        if route in config.fail or (route != "login" and self.state.rng.random() < config.failure_rate):
+            if is_api:
+                self._json(500, {"message": "Injected failure"})
+            else:
+                self._send(500, "<html><body>Injected failure</body></html>")
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        routes = {
+            "/home/dashboard": ("dashboard", self.page_dashboard),
+            "/home/schedule": ("schedule", self.page_schedule),
+            "/classes": ("classes", self.page_classes),
+            "/racquet-sports": ("racquet", self.page_racquet_filter),
+            "/racquet-sports/time-slots": ("time-slots", self.page_time_slots),
+            "/racquet-sports/confirm": ("court-confirm", self.page_court_confirm),
+            "/home/reservations": ("reservations", self.page_reservations),
+            "/select-club": ("select-club", self.select_club),
+            "/api/classes": ("classes-api", self.api_classes),
+            "/api/court-slots": ("court-slots-api", self.api_court_slots),
+            "/api/reservations": ("reservations-api", self.api_reservations),
+        }
+        if url.path == "/":
+            return self._redirect("/home/dashboard")
+        if url.path not in routes:
+            return self._send(404, "<html><body>Not found</body></html>")
+        route, handler = routes[url.path]
+        if self._inject(route, url.path.startswith("/api/")):
+            return
+        session = self._session()
+        if session is None and route != "dashboard":
+            if url.path.startswith("/api/"):
+                return self._json(401, {"message": "Not logged in"})
+            return self._redirect("/home/dashboard")
+        handler(session, query)
+
+    def do_HEAD(self):
+        # Clock probes (clock_sync.py) ask for a static file: headers only, never a page
+        if self.state.config.latency:
+            time.sleep(self.state.config.latency)
+        self.send_response(200 if urlparse(self.path).path == "/favicon.ico" else 404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        self.arrived = self.state.now()
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length).decode() if length else ""
+        routes = {
+            "/login": ("login", self.login),
+            "/api/book": ("book", self.api_book),
+            "/api/court-book": ("court-book", self.api_court_book),
+            "/api/court-cancel": ("court-cancel", self.api_court_cancel),
+        }
+        if url.path not in routes:
+            return self._json(404, {"message": "Not found"})
+        route, handler = routes[url.path]
+        if self._inject(route, url.path.startswith("/api/")):
+            return
+        if url.path == "/login":
+            return handler({k: v[0] for k, v in parse_qs(raw).items()})
+        session = self._session()
+        if session is None:
+            return self._json(401, {"message": "Not logged in"})
+        handler(session, json.loads(raw or "{}"))
+
+    # --- pages ----------------------------------------------------------------------------
+
+    def page_login(self):
+        page = Page()
+        form = page.app.at("div/form", method="post", action="/login")
+        form.add("input", id="username", name="username", type="text")
+        form.add("input", id="password", name="password", type="password")
+        form.add("button", "Log in", class_="btn-light-blue", type="submit")
+        self._send(200, page.render())
+
+    def login(self, form):
+        token = f"{random.getrandbits(64):016x}"
+        self.state.sessions[token] = {"user": form.get("username", "member"), "club": None}
+        self._redirect("/home/dashboard", {"Set-Cookie": f"mock_session={token}; Path=/"})
+
+    def page_dashboard(self, session, query):
+        if session is None:
+            return self.page_login()
+        page = Page(session["club"] or "Gateway")
+        page.app.at("app-dashboard/div/div/div[1]/div[1]/app-club-context-select/div/span[4]",
+                    text="Change club", onclick="show('modal')")
+
+        page.body.at("modal-container", id="modal", style="display:none")
+        modal = page.body.at("modal-container/div[2]/div/app-club-context-select-modal/div[2]/div/app-schedule-visit-club/div")
+        radios = modal.at("div[1]/div/div[2]/div/div[3]/div[1]/div/div[2]/app-radio-select/div")
+        for i, name in enumerate(CLUB_NAMES, start=1):
+            radios.at(f"div[{i}]/div/div[2]/div/span", text=name,
+                      onclick=f"document.getElementById('modal').dataset.club='{name}'")
+        modal.at("div[2]/div/div", text="Save",
+                 onclick="location.href='/select-club?club=' + encodeURIComponent(document.getElementById('modal').dataset.club || '')")
+        self._send(200, page.render())
+
+    def select_club(self, session, query):
+        if query.get("club"):
+            session["club"] = query["club"]
+        self._redirect("/home/dashboard")
+
+    def page_schedule(self, session, query):
+        page = Page(session["club"] or "Gateway")
+        visit = page.app.at("app-schedule-visit/div/div/div[2]")
+        visit.at("div[1]/div[2]/div/div/img", alt="Court Booking", src="data:,", width="40", height="40",
+                 onclick="location.href='/racquet-sports'")
+        visit.at("div[2]/div[2]/div[2]/div/span", text="Fitness", onclick="location.href='/classes'")
+        self._send(200, page.render())
+
+    def page_classes(self, session, query):
+        club = session["club"] or "San Francisco"
+        date = datetime.date.fromisoformat(query["date"]) if "date" in query else datetime.date.today()
+        page = Page(club)
+        shell = page.app.at("app-classes-shell")
+        classes = shell.at("app-classes/div")
+        week_slider(classes, "div[2]/div/app-classes-filters/div/form/div[4]/div/app-date-slider/div/div[2]/gallery/gallery-core/div/gallery-slider/div/div",
+                    date, lambda d: f"/classes?date={d.isoformat()}")
+        classes.at("div[3]/div/app-classes-date/div/span[1]", text="Classes for")
+        classes.at("div[3]/div/app-classes-date/div/span[2]", text=date.strftime("%A, %B %-d"))
+
+        items = classes.at("app-classes-list/div")
+        for i, cls in enumerate(self.state.classes(club, date), start=1):
+            item = items.at(f"div[{i}]/app-classes-can-book-item/app-class-list-item/div")
+            args = json.dumps([cls["id"], cls["name"], cls["startTime"], not cls["isBookable"]])[1:-1]
+            item.at("div[1]/div[1]", text=f"{cls['name']} {cls['startTime']}",
+                    onclick=f"showClass({args})")
+            item.at("div[1]/div[2]", text=f"{cls['spotsLeft']} spots left")
+
+        details = shell.at("app-classes-details", id="class-details", style="display:none")
+        body = details.at("div/div/app-book-class-details/app-class-details/div/div[2]/div[1]/div")
+        body.at("div[1]", id="class-title")
+        body.at("div[4]/button", text="Book class", id="book-class", onclick="show('modal')")
+
+        page.body.at("modal-container", id="modal", style="display:none")
+        confirm = page.body.at("modal-container/div[2]/div/app-universal-confirmation-modal/div[2]/div/div")
+        confirm.at("div[1]", text="Confirm your booking")
+        confirm.at("div[4]/div/button[1]/span", text="Confirm", onclick="confirmClass()")
+        confirm.at("div[4]/div/button[2]/span", text="Cancel", onclick="hide('modal')")
+        # The real app loads the class list as JSON; fetch it the same way so slot_feed.py sees it
+        page.body.add("script", f"fetch({json.dumps('/api/classes?' + urlencode({'club': club, 'date': date.isoformat()}))});")
+        self._send(200, page.render())
+
+    def page_racquet_filter(self, session, query):
+        page = Page(session["club"] or "Gateway")
+        filt = page.app.at("ng-component/app-racquet-sports-filter")
+        categories = filt.at("div[1]/div[1]/div/div/app-court-booking-category-select/div")
+        categories.at("div[1]/div/div[2]", text="Tennis", onclick="show('durations')")
+        categories.at("div[2]/div/div[2]", text="Pickleball")
+        durations = filt.at("div[1]/div[2]", id="durations", style="display:none")
+        buttons = durations.at("div[2]/app-button-select/div")
+        for i, label in enumerate(["30 min", "60 min", "90 min"], start=1):
+            minutes = label.split()[0]
+            buttons.at(f"div[{i}]/span", text=label,
+                       onclick=f"document.getElementById('filter-next').dataset.duration='{minutes}'")
+        filt.at("div[2]/app-racquet-sports-reservation-summary/div/div/div/div/button", text="Next", id="filter-next",
+                onclick="location.href='/racquet-sports/time-slots?duration=' + (this.dataset.duration || '90')")
+        self._send(200, page.render())
+
+    def page_time_slots(self, session, query):
+        club = session["club"] or "Gateway"
+        date = datetime.date.fromisoformat(query["date"]) if "date" in query else datetime.date.today()
+        duration = int(query.get("duration", 90))
+        page = Page(club)
+        select = page.app.at("ng-component/app-racquet-sports-time-slot-select")
+        week_slider(select, "div[1]/div/div[2]/div/app-date-slider/div/div[2]/gallery/gallery-core/div/gallery-slider/div/div",
+                    date, lambda d: f"/racquet-sports/time-slots?{urlencode({'date': d.isoformat(), 'duration': duration})}")
+
+        court_select = select.at("div[1]/div/div[3]/div/div/app-court-time-slot-select[1]/div")
+        views = court_select.at("div[2]/div/app-time-slot-view-type-select/app-button-select/div")
+        views.at("div[1]/span", text="COURT VIEW")
+        views.at("div[2]/span", text="HOUR VIEW", onclick="this.classList.add('selected')")
+        slot_list = court_select.at("div[3]")
+        for slot in self.state.court_slots(club, date, duration):
+            if slot["isAvailable"]:
+                item = slot_list.add("app-court-time-slot-item", onclick=f"selectSlot(this, '{slot['id']}')")
+                item.add("div", slot["label"])
+
+        select.at("div[2]/app-racquet-sports-reservation-summary/div/div/div/div[1]", text="Select a time")
+        select.at("div[2]/app-racquet-sports-reservation-summary/div/div/div/div[2]/button", text="Next",
+                  id="slot-next", disabled="disabled",
+                  onclick="location.href='/racquet-sports/confirm?slot=' + encodeURIComponent(this.dataset.slotId)")
+        slots_query = urlencode({"club": club, "date": date.isoformat(), "duration": duration})
+        page.body.add("script", f"fetch({json.dumps('/api/court-slots?' + slots_query)});")
+        self._send(200, page.render())
+
+    def page_court_confirm(self, session, query):
+        slot_id = query.get("slot", "")
+        page = Page(session["club"] or "Gateway")
+        confirm = page.app.at("ng-component/app-racquet-sports-confirm-booking")
+        players = confirm.at("div[1]/div/div/div/div/div[2]/app-racquet-sports-player-select/div")
+        for i, name in enumerate(PLAYERS, start=1):
+            person = players.at(f"div[{i}]/app-racquet-sports-person/div")
+            person.at("div[1]/div/div", text="+", onclick="this.classList.toggle('selected')")
+            person.at("div[2]/span", text=name)
+        confirm.at("div[2]/button", text="CONFIRM", onclick=f"confirmCourt({json.dumps(slot_id)})")
+        self._send(200, page.render())
+
+    def page_reservations(self, session, query):
+        page = Page(session["club"] or "Gateway")
+        items = page.app.at("app-my-reservations/div")
+        for i, reservation in enumerate(self.state.reservations(session["user"]), start=1):
+            item = items.at(f"div[{i}]/app-reservation-item/div")
+            date = datetime.date.fromisoformat(reservation["date"])
+            item.at("div[1]/span[1]", text=f"Bay Club {reservation['club']}")
+            item.at("div[1]/span[2]", text=date.strftime("%A, %B %-d"))
+            item.at("div[1]/span[3]", text=reservation["label"])
+            item.at("div[1]/span[4]", text=reservation["activity"])
+            if reservation["activity"] == "Tennis":
+                item.at("div[2]/button", text="Cancel", onclick=f"cancelCourt(this, {json.dumps(reservation['id'])})")
+        if not self.state.reservations(session["user"]):
+            items.at("div[1]", text="You have no upcoming reservations", class_="empty-state")
+        page.body.add("script", "fetch('/api/reservations');")
+        self._send(200, page.render())
+
+    # --- API ------------------------------------------------------------------------------
+
+    def api_classes(self, session, query):
+        club = query.get("club") or session["club"] or "San Francisco"
+        date = datetime.date.fromisoformat(query["date"]) if "date" in query else datetime.date.today()
+        self._json(200, {"club": club, "date": date.isoformat(), "classes": self.state.classes(club, date)})
+
+    def api_court_slots(self, session, query):
+        club = query.get("club") or session["club"] or "Gateway"
+        date = datetime.date.fromisoformat(query["date"]) if "date" in query else datetime.date.today()
+        slots = self.state.court_slots(club, date, int(query.get("duration", 90)))
+        self._json(200, {"club": club, "date": date.isoformat(), "slots": slots})
+
+    def api_reservations(self, session, query):
+        self._json(200, {"reservations": self.state.reservations(session["user"])})
+
+    def api_book(self, session, body):
+        status, payload = self.state.book_class(session["user"], body.get("classId", ""))
+        self.state.booking_log.append((self.arrived, session["user"], body.get("classId"), status))
+        self._json(status, payload)
+
+    def api_court_book(self, session, body):
+        status, payload = self.state.book_court(session["user"], body.get("slotId", ""))
+        self.state.booking_log.append((self.arrived, session["user"], body.get("slotId"), status))
+        self._json(status, payload)
+
+    def api_court_cancel(self, session, body):
+        status, payload = self.state.cancel_court(session["user"], body.get("slotId", ""))
+        self._json(status, payload)
+
+
+class MockBayClubServer:
+    """Runs the mock site on a background thread; use as a context manager"""
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or MockConfig()
+        self.state = MockState(self.config)
+        handler = type("BoundMockHandler", (MockHandler,), {"state": self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="mock-bayclub", daemon=True)
+        self.thread.start()
+        logging.info(f"Mock Bay Club running at {self.base_url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    skew = float(arg('--clock-skew', 0))
+    config = MockConfig(
+        latency=float(arg('--latency', 0)),
+        api_latency=float(arg('--api-latency', arg('--latency', 0))),
+        capacity=int(arg('--capacity', 20)),
+        courts=int(arg('--courts', 4)),
+        prebooked=float(arg('--prebooked', 0.3)),
+        failure_rate=float(arg('--failure-rate', 0)),
+        fail=set(filter(None, arg('--fail', '').split(','))),
+        release_at=time.time() + skew + float(arg('--release-in', 0)) if '--release-in' in argv else None,
+        max_court_bookings_per_day=int(arg('--max-court-bookings', 0)) or None,
+        min_cancel_notice_hours=float(arg('--cancel-notice-hours', 0)),
+        clock_skew=skew,
+        timestamp_header='--timestamp-header' in argv,
+    )
+    server = MockBayClubServer(config, port=int(arg('--port', 8765)))
+    print(f"Mock Bay Club running at {server.base_url} (Ctrl-C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s',
+        datefmt='%d-%b-%y %H:%M:%S'
+    )
+    main(sys.argv[1:])
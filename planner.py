@@ -0,0 +1,160 @@
+"""
+Multi-week tennis booking planner
+
+Fetches the calendar for the whole horizon in one listing, finds every free
+90-minute start on the target weekdays in a single pass over a minute-resolution
+busy mask, and ranks them. The browser then walks the plan day by day on the
+court time slot page, moving along the date slider instead of re-navigating.
+
+Usage: python3 planner.py [--horizon 14] [--days Friday,Sunday] [--club Gateway] [--print-only] [--dry-run]
+"""
+import sys
+import datetime
+import logging
+from dataclasses import dataclass
+from availability import AvailabilityMask, CLUB_TZ, FIRST_START, LAST_START, SLOT_STEP
+from policy import WEEKDAYS, load_policy
+from ledger import Target
+
+
+@dataclass(frozen=True)
+class PlannedDay:
+    date: datetime.date
+    candidates: tuple  # aware local datetimes, best first
+
+
+def build_plan(events, start_date, horizon_days, weekdays, duration=90, before=0, after=0,
+               first_minute=FIRST_START, last_minute=LAST_START, step=SLOT_STEP, tz=CLUB_TZ, policy=None):
+    """Rank free court starts on the target weekdays over [start_date, start_date + horizon_days)
+    
+    Starts are ranked by the slot policy (see policy.py).
+
+    Returns:
+        list: PlannedDay per target date that has at least one free start, in date order
+    """
+    mask = AvailabilityMask(start_date, horizon_days, tz).add_events(events)
+    free = mask.free_starts(duration, before, after)
+    target_weekdays = {WEEKDAYS.index(day) for day in weekdays}
+    policy = policy or load_policy()
+
+    plan = []
+    for offset in range(horizon_days):
+        date = start_date + datetime.timedelta(days=offset)
+        if date.weekday() not in target_weekdays:
+            continue
+        starts = mask.starts_on(free, date, first_minute, last_minute, step)
+        if starts:
+            plan.append(PlannedDay(date, tuple(policy.rank(starts))))
+    return plan
+
+
+def execute_plan(booking, plan, club="Gateway", duration=90):
+    """Book the best available court for each planned day, staying on the time slot page
+
+    Returns:
+        list: (date, booked time text or None) per planned day
+    """
+    from tennisbookapp import parse_court_start_time
+
+    results = []
+    for day in plan:
+        with booking.step("select_day"):
+            if not booking.select_date(day.date):
+                results.append((day.date, None))
+                continue
+        with booking.step("scrape_slots"):
+            court_times = booking.get_available_court_times()
+
+        by_start = {}
+        for time_text, element in court_times:
+            try:
+                start = parse_court_start_time(time_text)
+                by_start.setdefault((start.hour, start.minute), (time_text, element))
+            except Exception as e:
+                logging.debug(f"Could not parse court time '{time_text}': {e}")
+
+        candidates = [by_start[(c.hour, c.minute)][0] for c in day.candidates if (c.hour, c.minute) in by_start]
+        booked = None
+        if candidates:
+            logging.info(f"📅 Plan: booking {candidates[0]} on {day.date.strftime('%A, %B %d')}")
+            booked = booking.book_candidates(candidates, court_times, date=day.date)
+        if booked:
+            start = parse_court_start_time(booked)
+            booking.add_tennis_to_calendar(datetime.datetime.combine(day.date, start.time(), tzinfo=CLUB_TZ), duration)
+            # Booking leaves the slot page; go back to its date strip for the next planned day
+            if day is not plan[-1] and not booking.return_to_slot_list(max_back=3):
+                booking.select_location(club)
+
+        if not booked:
+            logging.warning(f"No planned slot could be booked on {day.date}")
+        results.append((day.date, booked))
+    return results
+
+
+def main(argv):
+    from tennisbookapp import BayClubTennisBooking, parse_court_start_time
+
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    horizon = int(arg('--horizon', 14))
+    weekdays = arg('--days', 'Friday,Sunday').split(',')
+    club = arg('--club', 'Gateway')
+    start_date = datetime.datetime.now(CLUB_TZ).date() + datetime.timedelta(days=1)
+
+    booking = BayClubTennisBooking(headless='--headed' not in argv, dry_run='--dry-run' in argv)
+    # Plan before launching the browser, so --print-only never opens one
+    booking.init_calendar()
+    with booking.step("calendar"):
+        events = booking.get_calendar_events_range(start_date, start_date + datetime.timedelta(days=horizon - 1))
+        plan = build_plan(events, start_date, horizon, weekdays)
+
+    held = set()
+    if booking.ledger and not booking.dry_run:
+        held = {day.date for day in plan
+                if booking.ledger.satisfied(booking.username, Target("tennis", club, day.date))}
+        for date in sorted(held):
+            logging.info(f"✓ {date.strftime('%a %b %d')} already has a court reserved, skipping it")
+        plan = [day for day in plan if day.date not in held]
+
+    for day in plan:
+        best = ", ".join(t.strftime("%-I:%M %p") for t in day.candidates[:3])
+        logging.info(f"{day.date.strftime('%a %b %d')}: {len(day.candidates)} free starts, best {best}")
+    if held and not plan:
+        booking.run.target = f"plan {horizon}d {'/'.join(weekdays)}"
+        booking.run.outcome = "already_booked"
+        booking.run.club = club
+        booking.finish_early()
+        return True
+    if '--print-only' in argv or not plan:
+        booking.finish_early(record=False)
+        return bool(plan)
+
+    with booking:
+        booking.run.target = f"plan {horizon}d {'/'.join(weekdays)}"
+        with booking.step("login"):
+            booking.login()
+        with booking.step("select_location"):
+            booking.select_location(club)
+        results = execute_plan(booking, plan, club)
+
+        booked = [f"{date} {time_text}" for date, time_text in results if time_text]
+        booking.run.chosen_slot = "; ".join(booked) or None
+        if booked:
+            booking.mark_booked()
+            booking.verify_reservations([
+                Target("tennis", club, date, parse_court_start_time(time_text).time())
+                for date, time_text in results if time_text
+            ])
+        logging.info(f"✓ Booked {len(booked)}/{len(results)} planned days")
+        return bool(booked)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s',
+        datefmt='%d-%b-%y %H:%M:%S'
+    )
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
@@ -0,0 +1,275 @@
+"""
+Court slot preferences learned from past bookings
+
+Instead of hard-coding "10am or 12pm, nothing before 8 or after 7" (and asking the
+LLM every run), slot preferences are compiled from what actually happened:
+
+    booked      - a run booked the slot (run history)
+    kept        - the calendar event for a booking is still there after it started
+    cancelled   - the calendar event for a booking was deleted
+    lost        - a run chose the slot but didn't get it (someone else was faster)
+
+Each signal is weighted, decayed by age, and added to the old hand-written
+preferences (prior_score) for every (weekday, start time) the courts offer. The
+result is a score table in ~/.cache/bayclub/policy.json; the booking step only
+does a dictionary lookup per candidate slot.
+
+Usage:
+    python3 policy.py compile [--weeks 26]
+    python3 policy.py show [--day Friday]
+"""
+import os
+import sys
+import json
+import datetime
+import logging
+from availability import CLUB_TZ, FIRST_START, LAST_START, SLOT_STEP, parse_event_time
+
+POLICY_PATH = os.environ.get(
+    "BAYCLUB_POLICY_PATH",
+    os.path.expanduser("~/.cache/bayclub/policy.json")
+)
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+PREFERRED_HOURS = (10, 12)
+CALENDAR_SUMMARY = "Tennis Court - Bay Club"
+
+SIGNAL_WEIGHTS = {"booked": 10, "kept": 20, "cancelled": -30, "lost": -15}
+HALF_LIFE_DAYS = 56
+
+
+def prior_score(weekday, minute):
+    """The original hand-written preferences: 10am/12pm first, then mornings and early
+    afternoons, avoiding before 8 and after 7pm. Earlier in the day breaks ties."""
+    hour = minute // 60
+    score = 0
+    if hour in PREFERRED_HOURS and minute % 60 == 0:
+        score += 100 - PREFERRED_HOURS.index(hour)
+    if 8 <= hour < 15:
+        score += 50
+    elif hour < 8 or hour >= 19:
+        score -= 50
+    return score - minute / 1440
+
+
+class Policy:
+    """Score lookup for court starts: higher is better"""
+
+    def __init__(self, scores=None):
+        self.scores = scores or {}
+
+    def score(self, start):
+        minute = start.hour * 60 + start.minute
+        key = (start.weekday(), minute)
+        if key in self.scores:
+            return self.scores[key]
+        return prior_score(*key)
+
+    def rank(self, starts, key=None):
+        """Sort best first; key extracts the start datetime from each item"""
+        return sorted(starts, key=lambda item: self.score(key(item) if key else item), reverse=True)
+
+    def favourites(self, weekday, count=2):
+        """Best start times for a weekday, e.g. to describe preferences to the LLM"""
+        minutes = range(FIRST_START, LAST_START + 1, SLOT_STEP)
+        best = sorted(minutes, key=lambda minute: self.scores.get((weekday, minute), prior_score(weekday, minute)),
+                      reverse=True)
+        return [datetime.time(minute // 60, minute % 60) for minute in best[:count]]
+
+
+_policy = None
+
+
+def load_policy(path=POLICY_PATH):
+    """The compiled policy, or the hand-written prior if nothing has been compiled yet"""
+    global _policy
+    if _policy is None:
+        try:
+            with open(path) as f:
+                table = json.load(f)
+            _policy = Policy({
+                (int(weekday), int(minute)): score
+                for weekday, row in table["scores"].items()
+                for minute, score in row.items()
+            })
+        except FileNotFoundError:
+            _policy = Policy()
+        except (ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable policy {path}: {e}")
+            _policy = Policy()
+    return _policy
+
+
+def parse_run_slot(slot, target, started):
+    """Start datetime of a slot as a run recorded it
+
+    Planner runs record "YYYY-MM-DD <slot>", single-day runs "<slot>" with the day in target.
+    """
+    from tennisbookapp import parse_court_start_time
+
+    first, _, rest = slot.partition(" ")
+    if first[:4].isdigit() and "-" in first:
+        date = datetime.date.fromisoformat(first)
+        slot = rest
+    else:
+        weekday = WEEKDAYS.index((target or "").split()[0])
+        date = started.date() + datetime.timedelta(days=(weekday - started.weekday()) % 7)
+    return datetime.datetime.combine(date, parse_court_start_time(slot).time(), tzinfo=CLUB_TZ)
+
+
+def history_signals(conn, since):
+    """(signal, start datetime) from tennis runs in the history database
+
+    A booked run's slot is "booked"; every candidate it tried first and didn't get,
+    and the slots of failed runs, are "lost".
+    """
+    rows = conn.execute(
+        "SELECT started_at, target, chosen_slot, lost_slots, outcome FROM runs"
+        " WHERE script = 'BayClubTennisBooking' AND (chosen_slot IS NOT NULL OR lost_slots IS NOT NULL)"
+        " AND started_at >= ? AND COALESCE(dry_run, 0) = 0",
+        (since.isoformat(timespec="seconds"),)
+    ).fetchall()
+
+    signals = []
+    for started_at, target, chosen_slot, lost_slots, outcome in rows:
+        if outcome not in ("booked", "failed"):
+            continue
+        started = datetime.datetime.fromisoformat(started_at)
+        slots = []
+        if outcome == "booked" and chosen_slot:
+            slots += [("booked", slot) for slot in chosen_slot.split(";")]
+        if lost_slots is not None:
+            slots += [("lost", slot) for slot in lost_slots.split(";")]
+        elif outcome == "failed" and chosen_slot:
+            # Runs from before lost_slots was recorded: only the last choice is known
+            slots += [("lost", slot) for slot in chosen_slot.split(";")]
+        for signal, slot in slots:
+            try:
+                signals.append((signal, parse_run_slot(slot.strip(), target, started)))
+            except (ValueError, IndexError) as e:
+                logging.debug(f"Skipping run slot '{slot}': {e}")
+    return signals
+
+
+def calendar_signals(events, now, stored=None):
+    """(signal, start datetime) from tennis events in a listing made with showDeleted=True
+
+    The API returns a deleted event as little more than its id and status, so its
+    summary and start are taken from stored, the calendar mirror's copies by id.
+    """
+    signals, seen = [], set()
+    for event in events:
+        if event.get("id") in seen:
+            continue
+        seen.add(event.get("id"))
+        if event.get("status") == "cancelled" and stored and event.get("id") in stored:
+            event = {**stored[event["id"]], "status": "cancelled"}
+        if not event.get("summary", "").startswith(CALENDAR_SUMMARY):
+            continue
+        start = event.get("start", {}).get("dateTime")
+        if not start:
+            continue
+        start = parse_event_time(start)
+        if event.get("status") == "cancelled":
+            signals.append(("cancelled", start))
+        elif start <= now:
+            signals.append(("kept", start))
+    return signals
+
+
+def compile_scores(signals, now):
+    """Score table {(weekday, minute): score} over every start time the courts offer"""
+    learned = {}
+    for signal, start in signals:
+        age_days = max(0.0, (now - start).total_seconds() / 86400)
+        key = (start.weekday(), start.hour * 60 + start.minute)
+        learned[key] = learned.get(key, 0.0) + SIGNAL_WEIGHTS[signal] * 0.5 ** (age_days / HALF_LIFE_DAYS)
+
+    return {
+        (weekday, minute): round(prior_score(weekday, minute) + learned.get((weekday, minute), 0.0), 3)
+        for weekday in range(7)
+        for minute in range(FIRST_START, LAST_START + 1, SLOT_STEP)
+    }
+
+
+def save_policy(scores, path=POLICY_PATH):
+    table = {"compiled_at": datetime.datetime.now(CLUB_TZ).isoformat(timespec="seconds"), "scores": {}}
+    for (weekday, minute), score in scores.items():
+        table["scores"].setdefault(str(weekday), {})[str(minute)] = score
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(table, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def fetch_tennis_events(calendar_service, since, until):
+    """Tennis bookings in the calendar, including deleted ones"""
+    events, page_token = [], None
+    while True:
+        result = calendar_service.events().list(
+            calendarId='primary',
+            timeMin=since.isoformat(),
+            timeMax=until.isoformat(),
+            q=CALENDAR_SUMMARY,
+            showDeleted=True,
+            singleEvents=True,
+            maxResults=2500,
+            pageToken=page_token
+        ).execute()
+        events.extend(result.get('items', []))
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            return events
+
+
+def main(argv):
+    def arg(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    command = argv[0] if argv else "show"
+    if command == "compile":
+        import run_history
+        from bayclub_base import build_calendar_service
+        from calendar_mirror import CalendarMirror
+
+        now = datetime.datetime.now(CLUB_TZ)
+        since = now - datetime.timedelta(weeks=int(arg('--weeks', 26)))
+
+        conn = run_history.connect()
+        signals = history_signals(conn, since.replace(tzinfo=None))
+        conn.close()
+        calendar_service = build_calendar_service()
+        if calendar_service:
+            events = fetch_tennis_events(calendar_service, since, now)
+            mirror = CalendarMirror()
+            mirror.ensure_synced(calendar_service)
+            # Deletions the mirror saw are counted even if the listing no longer matches them
+            events += mirror.cancelled_between(since, now)
+            stored = mirror.stored_events([event["id"] for event in events if event.get("id")])
+            mirror.close()
+            signals += calendar_signals(events, now, stored)
+
+        counts = {signal: sum(1 for s, _ in signals if s == signal) for signal in SIGNAL_WEIGHTS}
+        save_policy(compile_scores(signals, now))
+        logging.info(f"✓ Policy compiled to {POLICY_PATH} from "
+                     + ", ".join(f"{count} {signal}" for signal, count in counts.items()))
+    elif command == "show":
+        policy = load_policy()
+        days = [arg('--day', None)] if '--day' in argv else WEEKDAYS
+        for day in days:
+            best = ", ".join(t.strftime("%-I:%M %p") for t in policy.favourites(WEEKDAYS.index(day), 5))
+            print(f"{day:<10} {best}")
+    else:
+        print(__doc__)
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s',
+        datefmt='%d-%b-%y %H:%M:%S'
+    )
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
@@ -0,0 +1,211 @@
+"""
+Poll the Bay Club schedule API and fire a booking as soon as a target becomes bookable
+
+Instead of guessing the release time in cron, start this a few minutes before the
+expected release. It fetches the schedule JSON over one keep-alive connection, reduces
+it to a compact hashed snapshot per (club, activity, date), and only looks further when
+the snapshot changes. When the target shows up as bookable it runs the booking command.
+
+The schedule endpoint is read from SCHEDULE_API_URL, a template with {club}, {activity}
+and {date} placeholders. Requests reuse the login saved by the last browser run of the
+same account (see bayclub_base.session_state_path).
+
+Usage:
+    python3 release_poller.py --club Gateway --activity court_booking --date 2026-10-24 \\
+        --target "10:00 AM" --interval 3 --timeout 600 -- python3 tennisbookapp.py
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import subprocess
+import requests
+from bayclub_base import USERNAME, session_state_path
+from ledger import parse_start
+from slot_feed import START_KEYS, NAME_KEYS, BOOKABLE_KEYS, find_records, first
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(message)s',
+    datefmt='%d-%b-%y %H:%M:%S'
+)
+
+SCHEDULE_API_URL = os.environ.get("SCHEDULE_API_URL")
+SNAPSHOT_PATH = os.environ.get(
+    "BAYCLUB_SNAPSHOT_PATH",
+    os.path.expanduser("~/.cache/bayclub/snapshots.json")
+)
+
+
+def extract_slots(payload):
+    """Reduce a schedule payload to sorted (start, name, bookable) tuples
+
+    The API shape isn't documented, so this walks the JSON and keeps any object
+    that has a start time and a bookable flag.
+    """
+    return sorted(
+        (str(first(node, START_KEYS)), str(first(node, NAME_KEYS, "")), bool(first(node, BOOKABLE_KEYS)))
+        for node in find_records(payload)
+    )
+
+
+def snapshot_hash(slots):
+    """Short, stable digest of a slot list"""
+    return hashlib.blake2b(json.dumps(slots).encode(), digest_size=8).hexdigest()
+
+
+def slot_time(text):
+    """Start time of a slot or target, e.g. "10:00am", "10:00 - 11:30 AM" or "2026-10-20T13:00:00"; None if unreadable"""
+    try:
+        return parse_start(text)
+    except ValueError:
+        return None
+
+
+def target_bookable(slots, target_time, target_name=None):
+    """True if a bookable slot starts at the target time (and matches the name, if given)"""
+    wanted = slot_time(target_time)
+    if wanted is None:
+        raise ValueError(f"Can't read a time from target '{target_time}'")
+    for start, name, bookable in slots:
+        if bookable and slot_time(start) == wanted:
+            if not target_name or target_name.lower() in name.lower():
+                return True
+    return False
+
+
+class ReleasePoller:
+    """Cheap repeated schedule fetches over a single persistent connection"""
+
+    def __init__(self, url_template=SCHEDULE_API_URL, username=USERNAME, snapshot_path=SNAPSHOT_PATH):
+        if not url_template:
+            raise RuntimeError("SCHEDULE_API_URL not set")
+        self.url_template = url_template
+        self.snapshot_path = snapshot_path
+        self.snapshots = self._load_snapshots()
+        self.etags = {}
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+        if username:
+            self._load_login(session_state_path(username))
+
+    def _load_login(self, path):
+        """Copy cookies and any bearer token from a saved browser session"""
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            logging.warning(f"No saved session at {path}, polling unauthenticated")
+            return
+
+        for cookie in state.get("cookies", []):
+            self.session.cookies.set(cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie["path"])
+        for origin in state.get("origins", []):
+            for item in origin.get("localStorage", []):
+                if "token" in item["name"].lower() and item["value"]:
+                    self.session.headers["Authorization"] = f"Bearer {item['value'].strip(chr(34))}"
+        logging.info(f"Loaded saved session from {path}")
+
+    def _load_snapshots(self):
+        try:
+            with open(self.snapshot_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_snapshots(self):
+        os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+        with open(self.snapshot_path, "w") as f:
+            json.dump(self.snapshots, f)
+
+    def poll(self, club, activity, date):
+        """Fetch the schedule once
+
+        Returns:
+            tuple: (changed, slots) - slots is None when the server reported no change
+        """
+        key = f"{club}|{activity}|{date}"
+        url = self.url_template.format(club=club, activity=activity, date=date)
+        headers = {"If-None-Match": self.etags[key]} if key in self.etags else {}
+
+        response = self.session.get(url, headers=headers, timeout=5)
+        if response.status_code == 304:
+            return False, None
+        response.raise_for_status()
+        if "ETag" in response.headers:
+            self.etags[key] = response.headers["ETag"]
+
+        slots = extract_slots(response.json())
+        digest = snapshot_hash(slots)
+        changed = self.snapshots.get(key) != digest
+        if changed:
+            logging.info(f"Schedule changed for {key}: {len(slots)} slots, {sum(s[2] for s in slots)} bookable")
+            self.snapshots[key] = digest
+            self._save_snapshots()
+        return changed, slots
+
+    def wait_for_release(self, club, activity, date, target_time, target_name=None, interval=3, timeout=600):
+        """Poll until the target is bookable
+
+        Returns:
+            bool: True once the target is bookable, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        checked = False
+        while time.monotonic() < deadline:
+            try:
+                changed, slots = self.poll(club, activity, date)
+                # Only re-check the target when the snapshot moved (or on the first fetch)
+                if slots is not None and (changed or not checked):
+                    checked = True
+                    if target_bookable(slots, target_time, target_name):
+                        logging.info(f"🎾 Target {target_name or ''} {target_time} is bookable on {date}")
+                        return True
+            except Exception as e:
+                logging.warning(f"Poll failed: {e}")
+            time.sleep(interval)
+
+        logging.warning(f"Target {target_time} not released within {timeout}s")
+        return False
+
+
+def main(argv):
+    if '--' in argv:
+        command = argv[argv.index('--') + 1:]
+        argv = argv[:argv.index('--')]
+    else:
+        command = []
+
+    def arg(name, default=None):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    if not arg('--club') or not arg('--date') or not arg('--target'):
+        print(__doc__)
+        return False
+
+    poller = ReleasePoller()
+    released = poller.wait_for_release(
+        club=arg('--club'),
+        activity=arg('--activity', 'court_booking'),
+        date=arg('--date'),
+        target_time=arg('--target'),
+        target_name=arg('--name'),
+        interval=float(arg('--interval', 3)),
+        timeout=float(arg('--timeout', 600)),
+    )
+    if not released:
+        return False
+    if command:
+        logging.info(f"Running booking: {' '.join(command)}")
+        return subprocess.run(command).returncode == 0
+    return True
+
+
+if __name__ == "__main__":
+    success = main(sys.argv[1:])
+    sys.exit(0 if success else 1)
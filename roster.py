@@ -0,0 +1,91 @@
+"""
+Cached player roster for the court confirmation page
+
+The confirmation page lists the people you can add to a court booking, one
+app-racquet-sports-person per row. Rather than clicking a fixed row, the list is
+read once into a name -> row index and cached per account
+(~/.cache/bayclub/roster.json), so the partner is picked by name with one click
+on later runs. A cached row is only clicked if it still shows the partner's
+name; otherwise the list is read again.
+
+Usage:
+    python3 roster.py              # print the cached rosters
+"""
+import os
+import json
+import datetime
+import logging
+
+ROSTER_PATH = os.environ.get(
+    "BAYCLUB_ROSTER_PATH",
+    os.path.expanduser("~/.cache/bayclub/roster.json")
+)
+# Who to add to court bookings, as their name appears in the player list
+PARTNER = os.environ.get("BAYCLUB_PARTNER")
+
+PLAYER_LIST = "/html/body/app-root/div/ng-component/app-racquet-sports-confirm-booking/div[1]/div/div/div/div/div[2]/app-racquet-sports-player-select/div"
+# Row the partner sat at before names were used; only clicked when no partner is configured
+LEGACY_PARTNER_ROW = 15
+
+
+def xpath_literal(text):
+    """Quote text for an XPath expression, including names with apostrophes"""
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+    parts = text.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
+def player_toggle_xpath(row, name=None):
+    """The add-player toggle in a row, optionally only if the row shows name"""
+    person = "app-racquet-sports-person"
+    if name:
+        person += f"[div/div[2]/span[normalize-space()={xpath_literal(name)}]]"
+    return f"{PLAYER_LIST}/div[{row}]/{person}/div/div[1]/div/div"
+
+
+def load_rosters(path=ROSTER_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logging.warning(f"Could not read player roster {path}: {e}")
+        return {}
+
+
+def save_roster(account, players, path=ROSTER_PATH):
+    """Store an account's name -> row index, written atomically like the club catalog"""
+    rosters = load_rosters(path)
+    rosters[account] = {
+        "players": players,
+        "updated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(rosters, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def cached_row(account, name, path=ROSTER_PATH):
+    return load_rosters(path).get(account, {}).get("players", {}).get(name)
+
+
+def read_roster(page):
+    """Name -> 1-based row index of every player on the confirmation page, in one round trip"""
+    names = page.eval_on_selector_all(
+        f"xpath={PLAYER_LIST}/div",
+        """rows => rows.map(row => {
+            const span = row.querySelector('app-racquet-sports-person > div > div:nth-child(2) span');
+            return (span || row).textContent.trim();
+        })"""
+    )
+    return {name: row for row, name in enumerate(names, start=1) if name}
+
+
+if __name__ == "__main__":
+    print(json.dumps(load_rosters(), indent=2, sort_keys=True))
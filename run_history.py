@@ -0,0 +1,271 @@
+"""
+SQLite history of booking runs, with a small reporting CLI
+
+Every BayClubBookingBase run records its target, the slot it chose, per-step
+durations, outcome, error class and any artifacts (screenshots etc.) it saved.
+Nothing is written until the run finishes, so the booking path never waits on disk.
+
+Usage:
+    python3 run_history.py report [--weeks 4]
+    python3 run_history.py runs [--limit 20]
+"""
+import os
+import sys
+import time
+import sqlite3
+import datetime
+import statistics
+import logging
+from contextlib import contextmanager
+
+HISTORY_DB = os.environ.get(
+    "BAYCLUB_HISTORY_DB",
+    os.path.expanduser("~/.cache/bayclub/history.db")
+)
+ARTIFACT_DIR = os.environ.get(
+    "BAYCLUB_ARTIFACT_DIR",
+    os.path.expanduser("~/.cache/bayclub/artifacts")
+)
+# Outcomes of speculative helper sessions (speculate.py); they are not booking attempts
+HELPER_OUTCOMES = ("kept", "released", "unused", "hold_lost", "hold_failed", "hold_stuck")
+# Runs that booked nothing by design: the target was in the reservation ledger, a ledger sync, a court scrape
+SKIPPED_OUTCOMES = ("already_booked", "synced", "scraped")
+SUCCESS_OUTCOMES = ("booked", "waitlisted")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_key TEXT UNIQUE,
+    started_at TEXT,
+    script TEXT,
+    account TEXT,
+    club TEXT,
+    target TEXT,
+    chosen_slot TEXT,
+    outcome TEXT,
+    error_class TEXT,
+    error_message TEXT,
+    total_seconds REAL,
+    time_to_confirm REAL,
+    profile TEXT,
+    python_peak_mb REAL,
+    browser_peak_mb REAL,
+    dry_run INTEGER,
+    fallbacks INTEGER,
+    lost_slots TEXT
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER REFERENCES runs(id),
+    name TEXT,
+    started_offset REAL,
+    seconds REAL,
+    ok INTEGER
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id INTEGER REFERENCES runs(id),
+    kind TEXT,
+    path TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_started_at ON runs(started_at);
+"""
+# Columns added after the first release; added to older databases on connect
+RUN_COLUMNS = {
+    "profile": "TEXT",
+    "python_peak_mb": "REAL",
+    "browser_peak_mb": "REAL",
+    "dry_run": "INTEGER",
+    "fallbacks": "INTEGER",
+    "lost_slots": "TEXT",
+}
+
+
+def connect(path=HISTORY_DB):
+    """Open the history database, creating it if needed"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.executescript(SCHEMA)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+    for column, column_type in RUN_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {column_type}")
+    return conn
+
+
+class RunRecorder:
+    """Collects one run's timings in memory and writes them on finish()"""
+
+    def __init__(self, script, account=None):
+        self.started_at = datetime.datetime.now()
+        self.start = time.monotonic()
+        self.run_key = f"{self.started_at:%Y%m%d-%H%M%S}-{os.getpid()}-{id(self) % 10000:04d}"
+        self.script = script
+        self.account = account
+        self.club = None
+        self.target = None
+        self.chosen_slot = None
+        self.outcome = "failed"
+        self.error_class = None
+        self.error_message = None
+        self.profile = None
+        self.python_peak_mb = None
+        self.browser_peak_mb = None
+        self.dry_run = False
+        self.fallbacks = 0        # candidates lost before the one that was booked
+        self.lost_slots = []      # court times tried and not had, in chosen_slot's format
+        self.waitlisted = False   # the class was full, so booking joined the waitlist
+        self.steps = []
+        self.artifacts = []
+
+    @contextmanager
+    def step(self, name):
+        """Time a named step; a raised exception marks the step as failed"""
+        step_start = time.monotonic()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.steps.append((name, step_start - self.start, time.monotonic() - step_start, ok))
+
+    def artifact_path(self, name, extension="png"):
+        """Unique artifact path for this run"""
+        os.makedirs(ARTIFACT_DIR, exist_ok=True)
+        path = os.path.join(ARTIFACT_DIR, f"{self.run_key}-{name}.{extension}")
+        self.artifacts.append((name, path))
+        return path
+
+    def time_to_confirm(self):
+        """Seconds from run start to the end of the last successful confirm step, not counting waiting for a release"""
+        confirms = [offset + seconds for name, offset, seconds, ok in self.steps if name == "confirm" and ok]
+        if not confirms:
+            return None
+        waited = sum(seconds for name, offset, seconds, _ in self.steps if name == "wait_release" and offset < confirms[-1])
+        return confirms[-1] - waited
+
+    def finish(self, exc=None, path=HISTORY_DB):
+        """Write the run to the history database; never raises"""
+        if exc is not None:
+            self.outcome = "error"
+            self.error_class = type(exc).__name__
+            self.error_message = str(exc)[:500]
+        try:
+            conn = connect(path)
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO runs (run_key, started_at, script, account, club, target, chosen_slot, outcome,"
+                    " error_class, error_message, total_seconds, time_to_confirm, profile, python_peak_mb,"
+                    " browser_peak_mb, dry_run, fallbacks, lost_slots) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                    (self.run_key, self.started_at.isoformat(timespec="seconds"), self.script, self.account,
+                     self.club, self.target, self.chosen_slot, self.outcome, self.error_class, self.error_message,
+                     time.monotonic() - self.start, self.time_to_confirm(), self.profile, self.python_peak_mb,
+                     self.browser_peak_mb, int(self.dry_run), self.fallbacks, "; ".join(self.lost_slots) or None)
+                )
+                run_id = cursor.lastrowid
+                conn.executemany("INSERT INTO steps VALUES (?,?,?,?,?)",
+                                 [(run_id, *step) for step in self.steps])
+                conn.executemany("INSERT INTO artifacts VALUES (?,?,?)",
+                                 [(run_id, kind, p) for kind, p in self.artifacts])
+            conn.close()
+            logging.info(f"Run {self.run_key} recorded: {self.outcome}")
+        except Exception as e:
+            logging.warning(f"Failed to record run history: {e}")
+
+
+def report(weeks=4, path=HISTORY_DB):
+    """Print success rate, median time-to-confirm and the most regressed step"""
+    conn = connect(path)
+    since = (datetime.datetime.now() - datetime.timedelta(weeks=weeks)).isoformat()
+    last_week = (datetime.datetime.now() - datetime.timedelta(weeks=1)).isoformat()
+
+    not_attempts = HELPER_OUTCOMES + SKIPPED_OUTCOMES
+    runs = conn.execute(
+        "SELECT outcome, time_to_confirm, COALESCE(fallbacks, 0) FROM runs"
+        " WHERE started_at >= ? AND COALESCE(dry_run, 0) = 0"
+        f" AND outcome NOT IN ({', '.join('?' * len(not_attempts))})", (since, *not_attempts)
+    ).fetchall()
+    dry_runs = conn.execute(
+        "SELECT outcome, total_seconds FROM runs WHERE started_at >= ? AND dry_run = 1", (since,)
+    ).fetchall()
+    if not runs and not dry_runs:
+        print(f"No runs in the last {weeks} weeks")
+        return
+
+    print(f"Runs in the last {weeks} weeks: {len(runs)}")
+    if runs:
+        booked = [r for r in runs if r[0] in SUCCESS_OUTCOMES]
+        confirm_times = [r[1] for r in booked if r[1] is not None]
+        print(f"Success rate: {len(booked) / len(runs):.0%} ({len(booked)}/{len(runs)})")
+        if confirm_times:
+            print(f"Median time-to-confirm: {statistics.median(confirm_times):.1f}s")
+        fell_back = [r[2] for r in booked if r[2]]
+        if fell_back:
+            print(f"Fallbacks: {len(fell_back)}/{len(booked)} bookings got a later choice "
+                  f"({sum(fell_back)} slots lost first, at most {max(fell_back)} in one run)")
+    if dry_runs:
+        reached = [r for r in dry_runs if r[0] == "dry_run"]
+        print(f"Dry runs: {len(reached)}/{len(dry_runs)} reached the confirm step, "
+              f"median total {statistics.median(r[1] for r in dry_runs):.1f}s")
+
+    peaks = conn.execute(
+        "SELECT COALESCE(profile, 'default'), MAX(python_peak_mb), MAX(browser_peak_mb) FROM runs"
+        " WHERE started_at >= ? AND browser_peak_mb IS NOT NULL GROUP BY 1", (since,)
+    ).fetchall()
+    for profile, python_peak, browser_peak in peaks:
+        print(f"Peak RSS ({profile}): python {python_peak:.0f} MB, browser {browser_peak:.0f} MB")
+
+    outcomes = conn.execute(
+        "SELECT outcome, COALESCE(error_class, ''), COUNT(*) FROM runs WHERE started_at >= ?"
+        " GROUP BY 1, 2 ORDER BY 3 DESC", (since,)
+    ).fetchall()
+    print("\nOutcomes:")
+    for outcome, error_class, count in outcomes:
+        print(f"  {outcome:<12} {error_class:<28} {count}")
+
+    # Compare each step's median over the last week against the weeks before it
+    rows = conn.execute(
+        "SELECT steps.name, steps.seconds, runs.started_at >= ? FROM steps JOIN runs ON runs.id = steps.run_id"
+        " WHERE runs.started_at >= ? AND steps.ok = 1", (last_week, since)
+    ).fetchall()
+    recent, baseline = {}, {}
+    for name, seconds, is_recent in rows:
+        (recent if is_recent else baseline).setdefault(name, []).append(seconds)
+
+    print("\nStep medians (last week vs. before):")
+    regressions = []
+    for name in sorted(set(recent) | set(baseline)):
+        now = statistics.median(recent[name]) if name in recent else None
+        before = statistics.median(baseline[name]) if name in baseline else None
+        now_text = f"{now:.1f}s" if now is not None else "-"
+        before_text = f"{before:.1f}s" if before is not None else "-"
+        print(f"  {name:<20} {now_text:>8} {before_text:>8}")
+        if now is not None and before:
+            regressions.append((now - before, name, before, now))
+
+    regressions.sort(reverse=True)
+    if regressions and regressions[0][0] > 0:
+        delta, name, before, now = regressions[0]
+        print(f"\nMost regressed step: {name} ({before:.1f}s -> {now:.1f}s, +{delta:.1f}s)")
+    conn.close()
+
+
+def list_runs(limit=20, path=HISTORY_DB):
+    """Print the most recent runs"""
+    conn = connect(path)
+    for row in conn.execute(
+        "SELECT started_at, script, club, target, chosen_slot, outcome, error_class, total_seconds"
+        " FROM runs ORDER BY started_at DESC LIMIT ?", (limit,)
+    ):
+        started_at, script, club, target, slot, outcome, error_class, total = row
+        print(f"{started_at} {script:<16} {club or '-':<14} {target or '-':<16} {slot or '-':<18}"
+              f" {outcome:<10} {error_class or '':<24} {total:.1f}s")
+    conn.close()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "report":
+        report(weeks=int(args[args.index('--weeks') + 1]) if '--weeks' in args else 4)
+    elif args and args[0] == "runs":
+        list_runs(limit=int(args[args.index('--limit') + 1]) if '--limit' in args else 20)
+    else:
+        print(__doc__)
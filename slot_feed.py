@@ -0,0 +1,172 @@
+"""
+Class and court slot data read from the Bay Club app's own JSON responses
+
+The Angular app fetches the class list and court slots as JSON before rendering
+them. SlotFeed listens to the page's responses (page.on("response")), picks out
+those payloads as they arrive and keeps them as ClassSlot / CourtSlot records, so
+the booking scripts can decide as soon as the data lands instead of sleeping
+and scraping the rendered list. The API isn't documented, so payloads are read
+the same loose way as release_poller.py: any object with a start time and a
+bookable flag is a slot. Only responses from the class list and court slot URLs
+are read. If nothing usable arrives, callers fall back to the DOM.
+
+BAYCLUB_SLOT_FEED=0 turns it off; BAYCLUB_FEED_TIMEOUT is how long to wait for a
+payload before falling back (seconds, 1 by default, so a payload that never
+matches costs little on top of the DOM path).
+"""
+import os
+import re
+import time
+import logging
+from dataclasses import dataclass
+
+SLOT_FEED = os.environ.get("BAYCLUB_SLOT_FEED", "1") == "1"
+FEED_TIMEOUT = float(os.environ.get("BAYCLUB_FEED_TIMEOUT", 1))
+# Response URLs that carry court slots and the class list; other responses are ignored
+COURT_URL_PATTERN = re.compile(os.environ.get("BAYCLUB_COURT_URL_PATTERN", r"court|racquet"), re.IGNORECASE)
+CLASS_URL_PATTERN = re.compile(os.environ.get("BAYCLUB_CLASS_URL_PATTERN", r"/classes\b"), re.IGNORECASE)
+
+START_KEYS = ("startTime", "start", "startDateTime", "time", "timeSlot")
+NAME_KEYS = ("name", "className", "title", "courtName", "court")
+BOOKABLE_KEYS = ("isBookable", "bookable", "canBook", "isAvailable", "available")
+ID_KEYS = ("id", "classId", "slotId", "timeSlotId")
+DATE_KEYS = ("date", "classDate", "startDate")
+LABEL_KEYS = ("label", "displayTime", "timeRange")
+REMAINING_KEYS = ("spotsLeft", "availableSpots", "courtsLeft", "availableCourts")
+COURT_KEYS = ("courtName", "court", "courtId")
+DURATION_KEYS = ("duration", "durationMinutes", "length")
+
+
+def first(node, keys, default=None):
+    return next((node[k] for k in keys if k in node), default)
+
+
+def find_records(payload):
+    """Objects in a JSON payload that have a start time and a bookable flag, in document order"""
+    records = []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            if first(node, START_KEYS) is not None and first(node, BOOKABLE_KEYS) is not None:
+                records.append(node)
+            stack.extend(reversed([v for v in node.values() if isinstance(v, (dict, list))]))
+    return records
+
+
+@dataclass(frozen=True)
+class ClassSlot:
+    name: str
+    start: str
+    bookable: bool
+    id: str = None
+    date: str = None
+    spots_left: int = None
+
+
+@dataclass(frozen=True)
+class CourtSlot:
+    start: str
+    available: bool
+    label: str = None
+    id: str = None
+    date: str = None
+    courts_left: int = None
+    court: str = None       # only when the payload lists courts separately
+    duration: int = None    # minutes
+
+    @property
+    def text(self):
+        """The slot as the page shows it, e.g. "10:00 - 11:30 AM" """
+        return self.label or self.start
+
+
+def parse_classes(payload):
+    return [
+        ClassSlot(
+            name=str(first(node, NAME_KEYS, "")),
+            start=str(first(node, START_KEYS)),
+            bookable=bool(first(node, BOOKABLE_KEYS)),
+            id=first(node, ID_KEYS),
+            date=first(node, DATE_KEYS),
+            spots_left=first(node, REMAINING_KEYS),
+        )
+        for node in find_records(payload)
+    ]
+
+
+def parse_court_slots(payload):
+    return [
+        CourtSlot(
+            start=str(first(node, START_KEYS)),
+            available=bool(first(node, BOOKABLE_KEYS)),
+            label=first(node, LABEL_KEYS),
+            id=first(node, ID_KEYS),
+            date=first(node, DATE_KEYS),
+            courts_left=first(node, REMAINING_KEYS),
+            court=first(node, COURT_KEYS),
+            duration=first(node, DURATION_KEYS),
+        )
+        for node in find_records(payload)
+    ]
+
+
+class SlotFeed:
+    """Latest class list and court slots seen in the page's XHR/fetch responses"""
+
+    def __init__(self, enabled=SLOT_FEED):
+        self.enabled = enabled
+        self.latest = {}  # "classes" / "courts" -> (records, url, monotonic time received)
+
+    def attach(self, page):
+        if self.enabled:
+            page.on("response", self.on_response)
+
+    def on_response(self, response):
+        try:
+            if response.request.resource_type not in ("xhr", "fetch"):
+                return
+            if "json" not in response.headers.get("content-type", "") or not response.ok:
+                return
+            self.ingest(response.url, response.json())
+        except Exception as e:
+            # Never let a listener error reach the booking flow
+            logging.debug(f"Slot feed skipped {response.url}: {e}")
+
+    def ingest(self, url, payload):
+        if COURT_URL_PATTERN.search(url):
+            kind = "courts"
+        elif CLASS_URL_PATTERN.search(url):
+            kind = "classes"
+        else:
+            return
+        records = parse_court_slots(payload) if kind == "courts" else parse_classes(payload)
+        if records:
+            self.latest[kind] = (records, url, time.monotonic())
+            logging.debug(f"Slot feed: {len(records)} {kind} from {url}")
+
+    def clear(self, kind=None):
+        """Forget earlier payloads before a navigation that will load new ones"""
+        if kind:
+            self.latest.pop(kind, None)
+        else:
+            self.latest.clear()
+
+    def wait(self, page, kind, timeout=FEED_TIMEOUT):
+        """Records of one kind, waiting up to timeout seconds for them to arrive; None if they don't
+
+        Waits with page.wait_for_timeout so Playwright keeps dispatching response events.
+        """
+        if not self.enabled:
+            return None
+        deadline = time.monotonic() + timeout
+        while kind not in self.latest:
+            if time.monotonic() >= deadline:
+                logging.info(f"No {kind} data in the app's responses after {timeout:g}s, reading the page")
+                return None
+            page.wait_for_timeout(50)
+        records, url, _ = self.latest[kind]
+        logging.info(f"✓ {len(records)} {kind} from {url}")
+        return records
@@ -0,0 +1,238 @@
+"""
+Speculative court holds: book the top K ranked court times at once and keep the best
+
+When a release is contested, trying court times one after another loses to whoever
+clicks first. With speculation on, BayClubTennisBooking books its best-ranked time
+on its own page while K-1 helper sessions (a browser each, started from the saved
+login) book the next-ranked ones at the same moment. The best time that confirms
+is kept, and every other confirmed hold is cancelled through My Reservations.
+
+Holding several courts at once, even briefly, is only acceptable within the club's
+rules, so it is off unless enabled in the [speculation] table of schedule.toml:
+
+    [speculation]
+    enabled = true
+    max_holds = 2                  # K: court times booked at once
+    max_reservations_per_day = 2   # the club's limit per member per day; K never exceeds it
+    min_cancel_notice_hours = 24   # only speculate when every hold can still be cancelled
+    clubs = ["Gateway"]            # where it is allowed (every club if left out)
+
+Validate with `python3 bench_speculative.py`, which races simulated members for the
+same courts on the mock server.
+"""
+import os
+import time
+import queue
+import datetime
+import logging
+import threading
+import tomllib
+from dataclasses import dataclass
+from bayclub_base import CLUBS
+from jobspec import SPEC_PATH
+
+# How long helper sessions wait for their court time, and for the keep/cancel decision
+HOLD_TIMEOUT = float(os.environ.get("BAYCLUB_HOLD_TIMEOUT", "120"))
+# How long the main session waits for helpers still opening the court page before booking without them
+READY_TIMEOUT = float(os.environ.get("BAYCLUB_HOLD_READY_TIMEOUT", "5"))
+
+RULE_FIELDS = {
+    "enabled": bool, "max_holds": int, "max_reservations_per_day": int,
+    "min_cancel_notice_hours": (int, float), "clubs": list,
+}
+
+
+@dataclass(frozen=True)
+class SpeculationRules:
+    enabled: bool = False
+    max_holds: int = 2
+    max_reservations_per_day: int = 1
+    min_cancel_notice_hours: float = 24
+    clubs: tuple = ()
+
+    def holds_for(self, club, starts, now, existing=0):
+        """How many of the ranked court starts (best first) may be held at once; 1 means book one at a time
+
+        existing is how many reservations the member already has that day; they count
+        against max_reservations_per_day.
+        """
+        if not self.enabled or (self.clubs and club not in self.clubs):
+            return 1
+        holds = min(self.max_holds, self.max_reservations_per_day - existing, len(starts))
+        notice = datetime.timedelta(hours=self.min_cancel_notice_hours)
+        if holds > 1 and any(start - now < notice for start in starts[:holds]):
+            logging.info(f"Not speculating: a hold would start within the {self.min_cancel_notice_hours}h "
+                         "cancellation notice")
+            return 1
+        return max(holds, 1)
+
+
+def parse_rules(raw, where="[speculation]"):
+    """Validate a [speculation] table; raises ValueError like jobspec.parse_job"""
+    unknown = set(raw) - set(RULE_FIELDS)
+    if unknown:
+        raise ValueError(f"{where}: unknown field(s) {', '.join(sorted(unknown))}")
+    for field, value in raw.items():
+        if not isinstance(value, RULE_FIELDS[field]) or (field != "enabled" and isinstance(value, bool)):
+            raise ValueError(f"{where}: {field} has the wrong type: {value!r}")
+    rules = SpeculationRules(**{**raw, "clubs": tuple(raw.get("clubs", ()))})
+    if rules.max_holds < 1 or rules.max_reservations_per_day < 1:
+        raise ValueError(f"{where}: max_holds and max_reservations_per_day must be at least 1")
+    if rules.min_cancel_notice_hours < 0:
+        raise ValueError(f"{where}: min_cancel_notice_hours can't be negative")
+    bad_clubs = [club for club in rules.clubs if club not in CLUBS]
+    if bad_clubs:
+        raise ValueError(f"{where}: unknown club(s) {', '.join(bad_clubs)}")
+    return rules
+
+
+def load_rules(path=SPEC_PATH):
+    """Speculation rules from the schedule file; disabled if the file or table is missing"""
+    try:
+        with open(path, "rb") as f:
+            document = tomllib.load(f)
+    except FileNotFoundError:
+        return SpeculationRules()
+    return parse_rules(document.get("speculation", {}), f"{path} [speculation]")
+
+
+class HoldWorker(threading.Thread):
+    """Helper session: opens the court page for a date, books the time it is given, then keeps or cancels it"""
+
+    def __init__(self, index, club, target_date, **session):
+        super().__init__(name=f"hold-{index}", daemon=True)
+        self.club = club
+        self.target_date = target_date
+        self.session = session
+        self.ready = threading.Event()
+        self.done = threading.Event()
+        self.assignment = queue.Queue()
+        self.decision = queue.Queue()   # True: cancel the hold, False: keep it
+        self.time_text = None
+        self.prepared = False   # the court page is open; only then is ready a go-ahead
+        self.held = False
+        self.released = False
+
+    def run(self):
+        from tennisbookapp import BayClubTennisBooking
+
+        try:
+            with BayClubTennisBooking(headless=True, reuse_session=True, speculation=SpeculationRules(),
+                                      **self.session) as booking:
+                try:
+                    self.hold(booking)
+                except Exception as e:
+                    # Recorded as a helper outcome, not an error: it was never a booking attempt of its own
+                    logging.error(f"{self.name} failed: {e}")
+                    booking.run.outcome = "hold_failed"
+                    booking.run.error_class = type(e).__name__
+                    booking.run.error_message = str(e)[:500]
+        except Exception as e:
+            logging.error(f"{self.name} failed: {e}")
+        finally:
+            self.ready.set()
+            self.done.set()
+
+    def hold(self, booking):
+        booking.run.target = f"{self.target_date:%A} hold"
+        booking.login()
+        booking.select_location(self.club)
+        if not booking.select_date(self.target_date):
+            raise RuntimeError(f"could not open {self.target_date}")
+        court_times = booking.get_available_court_times()
+        self.prepared = True
+        self.ready.set()
+
+        self.time_text = self.assignment.get(timeout=HOLD_TIMEOUT)
+        if self.time_text is None:
+            booking.run.outcome = "unused"
+            return
+        self.held = booking.book_candidates([self.time_text], court_times) is not None
+        self.done.set()
+        if not self.held:
+            booking.run.outcome = "hold_lost"
+            return
+
+        try:
+            cancel = self.decision.get(timeout=HOLD_TIMEOUT)
+        except queue.Empty:
+            logging.warning(f"{self.name}: no decision for {self.time_text}, cancelling it to be safe")
+            cancel = True
+        if cancel:
+            self.released = booking.cancel_reservation(self.target_date, self.time_text)
+            booking.run.outcome = "released" if self.released else "hold_stuck"
+            if not self.released:
+                logging.error(f"{self.name}: could not cancel the hold on {self.time_text} "
+                              f"{self.target_date}; cancel it by hand")
+        else:
+            # The main session records the booking; this run only held it
+            booking.run.outcome = "kept"
+
+
+def start_holds(count, club, target_date, **session):
+    """Start count helper sessions; they get ready while the main session decides"""
+    workers = [HoldWorker(i + 1, club, target_date, **session) for i in range(count)]
+    for worker in workers:
+        worker.start()
+    logging.info(f"Started {count} helper session(s) for speculative holds on {target_date}")
+    return workers
+
+
+def stop_holds(workers, timeout=HOLD_TIMEOUT):
+    """Tell helpers that never got a court time to close, and wait for all of them to finish"""
+    for worker in workers:
+        worker.assignment.put(None)
+    for worker in workers:
+        worker.join(timeout)
+
+
+def book_speculatively(booking, candidates, court_times, workers, timeout=HOLD_TIMEOUT, ready_timeout=READY_TIMEOUT):
+    """Book candidates[0] on booking's own page while ready helper i books candidates[i + 1]
+
+    Helpers get up to ready_timeout seconds to open the court page; those that aren't
+    ready by then, or failed to get there, are sent home. Every confirmed hold except
+    the best-ranked one is cancelled. If nothing was held, the remaining candidates
+    are tried one at a time as usual.
+
+    Returns:
+        str: the court time kept, or None
+    """
+    deadline = time.monotonic() + ready_timeout
+    for worker in workers:
+        worker.ready.wait(max(0, deadline - time.monotonic()))
+    helpers = [worker for worker in workers if worker.prepared][:len(candidates) - 1]
+    if len(helpers) < len(workers):
+        logging.info(f"{len(helpers)} of {len(workers)} helper session(s) ready to hold a court")
+    for worker in workers:
+        if worker not in helpers:
+            worker.assignment.put(None)
+    for rank, worker in enumerate(helpers, start=1):
+        worker.assignment.put(candidates[rank])
+
+    own = booking.book_candidates(candidates[:1], court_times)
+
+    held = {0: None} if own else {}
+    for rank, worker in enumerate(helpers, start=1):
+        if worker.done.wait(timeout) and worker.held:
+            held[rank] = worker
+    best = min(held) if held else None
+
+    for rank, worker in held.items():
+        if worker:
+            worker.decision.put(rank != best)
+    for worker in workers:
+        worker.join(timeout)
+    stuck = [worker.time_text for rank, worker in held.items() if worker and rank != best and not worker.released]
+
+    logging.info(f"Speculative holds: {len(held)} of {len(helpers) + 1} confirmed"
+                 + (f", kept {candidates[best]}" if best is not None else "")
+                 + (f"; NOT released: {', '.join(stuck)}" if stuck else ""))
+    if best is None:
+        remaining = candidates[len(helpers) + 1:]
+        if remaining and booking.return_to_slot_list():
+            return booking.book_candidates(remaining, court_times)
+        return None
+
+    booking.run.chosen_slot = candidates[best]
+    booking.run.fallbacks += best
+    return candidates[best]
@@ -3,9 +3,18 @@ import sys
 import datetime
 import logging
 import time
-import requests
+import re
+import json
 from dateutil import parser
-from bayclub_base import BayClubBookingBase
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from bayclub_base import BayClubBookingBase, RESERVATIONS_PATH
+from http_client import get_client
+from availability import AvailabilityMask, CLUB_TZ, FIRST_START, LAST_START, SLOT_STEP, parse_event_time
+from policy import load_policy
+from jobspec import load_spec, plan_jobs, execute
+from speculate import load_rules, start_holds, stop_holds, book_speculatively
+from ledger import Target, AlreadyReserved
+from roster import PARTNER, PLAYER_LIST, LEGACY_PARTNER_ROW, player_toggle_xpath, cached_row, read_roster, save_roster
 
 logging.basicConfig(
     level=logging.INFO,
@@ -14,12 +23,40 @@ logging.basicConfig(
 )
 
 MODEL_ACCESS_KEY = os.environ.get("MODEL_ACCESS_KEY")
+LLM_URL = os.environ.get("BAYCLUB_LLM_URL", "https://inference.do-ai.run/v1/chat/completions")
+LLM_MODEL = os.environ.get("BAYCLUB_LLM_MODEL", "openai-gpt-oss-120b")
+LLM_STREAM = os.environ.get("BAYCLUB_LLM_STREAM", "1") == "1"
+# "policy" picks from the learned score table (policy.py); "llm" asks the LLM instead
+DECISION_MODE = os.environ.get("BAYCLUB_DECISION", "policy")
+TIME_PATTERN = re.compile(r'\b(\d{1,2}:\d{2}\s*(?:AM|PM))\b', re.IGNORECASE)
+LLM_TIMEOUT = float(os.environ.get("BAYCLUB_LLM_TIMEOUT", "20"))
+# Free time required on each side of a court booking, on top of its duration
+TRAVEL_MINUTES = int(os.environ.get("BAYCLUB_TRAVEL_MINUTES", "0"))
+BUFFER_MINUTES = int(os.environ.get("BAYCLUB_BUFFER_MINUTES", "0"))
+# How long to keep falling back to the next-best court time after the best one is lost
+FALLBACK_SECONDS = float(os.environ.get("BAYCLUB_FALLBACK_SECONDS", "60"))
+# Messages shown after CONFIRM: the first pattern waits for any outcome, the second spots a refusal
+BOOKING_RESULT = "text=/confirmed|no longer available|not available|limit reached|error \\d+/i"
+BOOKING_REJECTED = re.compile(r"no longer available|not available|limit reached|error \d+", re.IGNORECASE)
 
 
 class BayClubTennisBooking(BayClubBookingBase):
     """Book tennis courts at Bay Club Gateway on Friday and Sunday"""
     
-    # Inherit __init__, __enter__, __exit__, login, and calendar methods from base class
+    # Inherit __exit__, login, and calendar methods from base class
+
+    def __init__(self, *args, partner=None, speculation=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.partner = partner or PARTNER
+        # Club rules for speculative holds on several courts (off unless enabled in schedule.toml)
+        self.speculation = speculation if speculation is not None else load_rules()
+        self.holds = []
+
+    def __enter__(self):
+        # Open the LLM connection while the browser launches and logs in
+        if MODEL_ACCESS_KEY and DECISION_MODE == "llm":
+            get_client().prewarm(LLM_URL)
+        return super().__enter__()
 
     def get_calendar_events(self, target_date):
         """Get calendar events for a specific date"""
@@ -28,12 +65,14 @@ class BayClubTennisBooking(BayClubBookingBase):
             return []
         
         try:
-            # Set time range for the entire day
-            start_of_day = datetime.datetime.combine(target_date, datetime.time(0, 0, 0))
-            end_of_day = datetime.datetime.combine(target_date, datetime.time(23, 59, 59))
+            events = self.mirrored_events(target_date)
+            if events is not None:
+                logging.info(f"Found {len(events)} calendar events on {target_date.strftime('%A, %B %d')} (mirror)")
+                return events
             
-            time_min = start_of_day.isoformat() + 'Z'
-            time_max = end_of_day.isoformat() + 'Z'
+            # Set time range for the entire local day at the club
+            time_min = datetime.datetime.combine(target_date, datetime.time.min, tzinfo=CLUB_TZ).isoformat()
+            time_max = datetime.datetime.combine(target_date + datetime.timedelta(days=1), datetime.time.min, tzinfo=CLUB_TZ).isoformat()
             
             events_result = self.calendar_service.events().list(
                 calendarId='primary',
@@ -52,8 +91,49 @@ class BayClubTennisBooking(BayClubBookingBase):
             logging.error(f"Failed to get calendar events: {e}")
             return []
     
+    def get_calendar_events_range(self, start_date, end_date):
+        """Get all calendar events from start_date through end_date in one paged listing"""
+        if not self.calendar_service:
+            logging.warning("Calendar service not initialized")
+            return []
+        
+        try:
+            events = self.mirrored_events(start_date, end_date)
+            if events is not None:
+                logging.info(f"Found {len(events)} calendar events from {start_date} to {end_date} (mirror)")
+                return events
+            
+            time_min = datetime.datetime.combine(start_date, datetime.time.min, tzinfo=CLUB_TZ).isoformat()
+            time_max = datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time.min, tzinfo=CLUB_TZ).isoformat()
+            
+            events = []
+            page_token = None
+            while True:
+                events_result = self.calendar_service.events().list(
+                    calendarId='primary',
+                    timeMin=time_min,
+                    timeMax=time_max,
+                    singleEvents=True,
+                    orderBy='startTime',
+                    maxResults=2500,
+                    pageToken=page_token
+                ).execute()
+                events.extend(events_result.get('items', []))
+                page_token = events_result.get('nextPageToken')
+                if not page_token:
+                    break
+            
+            logging.info(f"Found {len(events)} calendar events from {start_date} to {end_date}")
+            return events
+            
+        except Exception as e:
+            logging.error(f"Failed to get calendar events: {e}")
+            return []
+    
     def is_time_available(self, target_datetime, duration_minutes, events):
-        """Check if a time slot is available in calendar"""
+        """Check if a time slot is available in calendar (naive times are club local time)"""
+        if target_datetime.tzinfo is None:
+            target_datetime = target_datetime.replace(tzinfo=CLUB_TZ)
         end_time = target_datetime + datetime.timedelta(minutes=duration_minutes)
         
         for event in events:
@@ -62,8 +142,8 @@ class BayClubTennisBooking(BayClubBookingBase):
             
             # Parse event times
             if 'T' in event_start:  # DateTime format
-                event_start_dt = datetime.datetime.fromisoformat(event_start.replace('Z', '+00:00'))
-                event_end_dt = datetime.datetime.fromisoformat(event_end.replace('Z', '+00:00'))
+                event_start_dt = parse_event_time(event_start)
+                event_end_dt = parse_event_time(event_end)
                 
                 # Check for overlap
                 if (target_datetime < event_end_dt and end_time > event_start_dt):
@@ -72,78 +152,47 @@ class BayClubTennisBooking(BayClubBookingBase):
         
         return True
     
-    def find_available_times(self, day_name):
-        """Find available 90-minute slots for Friday or Sunday"""
-        today = datetime.datetime.now()
-        current_weekday = today.weekday()
+    def find_available_times(self, day_name, duration_minutes=90, target_date=None):
+        """Find free court start times for Friday or Sunday, as aware club-local datetimes
         
-        # Calculate target date
-        if day_name == "Friday":
-            days_ahead = (4 - current_weekday) % 7
-            if days_ahead == 0 and today.hour >= 18:  # If it's Friday after 6 PM, get next Friday
-                days_ahead = 7
-        else:  # Sunday
-            days_ahead = (6 - current_weekday) % 7
-            if days_ahead == 0 and today.hour >= 18:  # If it's Sunday after 6 PM, get next Sunday
-                days_ahead = 7
-        
-        target_date = (today + datetime.timedelta(days=days_ahead)).date()
+        Travel time and buffers (BAYCLUB_TRAVEL_MINUTES / BAYCLUB_BUFFER_MINUTES) must
+        also be free before and after the booking.
+        """
+        if target_date is None:
+            today = datetime.datetime.now(CLUB_TZ)
+            current_weekday = today.weekday()
+            
+            # Calculate target date
+            if day_name == "Friday":
+                days_ahead = (4 - current_weekday) % 7
+                if days_ahead == 0 and today.hour >= 18:  # If it's Friday after 6 PM, get next Friday
+                    days_ahead = 7
+            else:  # Sunday
+                days_ahead = (6 - current_weekday) % 7
+                if days_ahead == 0 and today.hour >= 18:  # If it's Sunday after 6 PM, get next Sunday
+                    days_ahead = 7
+            
+            target_date = (today + datetime.timedelta(days=days_ahead)).date()
         logging.info(f"Checking availability for {day_name}, {target_date}")
         
         # Get calendar events for that day
         events = self.get_calendar_events(target_date)
         
-        # Check common tennis times (7 AM to 8 PM, every 30 minutes)
-        available_times = []
-        for hour in range(7, 21):  # 7 AM to 9 PM (last slot starts at 8 PM)
-            for minute in [0, 30]:
-                check_time = datetime.datetime.combine(target_date, datetime.time(hour, minute))
-                # Make timezone-aware (UTC) to match calendar events
-                check_time = check_time.replace(tzinfo=datetime.timezone.utc)
-                
-                if self.is_time_available(check_time, 90, events):
-                    available_times.append(check_time)
+        # Check common tennis times (7 AM to 8:30 PM, every 30 minutes) against the busy mask
+        mask = AvailabilityMask(target_date, 1).add_events(events)
+        margin = TRAVEL_MINUTES + BUFFER_MINUTES
+        free = mask.free_starts(duration_minutes, before=margin, after=margin)
+        available_times = mask.starts_on(free, target_date, FIRST_START, LAST_START, SLOT_STEP)
         
-        logging.info(f"Found {len(available_times)} available 90-minute slots on {day_name}")
+        logging.info(f"Found {len(available_times)} available {duration_minutes}-minute slots on {day_name}")
         return available_times, target_date
 
-    def select_location(self):
-        """Select Bay Club Gateway location"""
-        logging.info("Selecting Gateway location...")
+    def select_location(self, club="Gateway"):
+        """Select the Bay Club location (Gateway by default) and open Tennis court booking"""
+        logging.info(f"Selecting {club} location...")
         
         try:
-            # Wait for dashboard to load
-            time.sleep(3)
-            
-            # Click club context selector
-            club_selector = "/html/body/app-root/div/app-dashboard/div/div/div[1]/div[1]/app-club-context-select/div/span[4]"
-            self.page.wait_for_selector(f"xpath={club_selector}", timeout=10000).click()
-            logging.info("Opened club selector")
-            time.sleep(2)
-            
-            # Select Gateway club
-            gateway_club = "/html/body/modal-container/div[2]/div/app-club-context-select-modal/div[2]/div/app-schedule-visit-club/div/div[1]/div/div[2]/div/div[3]/div[1]/div/div[2]/app-radio-select/div/div[2]/div/div[2]/div/span"
-            self.page.wait_for_selector(f"xpath={gateway_club}", timeout=10000).click()
-            logging.info("Selected Gateway club")
-            time.sleep(1)
-            
-            # Click save button
-            save_button = "/html/body/modal-container/div[2]/div/app-club-context-select-modal/div[2]/div/app-schedule-visit-club/div/div[2]/div/div"
-            self.page.wait_for_selector(f"xpath={save_button}", timeout=10000).click()
-            logging.info("Clicked save")
-            time.sleep(2)
-            
-            # Click Schedule Activity
-            schedule_activity = "/html/body/app-root/div/app-navbar/nav/div/div/button/span"
-            self.page.wait_for_selector(f"xpath={schedule_activity}", timeout=10000).click()
-            logging.info("Clicked Schedule Activity")
-            time.sleep(2)
-            
-            # Click Court Booking
-            court_booking = "/html/body/app-root/div/app-schedule-visit/div/div/div[2]/div[1]/div[2]/div/div/img"
-            self.page.wait_for_selector(f"xpath={court_booking}", timeout=10000).click()
-            logging.info("Clicked Court Booking")
-            time.sleep(5)  # Wait longer for page to load
+            self.goto_activity(club, "court_booking")
             
             # Click Tennis
             tennis_xpath = "/html/body/app-root/div/ng-component/app-racquet-sports-filter/div[1]/div[1]/div/div/app-court-booking-category-select/div/div[1]/div/div[2]"
@@ -182,12 +231,13 @@ class BayClubTennisBooking(BayClubBookingBase):
             
         except Exception as e:
             logging.error(f"Location selection failed: {e}")
-            self.page.screenshot(path="location_selection_error.png")
+            self.capture_artifact("location_selection_error")
             raise
 
     def select_day(self, day_name):
         """Select day of week (Friday or Sunday)"""
         logging.info(f"Selecting day: {day_name}")
+        self.feed.clear("courts")
         
         # Wait for day selector to appear
         time.sleep(3)
@@ -201,7 +251,7 @@ class BayClubTennisBooking(BayClubBookingBase):
                 return True
             except Exception as e:
                 logging.error(f"Failed to select Friday: {e}")
-                self.page.screenshot(path="friday_not_found.png")
+                self.capture_artifact("friday_not_found")
                 return False
         
         elif day_name == "Sunday":
@@ -213,56 +263,102 @@ class BayClubTennisBooking(BayClubBookingBase):
                 return True
             except Exception as e:
                 logging.error(f"Failed to select Sunday: {e}")
-                self.page.screenshot(path="sunday_not_found.png")
+                self.capture_artifact("sunday_not_found")
                 return False
         
         return False
 
+    def select_date(self, target_date):
+        """Select any date in the slider by position: one gallery item per Monday-based week
+        
+        Generalizes the Friday/Sunday XPaths (div[5], div[7] of gallery-item[1]) so a
+        multi-week plan can move between days without re-navigating.
+        """
+        logging.info(f"Selecting date: {target_date.strftime('%A, %B %d')}")
+        
+        # The slider starts at the club's today, which the droplet's UTC clock passes hours early
+        today = datetime.datetime.now(CLUB_TZ).date()
+        this_monday = today - datetime.timedelta(days=today.weekday())
+        week = (target_date - this_monday).days // 7 + 1
+        day_xpath = f"/html/body/app-root/div/ng-component/app-racquet-sports-time-slot-select/div[1]/div/div[2]/div/app-date-slider/div/div[2]/gallery/gallery-core/div/gallery-slider/div/div/gallery-item[{week}]/div/div/div[{target_date.weekday() + 1}]/div[1]"
+        try:
+            # Later weeks may be scrolled out of the slider, so click through JS
+            element = self.page.wait_for_selector(f"xpath={day_xpath}", state="attached", timeout=15000)
+            self.feed.clear("courts")
+            self.page.evaluate("element => element.click()", element)
+            logging.info(f"{target_date} selected")
+            if not self.feed.enabled:
+                time.sleep(2)
+            return True
+        except Exception as e:
+            logging.error(f"Failed to select {target_date}: {e}")
+            self.capture_artifact("date_not_found")
+            return False
+
+    def switch_to_hour_view(self):
+        """Switch the time slot list to Hour View"""
+        hour_view_selectors = [
+            "/html/body/app-root/div/ng-component/app-racquet-sports-time-slot-select/div[1]/div/div[3]/div/div/app-court-time-slot-select[1]/div/div[2]/div/app-time-slot-view-type-select/app-button-select/div/div[2]/span",
+            "//span[contains(text(), 'HOUR VIEW')]",
+            "//app-time-slot-view-type-select//div[2]//span",
+        ]
+        
+        for hour_view_xpath in hour_view_selectors:
+            try:
+                element = self.page.wait_for_selector(f"xpath={hour_view_xpath}", timeout=5000)
+                
+                # Try to click it
+                try:
+                    element.click()
+                    logging.info("✓ Switched to Hour View")
+                    return True
+                except:
+                    # Try JS click if regular click fails
+                    self.page.evaluate("element => element.click()", element)
+                    logging.info("✓ JS switched to Hour View")
+                    return True
+            except Exception as e:
+                logging.debug(f"Hour view selector failed: {hour_view_xpath}")
+                continue
+        
+        logging.warning("Could not switch to Hour View, continuing anyway...")
+        return False
+    
+    def find_court_slot_element(self, time_text, timeout=10000):
+        """The rendered slot item with the same start time as time_text (e.g. a time from the slot data)"""
+        self.switch_to_hour_view()
+        wanted = parse_court_start_time(time_text).time()
+        try:
+            self.page.wait_for_selector("app-court-time-slot-item", timeout=timeout)
+        except PlaywrightTimeoutError:
+            return None
+        for element in self.page.query_selector_all("app-court-time-slot-item"):
+            try:
+                if parse_court_start_time(element.text_content()).time() == wanted:
+                    return element
+            except ValueError:
+                continue
+        return None
+    
     def get_available_court_times(self):
-        """Get available court times from the page"""
+        """Get available court times, from the app's slot data when it arrives, else from the page
+        
+        Times from the slot data come back without an element; book_court_at_time finds
+        the rendered slot when it is needed.
+        """
+        slots = self.feed.wait(self.page, "courts")
+        if slots is not None:
+            available_times = [(slot.text, None) for slot in slots if slot.available]
+            logging.info(f"Found {len(available_times)} available court times in the slot data")
+            return available_times
+        
         try:
             logging.info("Waiting for time slots page to load...")
             time.sleep(3)
             
-            # Switch to Hour View first
-            hour_view_selectors = [
-                "/html/body/app-root/div/ng-component/app-racquet-sports-time-slot-select/div[1]/div/div[3]/div/div/app-court-time-slot-select[1]/div/div[2]/div/app-time-slot-view-type-select/app-button-select/div/div[2]/span",
-                "//span[contains(text(), 'HOUR VIEW')]",
-                "//app-time-slot-view-type-select//div[2]//span",
-            ]
-            
-            hour_view_clicked = False
-            for hour_view_xpath in hour_view_selectors:
-                try:
-                    if hour_view_xpath.startswith("//"):
-                        element = self.page.wait_for_selector(f"xpath={hour_view_xpath}", timeout=5000)
-                    else:
-                        element = self.page.wait_for_selector(f"xpath={hour_view_xpath}", timeout=5000)
-                    
-                    # Try to click it
-                    try:
-                        element.click()
-                        logging.info("✓ Switched to Hour View")
-                        hour_view_clicked = True
-                        break
-                    except:
-                        # Try JS click if regular click fails
-                        self.page.evaluate("element => element.click()", element)
-                        logging.info("✓ JS switched to Hour View")
-                        hour_view_clicked = True
-                        break
-                except Exception as e:
-                    logging.debug(f"Hour view selector failed: {hour_view_xpath}")
-                    continue
-            
-            if not hour_view_clicked:
-                logging.warning("Could not switch to Hour View, continuing anyway...")
+            self.switch_to_hour_view()
             
             time.sleep(3)  # Wait for hour view to load
-            
-            # Take a screenshot to see what's on the page
-            self.page.screenshot(path="times_page.png")
-            
             # Try to find app-court-time-slot-item elements with various approaches
             time_slot_elements = []
             
@@ -333,7 +429,7 @@ class BayClubTennisBooking(BayClubBookingBase):
             
         except Exception as e:
             logging.error(f"Failed to get available court times: {e}")
-            self.page.screenshot(path="court_times_error.png")
+            self.capture_artifact("court_times_error")
             return []
     
     def book_court_at_time(self, time_text, element=None):
@@ -341,8 +437,14 @@ class BayClubTennisBooking(BayClubBookingBase):
         try:
             logging.info(f"Attempting to book: {time_text}")
             
+            if element and not is_attached(element):
+                logging.debug(f"Element for {time_text} is no longer on the page, finding it again")
+                element = None
+            if not element:
+                element = self.find_court_slot_element(time_text)
             if not element:
-                logging.error("No element provided to click")
+                logging.error(f"No slot on the page for {time_text}")
+                self.capture_artifact("court_slot_not_rendered")
                 return False
             
             # Scroll element into view first
@@ -387,7 +489,7 @@ class BayClubTennisBooking(BayClubBookingBase):
             
             if not click_success:
                 logging.error(f"Failed to click time slot: {time_text}")
-                self.page.screenshot(path="click_failed.png")
+                self.capture_artifact("click_failed")
                 return False
             
             time.sleep(3)  # Wait for selection to register
@@ -416,53 +518,303 @@ class BayClubTennisBooking(BayClubBookingBase):
                 return True
             except Exception as e:
                 logging.error(f"Failed to click Next button: {e}")
-                self.page.screenshot(path="next_button_error.png")
+                self.capture_artifact("next_button_error")
                 return False
             
         except Exception as e:
             logging.error(f"Failed to book time {time_text}: {e}")
-            self.page.screenshot(path="next_button_error.png")
+            self.capture_artifact("next_button_error")
             return False
             
         except Exception as e:
             logging.error(f"Failed to book time {time_text}: {e}")
             return False
 
+    def select_partner(self):
+        """Add the partner to the booking by name, clicking the cached roster row if it still shows them
+        
+        Raises:
+            RuntimeError: if the partner isn't in the player list
+        """
+        self.page.wait_for_selector(f"xpath={PLAYER_LIST}/div", timeout=10000)
+        if not self.partner:
+            logging.warning(f"No partner configured (BAYCLUB_PARTNER), selecting player row {LEGACY_PARTNER_ROW}")
+            self.page.click(f"xpath={player_toggle_xpath(LEGACY_PARTNER_ROW)}", timeout=2000)
+            return
+        
+        account = self.username or "default"
+        row = cached_row(account, self.partner)
+        toggle = self.page.query_selector(f"xpath={player_toggle_xpath(row, self.partner)}") if row else None
+        if not toggle:
+            players = read_roster(self.page)
+            save_roster(account, players)
+            row = players.get(self.partner)
+            if not row:
+                raise RuntimeError(f"Partner '{self.partner}' is not in the player list "
+                                   f"({len(players)} players: {', '.join(list(players)[:10])})")
+            toggle = self.page.query_selector(f"xpath={player_toggle_xpath(row, self.partner)}")
+            logging.info(f"Player roster refreshed: {len(players)} players")
+        
+        toggle.click()
+        logging.info(f"✓ Selected {self.partner} (player row {row})")
+
     def confirm_booking(self):
         """Confirm the tennis court booking"""
         logging.info("Confirming booking...")
         
         try:
             # Step 1: Select who I'm playing with
-            time.sleep(3)
-            player_selector_xpath = "/html/body/app-root/div/ng-component/app-racquet-sports-confirm-booking/div[1]/div/div/div/div/div[2]/app-racquet-sports-player-select/div/div[15]/app-racquet-sports-person/div/div[1]/div/div"
             try:
-                self.page.wait_for_selector(f"xpath={player_selector_xpath}", timeout=10000).click()
-                logging.info("✓ Selected player")
-                time.sleep(3)
+                self.select_partner()
             except Exception as e:
-                logging.warning(f"Could not select player: {e}")
-                self.page.screenshot(path="player_selection_error.png")
+                logging.error(f"Could not select partner: {e}")
+                self.capture_artifact("player_selection_error")
+                return False
+            
+            if self.dry_run:
+                return self.skip_confirm()
             
             # Step 2: Click final confirmation button
             final_confirm_xpath = "//button[contains(text(), 'CONFIRM')]"
             try:
                 element = self.page.wait_for_selector(f"xpath={final_confirm_xpath}", timeout=10000)
                 self.page.evaluate("element => element.click()", element)
+                rejection = self.booking_rejection()
+                if rejection:
+                    logging.warning(f"Booking turned down: {rejection}")
+                    return False
                 logging.info("✓ Booking confirmed")
-                time.sleep(3)
                 return True
             except Exception as e:
                 logging.error(f"Failed to click confirmation: {e}")
-                self.page.screenshot(path="final_confirm_error.png")
+                self.capture_artifact("final_confirm_error")
                 return False
             
         except Exception as e:
             logging.error(f"Failed to confirm booking: {e}")
-            self.page.screenshot(path="confirm_booking_failed.png")
+            self.capture_artifact("confirm_booking_failed")
+            return False
+
+    def booking_rejection(self, timeout=3000):
+        """The club's message if the booking was turned down (slot taken, limit reached), else None"""
+        try:
+            element = self.page.wait_for_selector(BOOKING_RESULT, timeout=timeout)
+        except PlaywrightTimeoutError:
+            return None
+        text = " ".join(element.text_content().split())
+        return text if BOOKING_REJECTED.search(text) else None
+
+    def cancel_reservation(self, target_date, time_text):
+        """Cancel one of our court reservations from My Reservations
+        
+        Returns:
+            bool: True if it was cancelled
+        """
+        if self.dry_run:
+            logging.info(f"DRY RUN: would cancel {time_text} on {target_date}")
+            return True
+        
+        wanted = parse_court_start_time(time_text).time()
+        day_pattern = re.compile(rf"\b{re.escape(target_date.strftime('%A, %B %-d'))}\b")
+        try:
+            self.page.goto(f"{self.base_url}{RESERVATIONS_PATH}", timeout=10000)
+            self.page.wait_for_selector("app-reservation-item", timeout=10000)
+            for item in self.page.query_selector_all("app-reservation-item"):
+                label = item.query_selector("xpath=div/div[1]/span[3]")
+                if not label or not day_pattern.search(item.text_content()):
+                    continue
+                if parse_court_start_time(label.text_content()).time() != wanted:
+                    continue
+                item.query_selector("xpath=div/div[2]/button").click()
+                result = self.page.wait_for_selector("text=/cancelled|too late|not found/i", timeout=10000)
+                message = " ".join(result.text_content().split())
+                if "cancelled" in message.lower():
+                    logging.info(f"✓ Cancelled {time_text} on {target_date}")
+                    return True
+                logging.error(f"Could not cancel {time_text} on {target_date}: {message}")
+                return False
+            logging.error(f"No reservation for {time_text} on {target_date} in My Reservations")
+        except Exception as e:
+            logging.error(f"Failed to cancel {time_text} on {target_date}: {e}")
+        self.capture_artifact("cancel_failed")
+        return False
+
+    def holds_allowed(self, target_date, starts):
+        """How many of the ranked court starts the club rules let this account hold at once on target_date
+        
+        Reservations the ledger already has for the account that day count against the daily limit.
+        """
+        existing = 0
+        if self.ledger and not self.dry_run:
+            existing = self.ledger.count_on(self.username, "tennis", target_date)
+        return self.speculation.holds_for(self.club, starts, datetime.datetime.now(CLUB_TZ), existing)
+
+    def prepare_holds(self, target_date, starts):
+        """Start helper sessions for speculative holds when the club rules allow more than one at once
+        
+        starts are the likely candidates, best first. book_day calls this once the calendar
+        is known; calling it earlier (e.g. before a release) gives the helpers time to log in
+        and open the court page.
+        """
+        if not self.holds:
+            count = self.holds_allowed(target_date, starts)
+            if count > 1:
+                self.holds = start_holds(
+                    count - 1, self.club, target_date, username=self.username, password=self.password,
+                    base_url=self.base_url, dry_run=self.dry_run, partner=self.partner,
+                    browser_server=self.browser_server
+                )
+        return self.holds
+
+    def book_day(self, day_name, preferred_time=None, target_date=None, duration=90,
+                 calendar_summary=None, calendar_description=None):
+        """Book the best court on day_name that also fits the calendar
+        
+        Args:
+            day_name: "Friday" or "Sunday"
+            preferred_time: Optional court time (e.g. "10:00 AM") to book instead of using the slot policy
+            target_date: Exact date to book (any day in the slider); defaults to the next day_name
+        
+        Returns:
+            bool: True if a court was booked, False otherwise
+        """
+        logging.info("=" * 50)
+        logging.info(f"Checking {day_name} availability")
+        logging.info("=" * 50)
+        
+        self.run.target = f"{day_name} {preferred_time or 'best available'}"
+        
+        with self.step("calendar"):
+            calendar_times, target_date = self.find_available_times(day_name, duration, target_date)
+        
+        if not calendar_times:
+            logging.warning(f"No calendar availability on {day_name}")
+            self.run.outcome = "no_slots"
+            return False
+        
+        logging.info(f"Found {len(calendar_times)} calendar slots on {day_name}")
+        
+        if not preferred_time:
+            # The court page isn't open yet: the calendar starts in policy order stand in for the candidates
+            self.prepare_holds(target_date, load_policy().rank(calendar_times))
+        try:
+            return self._book_on_date(day_name, target_date, calendar_times, preferred_time, duration,
+                                      calendar_summary, calendar_description)
+        finally:
+            stop_holds(self.holds)
+            self.holds = []
+
+    def _book_on_date(self, day_name, target_date, calendar_times, preferred_time, duration,
+                      calendar_summary, calendar_description):
+        with self.step("select_day"):
+            if not self.select_date(target_date):
+                raise RuntimeError(f"Failed to select {day_name} {target_date}")
+        
+        # Get available court times from the page
+        with self.step("scrape_slots"):
+            court_times = self.get_available_court_times()
+        
+        if not court_times:
+            logging.warning(f"No court times available on {day_name}")
+            self.run.outcome = "no_slots"
+            return False
+        
+        with self.step("decide"):
+            if preferred_time:
+                candidates = [
+                    time_text for time_text, _ in court_times
+                    if parse_court_start_time(time_text).time() == parser.parse(preferred_time).time()
+                ][:1]
+                if not candidates:
+                    logging.warning(f"Preferred time {preferred_time} not available on {day_name}")
+            else:
+                candidates = rank_booking_times(calendar_times, court_times, day_name)
+        
+        if not candidates:
+            logging.warning(f"No matching times on {day_name}")
+            self.run.outcome = "no_slots"
+            return False
+        
+        logging.info(f"📅 Booking {candidates[0]} on {day_name} ({len(candidates) - 1} fallbacks ranked)")
+        if self.holds and not preferred_time:
+            starts = [datetime.datetime.combine(target_date, parse_court_start_time(text).time(), tzinfo=CLUB_TZ)
+                      for text in candidates]
+            # Helpers beyond what the real candidates allow are sent home by stop_holds
+            helpers = self.holds[:self.holds_allowed(target_date, starts) - 1]
+            time_text = book_speculatively(self, candidates, court_times, helpers)
+        else:
+            time_text = self.book_candidates(candidates, court_times)
+        if time_text:
+            self.mark_booked()
+            booked_time = parse_court_start_time(time_text)
+            self.verify_reservations([Target("tennis", self.club, target_date, booked_time.time())])
+            booked_datetime = datetime.datetime.combine(target_date, booked_time.time(), tzinfo=CLUB_TZ)
+            self.add_tennis_to_calendar(booked_datetime, duration, calendar_summary, calendar_description)
+            logging.info(f"✓ Successfully booked {day_name} at {time_text}!")
+            return True
+        
+        logging.warning(f"Failed to book any of {len(candidates)} candidate times on {day_name}")
+        return False
+
+    def book_candidates(self, candidates, court_times, budget=FALLBACK_SECONDS, date=None):
+        """Book the first candidate court time that can be had, best first, within budget seconds
+        
+        Element handles already resolved in court_times are reused while they are still
+        on the page. After a failed attempt the page goes back to the time slot list and
+        the next candidate is tried without scraping again. Candidates that were tried and
+        not had are recorded on the run (prefixed with date, as the planner records its slots).
+        
+        Returns:
+            str: the booked court time text, or None
+        """
+        elements = dict(court_times)
+        deadline = time.monotonic() + budget
+        for attempt, time_text in enumerate(candidates):
+            if attempt:
+                if time.monotonic() > deadline:
+                    logging.warning(f"Fallback budget of {budget:.0f}s used up after {attempt} of {len(candidates)} candidates")
+                    return None
+                if not self.return_to_slot_list():
+                    return None
+                logging.info(f"↪ Falling back to {time_text} (candidate {attempt + 1} of {len(candidates)})")
+            
+            self.run.chosen_slot = time_text
+            with self.step("select_slot"):
+                selected = self.book_court_at_time(time_text, elements.get(time_text))
+            if selected:
+                with self.step("confirm"):
+                    confirmed = self.confirm_booking()
+                if confirmed:
+                    self.run.fallbacks += attempt
+                    if attempt:
+                        logging.info(f"✓ Got {time_text} after {attempt} fallback(s)")
+                    return time_text
+            self.run.lost_slots.append(f"{date} {time_text}" if date else time_text)
+        return None
+
+    def return_to_slot_list(self, max_back=1):
+        """Back to the time slot list, going back at most max_back pages; a no-op if the page never left it
+        
+        One step back is enough after a failed attempt; after a confirmed booking the
+        confirmation page sits in between.
+        """
+        if self.page.query_selector("app-court-time-slot-item"):
+            return True
+        try:
+            for attempt in range(max_back):
+                self.page.go_back(timeout=10000)
+                try:
+                    self.page.wait_for_selector("app-court-time-slot-item", timeout=5000 if attempt < max_back - 1 else 10000)
+                    return True
+                except PlaywrightTimeoutError:
+                    if attempt == max_back - 1:
+                        raise
+        except Exception as e:
+            logging.warning(f"Could not get back to the time slot list: {e}")
+            self.capture_artifact("slot_list_lost")
             return False
 
-    def add_tennis_to_calendar(self, booking_time, duration_minutes=90):
+    def add_tennis_to_calendar(self, booking_time, duration_minutes=90, summary=None, description=None):
         """Add the booked tennis court to Google Calendar"""
         try:
             start = booking_time
@@ -470,9 +822,9 @@ class BayClubTennisBooking(BayClubBookingBase):
             
             # Use base class method to add calendar event
             return self.add_calendar_event(
-                summary='Tennis Court - Bay Club Gateway',
-                location='Bay Club Gateway',
-                description=f'{duration_minutes}-minute tennis court booking',
+                summary=summary or f'Tennis Court - Bay Club {self.club or "Gateway"}',
+                location=f'Bay Club {self.club or "Gateway"}',
+                description=description or f'{duration_minutes}-minute tennis court booking',
                 start_datetime=start,
                 end_datetime=end
             )
@@ -482,345 +834,300 @@ class BayClubTennisBooking(BayClubBookingBase):
             return False
 
 
-def decide_booking_time_with_llm(calendar_times, court_times, day_name):
-    """Use LLM to decide which time to book based on calendar and court availability"""
+def parse_court_start_time(time_text):
+    """Parse the start time out of a court slot label like "6:00 - 7:30 AM" or "10:00 AM" """
+    # Parse the time for calendar - extract start time from range
+    normalized_time = ' '.join(time_text.split())
+    if '-' in normalized_time:
+        start_time_str = normalized_time.split('-')[0].strip()
+        # Add AM/PM if missing
+        if 'AM' not in start_time_str.upper() and 'PM' not in start_time_str.upper():
+            if 'AM' in normalized_time.upper():
+                start_time_str += ' AM'
+            elif 'PM' in normalized_time.upper():
+                start_time_str += ' PM'
+    else:
+        start_time_str = normalized_time
+    
+    return parser.parse(start_time_str)
+
+
+def match_court_times(calendar_times, court_times):
+    """Court slots that start at one of the free calendar times
+    
+    Both sides go into a minute mask for the calendar day and are intersected
+    with one AND, so matching is on the actual local start time.
+    
+    Returns:
+        list: (court time text, aware start datetime) in page order
+    """
+    if not calendar_times:
+        return []
+    target_date = calendar_times[0].astimezone(CLUB_TZ).date()
+    mask = AvailabilityMask(target_date, 1)
+    
+    starts = []
+    for court_time, _ in court_times:
+        try:
+            start = datetime.datetime.combine(target_date, parse_court_start_time(court_time).time(), tzinfo=CLUB_TZ)
+            starts.append((court_time, start))
+        except Exception as e:
+            logging.debug(f"Could not parse time '{court_time}': {e}")
+    
+    both = mask.slot_mask(calendar_times) & mask.slot_mask(start for _, start in starts)
+    return [(court_time, start) for court_time, start in starts if both >> mask.minute_index(start) & 1]
+
+
+def _llm_request(prompt, stream=False):
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {MODEL_ACCESS_KEY}"
+    }
+    data = {
+        "model": LLM_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": 100  # Increase to avoid truncation
+    }
+    if stream:
+        data["stream"] = True
+    return get_client().post(LLM_URL, headers=headers, json=data, timeout=LLM_TIMEOUT, stream=stream)
+
+
+def request_llm_time(prompt):
+    """Ask the LLM and wait for the whole completion; returns the time it names (or its raw answer)"""
+    response_json = _llm_request(prompt).json()
+    
+    logging.debug(f"API response: {response_json}")
+    
+    # Check if response is valid
+    if 'choices' not in response_json or len(response_json['choices']) == 0:
+        logging.error(f"Invalid API response: {response_json}")
+        raise Exception("Invalid API response")
+    
+    # Try to get content, fallback to reasoning_content
+    message = response_json['choices'][0].get('message', {})
+    message_content = message.get('content') or message.get('reasoning_content')
+    
+    if not message_content or not message_content.strip():
+        logging.warning(f"Empty response from LLM. Full response: {response_json}")
+        raise Exception("Empty response from LLM")
+    
+    recommended_time = message_content.strip()
+    # Extract just the time if there's extra text
+    # Look for patterns like "10:00 AM" or "2:30 PM"
+    time_match = TIME_PATTERN.search(recommended_time)
+    if time_match:
+        recommended_time = time_match.group(1)
+    return recommended_time
+
+
+def _first_valid_time(text, valid_starts):
+    for time_match in TIME_PATTERN.finditer(text):
+        try:
+            parsed = parser.parse(time_match.group(1))
+        except (ValueError, OverflowError):
+            continue
+        if (parsed.hour, parsed.minute) in valid_starts:
+            return time_match.group(1)
+    return None
+
+
+def stream_llm_time(prompt, valid_starts):
+    """Ask the LLM with a streamed (SSE) completion and stop reading at the first valid time
+    
+    Only the answer (content) is checked as it arrives, since the reasoning may
+    mention times it goes on to reject. Closing the response drops the connection,
+    which ends the generation on the server.
+    
+    Args:
+        valid_starts: {(hour, minute)} that are free on both the calendar and the court
+    
+    Returns:
+        str: the time the LLM named, or its raw answer if none was valid
+    """
+    response = _llm_request(prompt, stream=True)
+    content, reasoning = "", ""
+    try:
+        if response.status_code != 200:
+            raise Exception(f"LLM stream failed: HTTP {response.status_code}")
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+            choices = json.loads(payload).get("choices") or [{}]
+            delta = choices[0].get("delta", {})
+            reasoning += delta.get("reasoning_content") or ""
+            if delta.get("content"):
+                content += delta["content"]
+                chosen = _first_valid_time(content, valid_starts)
+                if chosen:
+                    logging.info("LLM stream stopped early at a valid time")
+                    return chosen
+    finally:
+        response.close()
+    
+    # Same fallbacks as the full response: any time in the answer, then in the reasoning
+    answer = content.strip() or reasoning.strip()
+    if not answer:
+        raise Exception("Empty response from LLM")
+    time_match = TIME_PATTERN.search(answer)
+    return time_match.group(1) if time_match else answer
+
+
+def rank_booking_times(calendar_times, court_times, day_name):
+    """Court times free on both sides, best first: the order book_candidates tries them in
+    
+    Scores come from the compiled slot policy, so this is a lookup per candidate.
+    With BAYCLUB_DECISION=llm the LLM's pick goes first and the policy orders the rest.
+    """
+    matches = match_court_times(calendar_times, court_times)
+    if not matches:
+        return []
+    policy = load_policy()
+    ranked = [court_time for court_time, _ in policy.rank(matches, key=lambda match: match[1])]
+    
+    if DECISION_MODE == "llm":
+        choice = decide_booking_time_with_llm(calendar_times, court_times, day_name)
+        if choice in ranked:
+            ranked.remove(choice)
+            ranked.insert(0, choice)
+        return ranked
+    
+    best = dict(matches)[ranked[0]]
+    logging.info(f"✓ Policy picks {ranked[0]} on {day_name} (score {policy.score(best):.1f}), "
+                 f"then {', '.join(ranked[1:4]) or 'nothing else'}")
+    return ranked
+
+
+def is_attached(element):
+    """Whether an element handle still points at a node in the page"""
+    try:
+        return element.evaluate("element => element.isConnected")
+    except Exception:
+        return False
+
+
+def decide_booking_time_with_llm(calendar_times, court_times, day_name, stream=None):
+    """Use LLM to decide which time to book based on calendar and court availability
+    
+    With stream (default BAYCLUB_LLM_STREAM), the completion is read as it is
+    generated and abandoned as soon as it names a bookable time.
+    """
+    if stream is None:
+        stream = LLM_STREAM
+    matches = match_court_times(calendar_times, court_times)
+    if not matches:
+        return None
+    
     try:
         if not MODEL_ACCESS_KEY:
             logging.warning("MODEL_ACCESS_KEY not set, falling back to first available time")
-            # Return first matching time
-            for court_time, _ in court_times:
-                ct = parser.parse(court_time)
-                for cal_time in calendar_times:
-                    if ct.hour == cal_time.hour and ct.minute == cal_time.minute:
-                        return court_time
-            return None
+            return matches[0][0]
         
         # Format times for LLM
         calendar_times_str = ", ".join([t.strftime("%I:%M %p") for t in calendar_times])
         court_times_str = ", ".join([time_text for time_text, _ in court_times])
+        favourites = load_policy().favourites(matches[0][1].weekday())
+        favourites_str = " or ".join(t.strftime("%-I:%M %p") for t in favourites)
         
         prompt = f"""You are a tennis booking assistant. I need to book a tennis court for {day_name}.
 
 My calendar is FREE during these times (90-minute slots):
-{calendar_times_str}. However, my preferences are for 10am or 12pm if possible.
+{calendar_times_str}. However, my preferences are for {favourites_str} if possible.
 
 The tennis courts are AVAILABLE at these times:
 {court_times_str}
 
 Please analyze both lists and recommend the BEST time to book that:
 1. Appears in BOTH lists (I'm free AND court is available)
-2. Preferably in the morning or early afternoon (better for tennis)
-3. Avoid very early morning (before 8 AM) or late evening (after 7 PM) if possible
+2. Is as close as possible to my preferred times
 
 Respond with ONLY the time in format like "9:00 AM" or "2:30 PM". No explanation, just the time."""
         
         logging.info("Asking LLM to decide best booking time...")
         
-        url = "https://inference.do-ai.run/v1/chat/completions"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {MODEL_ACCESS_KEY}"
-        }
-        data = {
-            "model": "openai-gpt-oss-120b",
-            "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": 100  # Increase to avoid truncation
-        }
-        
-        response = requests.post(url, headers=headers, json=data)
-        response_json = response.json()
-        
-        logging.debug(f"API response: {response_json}")
-        
-        # Check if response is valid
-        if 'choices' not in response_json or len(response_json['choices']) == 0:
-            logging.error(f"Invalid API response: {response_json}")
-            raise Exception("Invalid API response")
-        
-        # Try to get content, fallback to reasoning_content
-        message = response_json['choices'][0].get('message', {})
-        message_content = message.get('content') or message.get('reasoning_content')
-        
-        if not message_content or not message_content.strip():
-            logging.warning(f"Empty response from LLM. Full response: {response_json}")
-            raise Exception("Empty response from LLM")
-        
-        recommended_time = message_content.strip()
-        # Extract just the time if there's extra text
-        # Look for patterns like "10:00 AM" or "2:30 PM"
-        import re
-        time_match = re.search(r'\b(\d{1,2}:\d{2}\s*(?:AM|PM))\b', recommended_time, re.IGNORECASE)
-        if time_match:
-            recommended_time = time_match.group(1)
+        valid_starts = {(start.hour, start.minute) for _, start in matches}
+        if stream:
+            recommended_time = stream_llm_time(prompt, valid_starts)
+        else:
+            recommended_time = request_llm_time(prompt)
         
         logging.info(f"🤖 LLM recommends: {recommended_time}")
         
-        # FIRST: Check if preferred times (10am or 12pm) are available
-        # We want to prioritize these over any LLM recommendation
-        preferred_hours = [10, 12]
-        preferred_available = []
-        
-        for court_time, _ in court_times:
-            normalized_time = ' '.join(court_time.split())
-            
-            if '-' in normalized_time:
-                time_parts = normalized_time.split('-')
-                time_str = time_parts[0].strip()
-                
-                if 'AM' not in time_str.upper() and 'PM' not in time_str.upper():
-                    full_time = normalized_time.upper()
-                    if 'AM' in full_time:
-                        time_str += ' AM'
-                    elif 'PM' in full_time:
-                        time_str += ' PM'
-            else:
-                time_str = normalized_time
-            
-            try:
-                ct = parser.parse(time_str)
-                # Check if it's a preferred time AND in calendar
-                if ct.hour in preferred_hours:
-                    for cal_time in calendar_times:
-                        if ct.hour == cal_time.hour and ct.minute == cal_time.minute:
-                            preferred_available.append((court_time, ct.hour))
-            except Exception as e:
-                logging.debug(f"Could not parse time '{court_time}': {e}")
-                continue
-        
-        # If preferred times are available, use them (prefer 10am over 12pm)
-        if preferred_available:
-            # Sort by hour (10am first, then 12pm)
-            preferred_available.sort(key=lambda x: x[1])
-            chosen_time = preferred_available[0][0]
-            logging.info(f"✓ Using PREFERRED time over LLM recommendation: {chosen_time}")
-            return chosen_time
-        
-        # No preferred times available, so validate LLM recommendation
+        # Validate the LLM recommendation against the times that are free on both sides
         try:
             rec_time = parser.parse(recommended_time)
-            # Check it exists in court times
-            for court_time, _ in court_times:
-                # Normalize the time string
-                normalized_time = ' '.join(court_time.split())
-                
-                # Parse time ranges like "6:00 - 7:30 AM" by extracting start time
-                if '-' in normalized_time:
-                    time_parts = normalized_time.split('-')
-                    time_str = time_parts[0].strip()
-                    
-                    # If no AM/PM in start time, get it from end of full string
-                    if 'AM' not in time_str.upper() and 'PM' not in time_str.upper():
-                        full_time = normalized_time.upper()
-                        if 'AM' in full_time:
-                            time_str += ' AM'
-                        elif 'PM' in full_time:
-                            time_str += ' PM'
-                else:
-                    time_str = normalized_time
-                
-                try:
-                    ct = parser.parse(time_str)
-                    if ct.hour == rec_time.hour and ct.minute == rec_time.minute:
-                        # Check it exists in calendar times
-                        for cal_time in calendar_times:
-                            if ct.hour == cal_time.hour and ct.minute == cal_time.minute:
-                                logging.info(f"✓ LLM recommendation validated (no preferred times available): {recommended_time}")
-                                return court_time
-                except Exception as e:
-                    logging.debug(f"Error parsing court_time '{court_time}': {e}")
-                    continue
+            for court_time, start in matches:
+                if (start.hour, start.minute) == (rec_time.hour, rec_time.minute):
+                    logging.info(f"✓ LLM recommendation validated: {recommended_time}")
+                    return court_time
         except Exception as e:
             logging.warning(f"Could not parse LLM recommendation '{recommended_time}': {e}")
         
         # Fallback: return any matching time
         logging.warning("LLM recommendation invalid, using any available fallback")
-        
-        for court_time, _ in court_times:
-            normalized_time = ' '.join(court_time.split())
-            
-            if '-' in normalized_time:
-                time_parts = normalized_time.split('-')
-                time_str = time_parts[0].strip()
-                
-                if 'AM' not in time_str.upper() and 'PM' not in time_str.upper():
-                    full_time = normalized_time.upper()
-                    if 'AM' in full_time:
-                        time_str += ' AM'
-                    elif 'PM' in full_time:
-                        time_str += ' PM'
-            else:
-                time_str = normalized_time
-            
-            try:
-                ct = parser.parse(time_str)
-                for cal_time in calendar_times:
-                    if ct.hour == cal_time.hour and ct.minute == cal_time.minute:
-                        logging.info(f"Using fallback time: {court_time}")
-                        return court_time
-            except Exception as e:
-                logging.debug(f"Could not parse time '{court_time}': {e}")
-                continue
-        
-        return None
+        logging.info(f"Using fallback time: {matches[0][0]}")
+        return matches[0][0]
         
     except Exception as e:
         logging.error(f"LLM decision failed: {e}")
         # Fallback: return first matching time
-        for court_time, _ in court_times:
-            ct = parser.parse(court_time)
-            for cal_time in calendar_times:
-                if ct.hour == cal_time.hour and ct.minute == cal_time.minute:
-                    return court_time
-        return None
+        return matches[0][0]
 
 
-def main():
-    """Main tennis booking logic - Run on Tuesday (for Friday) and Thursday (for Sunday)"""
-    today = datetime.datetime.now()
-    weekday = today.weekday()
+def book_tennis(day_name, club="Gateway", preferred_time=None, username=None, password=None, headless=False,
+                target_date=None, duration=90, calendar_summary=None, calendar_description=None, dry_run=False,
+                partner=None, release_at=None):
+    """Run the full court booking flow for one day
     
-    logging.info(f"Starting Tennis Booking - {today.strftime('%A %Y-%m-%d')}")
-    logging.info("Note: Run on Tuesday to book Friday, or Thursday to book Sunday")
+    With target_date, a court already in the reservation ledger for that day (at
+    preferred_time, if given) is not booked again. With release_at, the court page
+    is opened first and the day is only picked once booking opens by the club's clock.
     
+    Returns:
+        bool: True if a court was booked (or already was), False otherwise
+    """
+    wanted = parser.parse(preferred_time).time() if preferred_time else None
+    target = Target("tennis", club, target_date, wanted) if target_date else None
     try:
-        with BayClubTennisBooking(headless=False) as booking:
-            booking.login()
-            booking.select_location()
-            
-            # Book Friday (testing purposes - will run on Tuesday in production)
-            logging.info("=" * 50)
-            logging.info("Checking Friday availability")
-            logging.info("=" * 50)
-            
-            friday_times, friday_date = booking.find_available_times("Friday")
-            
-            if friday_times:
-                logging.info(f"Found {len(friday_times)} calendar slots on Friday")
-                
-                if not booking.select_day("Friday"):
-                    raise RuntimeError("Failed to select Friday")
-                
-                # Get available court times from the page
-                court_times = booking.get_available_court_times()
-                
-                if court_times:
-                    # Use LLM to decide which time to book
-                    recommended_time = decide_booking_time_with_llm(friday_times, court_times, "Friday")
-                    
-                    if recommended_time:
-                        logging.info(f"📅 Booking {recommended_time} on Friday")
-                        
-                        # Find the element for this time
-                        booked = False
-                        for time_text, element in court_times:
-                            if time_text.strip() == recommended_time.strip():
-                                if booking.book_court_at_time(time_text, element):
-                                    if booking.confirm_booking():
-                                        # Parse the time for calendar - extract start time from range
-                                        normalized_time = ' '.join(time_text.split())
-                                        if '-' in normalized_time:
-                                            start_time_str = normalized_time.split('-')[0].strip()
-                                            # Add AM/PM if missing
-                                            if 'AM' not in start_time_str.upper() and 'PM' not in start_time_str.upper():
-                                                if 'AM' in normalized_time.upper():
-                                                    start_time_str += ' AM'
-                                                elif 'PM' in normalized_time.upper():
-                                                    start_time_str += ' PM'
-                                        else:
-                                            start_time_str = normalized_time
-                                        
-                                        booked_time = parser.parse(start_time_str)
-                                        booked_datetime = datetime.datetime.combine(friday_date, booked_time.time())
-                                        # Make timezone-aware for calendar API
-                                        booked_datetime = booked_datetime.replace(tzinfo=datetime.timezone.utc)
-                                        booking.add_tennis_to_calendar(booked_datetime)
-                                        logging.info(f"✓ Successfully booked Friday at {time_text}!")
-                                        booked = True
-                                        break
-                        
-                        if not booked:
-                            logging.warning(f"Failed to book recommended time: {recommended_time}")
-                    else:
-                        logging.warning("LLM found no matching times on Friday")
-                else:
-                    logging.warning("No court times available on Friday")
-            else:
-                logging.warning("No calendar availability on Friday")
-            
-            # TODO: Enable Sunday booking later
-            # For testing, only booking Friday
-            # To enable: uncomment the Sunday section below
-            
-            # # Try Sunday (will run on Thursday in production)
-            # logging.info("=" * 50)
-            # logging.info("Checking Sunday availability")
-            # logging.info("=" * 50)
-            # 
-            # # Navigate back or refresh for Sunday
-            # booking.page.goto("https://bayclubconnect.com/home/dashboard", timeout=10000)
-            # time.sleep(2)
-            # booking.select_location()
-            # 
-            # sunday_times, sunday_date = booking.find_available_times("Sunday")
-            # 
-            # if sunday_times:
-            #     logging.info(f"Found {len(sunday_times)} calendar slots on Sunday")
-            #     
-            #     if not booking.select_day("Sunday"):
-            #         raise RuntimeError("Failed to select Sunday")
-            #     
-            #     # Get available court times from the page
-            #     court_times = booking.get_available_court_times()
-            #     
-            #     if court_times:
-            #         # Use LLM to decide which time to book
-            #         recommended_time = decide_booking_time_with_llm(sunday_times, court_times, "Sunday")
-            #         
-            #         if recommended_time:
-            #             logging.info(f"📅 Booking {recommended_time} on Sunday")
-            #             
-            #             # Find the element for this time
-            #             booked = False
-            #             for time_text, element in court_times:
-            #                 if time_text.strip() == recommended_time.strip():
-            #                     if booking.book_court_at_time(time_text, element):
-            #                         if booking.confirm_booking():
-            #                             # Parse the time for calendar - extract start time from range
-            #                             normalized_time = ' '.join(time_text.split())
-            #                             if '-' in normalized_time:
-            #                                 start_time_str = normalized_time.split('-')[0].strip()
-            #                                 # Add AM/PM if missing
-            #                                 if 'AM' not in start_time_str.upper() and 'PM' not in start_time_str.upper():
-            #                                     if 'AM' in normalized_time.upper():
-            #                                         start_time_str += ' AM'
-            #                                     elif 'PM' in normalized_time.upper():
-            #                                         start_time_str += ' PM'
-            #                             else:
-            #                                 start_time_str = normalized_time
-            #                             
-            #                             booked_time = parser.parse(start_time_str)
-            #                             booked_datetime = datetime.datetime.combine(sunday_date, booked_time.time())
-            #                             booking.add_tennis_to_calendar(booked_datetime)
-            #                             logging.info(f"✓ Successfully booked Sunday at {time_text}!")
-            #                             booked = True
-            #                             break
-            #             
-            #             if not booked:
-            #                 logging.warning(f"Failed to book recommended time: {recommended_time}")
-            #         else:
-            #             logging.warning("LLM found no matching times on Sunday")
-            #     else:
-            #         logging.warning("No court times available on Sunday")
-            # else:
-            #     logging.warning("No calendar availability on Sunday")
-            
-            return True
+        with BayClubTennisBooking(headless=headless, username=username, password=password, dry_run=dry_run,
+                                  partner=partner, target=target) as booking:
+            booking.prepare_release(release_at)
+            with booking.step("login"):
+                booking.login()
+            with booking.step("select_location"):
+                booking.select_location(club)
+            booking.wait_for_release(release_at)
+            return booking.book_day(day_name, preferred_time=preferred_time, target_date=target_date, duration=duration,
+                                    calendar_summary=calendar_summary, calendar_description=calendar_description)
             
+    except AlreadyReserved as e:
+        logging.info(f"✓ {e}")
+        return True
     except Exception as e:
         logging.error(f"Booking failed: {e}")
         return False
 
 
+def main(force_mode=False, dry_run=False):
+    """Run the tennis jobs in schedule.toml that are due today (Tuesday for Friday, Thursday for Sunday)"""
+    today = datetime.datetime.now(CLUB_TZ)
+    logging.info(f"Starting Tennis Booking - {today.strftime('%A %Y-%m-%d')}")
+    
+    jobs = plan_jobs(load_spec(), today.date(), activity="tennis", force=force_mode)
+    if not jobs:
+        logging.error(f"No tennis jobs scheduled to run on {today.strftime('%A')}")
+        return False
+    
+    success = True
+    for job in jobs:
+        logging.info(f"Booking {job.label}")
+        success = execute(job, dry_run=dry_run) and success
+    return success
+
+
 if __name__ == "__main__":
-    success = main()
+    success = main(force_mode='--force' in sys.argv, dry_run='--dry-run' in sys.argv)
     sys.exit(0 if success else 1)
@@ -0,0 +1,131 @@
+import random
+import datetime
+import pytest
+from availability import AvailabilityMask, CLUB_TZ, FIRST_START, LAST_START, SLOT_STEP
+
+DAY = datetime.date(2026, 10, 19)
+
+
+def at(hour, minute=0, date=DAY, tz=CLUB_TZ):
+    return datetime.datetime.combine(date, datetime.time(hour, minute), tzinfo=tz)
+
+
+def event(start, end):
+    return {"start": {"dateTime": start.isoformat()}, "end": {"dateTime": end.isoformat()}}
+
+
+def free_on(mask, duration, date=DAY, **buffers):
+    return [start.strftime("%H:%M") for start in
+            mask.starts_on(mask.free_starts(duration, **buffers), date, FIRST_START, LAST_START, SLOT_STEP)]
+
+
+def test_free_starts_avoid_busy_blocks():
+    mask = AvailabilityMask(DAY, 1).add_events([event(at(9), at(10)), event(at(12), at(20, 30))])
+    # Touching a busy block is fine: 10:30-12:00 and 20:30-22:00 fit
+    assert free_on(mask, 90) == ["07:00", "07:30", "10:00", "10:30", "20:30"]
+
+
+def test_buffers_around_the_block():
+    mask = AvailabilityMask(DAY, 1).add_events([event(at(9), at(10)), event(at(12), at(23))])
+    assert free_on(mask, 90) == ["07:00", "07:30", "10:00", "10:30"]
+    # 30 minutes free before and 15 after: 7:30 runs into 9:00, 10:00 and 10:30 have no room on one side
+    assert free_on(mask, 90, before=30, after=15) == ["07:00"]
+
+
+def test_utc_events_land_on_local_minutes():
+    mask = AvailabilityMask(DAY, 2)
+    mask.add_events([{"start": {"dateTime": "2026-10-19T16:00:00Z"}, "end": {"dateTime": "2026-10-20T06:59:00Z"}},
+                     {"start": {"date": "2026-10-20"}, "end": {"date": "2026-10-21"}}])   # all-day: ignored
+    # 16:00Z is 9:00 AM in October; the busy block runs to 11:59 PM local
+    assert free_on(mask, 90) == ["07:00", "07:30"]
+    assert len(free_on(mask, 90, date=DAY + datetime.timedelta(days=1))) == (LAST_START - FIRST_START) // SLOT_STEP + 1
+
+
+def test_blocks_never_run_past_the_mask():
+    mask = AvailabilityMask(DAY, 1)
+    assert not mask.free_starts(90) >> (mask.size - 89)
+    assert mask.free_starts(90) >> (mask.size - 90) & 1
+
+
+def test_slot_mask_intersects_with_free_starts():
+    mask = AvailabilityMask(DAY, 1).add_events([event(at(9), at(10))])
+    offered = mask.slot_mask([at(8), at(9, 30), at(10), at(7, date=DAY + datetime.timedelta(days=1))])
+    starts = mask.starts_on(offered & mask.free_starts(90), DAY, FIRST_START, LAST_START, SLOT_STEP)
+    assert starts == [at(10)]
+
+
+SPRING_FORWARD = datetime.date(2026, 3, 8)   # 2:00 AM PST -> 3:00 AM PDT
+FALL_BACK = datetime.date(2026, 11, 1)       # 2:00 AM PDT -> 1:00 AM PST
+UTC = datetime.timezone.utc
+
+
+def busy_minutes(mask):
+    return {i for i in range(mask.size) if mask.busy >> i & 1}
+
+
+def utc(date, hour, minute=0):
+    return datetime.datetime.combine(date, datetime.time(hour, minute), tzinfo=UTC)
+
+
+def test_minute_index_uses_the_offset_of_each_side_of_a_change():
+    assert AvailabilityMask(SPRING_FORWARD, 1).minute_index(utc(SPRING_FORWARD, 17)) == 10 * 60   # PDT
+    assert AvailabilityMask(FALL_BACK, 1).minute_index(utc(FALL_BACK, 17)) == 9 * 60              # PST
+    # Both 01:30s of the fall-back day are the same wall-clock minute
+    mask = AvailabilityMask(FALL_BACK, 1)
+    assert mask.minute_index(utc(FALL_BACK, 8, 30)) == mask.minute_index(utc(FALL_BACK, 9, 30)) == 90
+
+
+@pytest.mark.parametrize("start, end, busy", [
+    ((1, 10, 0), (1, 50, 1), range(60, 120)),                            # 100 minutes over the repeated hour
+    ((1, 30, 0), (1, 10, 1), [*range(60, 70), *range(90, 120)]),         # ends "before" it starts on the wall
+    ((0, 30, 0), (1, 30, 1), range(30, 120)),
+    ((1, 30, 1), (2, 30, 0), range(90, 150)),                            # inside the second 1:00 AM hour
+])
+def test_fall_back_spans_cover_their_wall_clock_minutes(start, end, busy):
+    mask = AvailabilityMask(FALL_BACK, 1)
+    mask.add_busy(datetime.datetime.combine(FALL_BACK, datetime.time(*start[:2], fold=start[2]), tzinfo=CLUB_TZ),
+                  datetime.datetime.combine(FALL_BACK, datetime.time(*end[:2], fold=end[2]), tzinfo=CLUB_TZ))
+    assert busy_minutes(mask) == set(busy)
+
+
+def test_spring_forward_skipped_hour_is_never_free():
+    mask = AvailabilityMask(SPRING_FORWARD, 1)
+    assert busy_minutes(mask) == set(range(120, 180))
+    mask.add_busy(at(1, 30, SPRING_FORWARD), at(3, 30, SPRING_FORWARD))   # one real hour
+    assert busy_minutes(mask) == set(range(90, 210))
+    assert not mask.free_starts(30) >> 120 & 1
+    assert not AvailabilityMask(SPRING_FORWARD - datetime.timedelta(days=1), 3).free_starts(30) >> (1440 + 150) & 1
+
+
+@pytest.mark.parametrize("day", [SPRING_FORWARD, FALL_BACK])
+def test_every_real_minute_of_a_span_is_busy_and_nothing_else(day):
+    rng = random.Random(day.toordinal())
+    night = utc(day, 6)    # 10 or 11 PM the evening before, local
+    mask = AvailabilityMask(day - datetime.timedelta(days=1), 2)
+    for _ in range(200):
+        start = night + datetime.timedelta(minutes=rng.randrange(0, 8 * 60))
+        end = start + datetime.timedelta(minutes=rng.randrange(1, 4 * 60))
+        mask.busy = 0
+        mask.add_busy(start.astimezone(CLUB_TZ), end.astimezone(CLUB_TZ))
+        covered = {mask.minute_index(start + datetime.timedelta(minutes=m))
+                   for m in range(int((end - start).total_seconds() // 60))}
+        assert busy_minutes(mask) == covered
+
+
+@pytest.mark.parametrize("day", [SPRING_FORWARD, FALL_BACK])
+def test_daytime_free_starts_on_dst_days_match_an_ordinary_day(day):
+    rng = random.Random(day.toordinal())
+    ordinary = day - datetime.timedelta(days=7)
+    for _ in range(50):
+        duration = rng.choice((60, 90, 120))
+        blocks = []
+        for _ in range(rng.randrange(1, 4)):
+            start = rng.randrange(6 * 60, 21 * 60, 15)
+            blocks.append((start, start + rng.randrange(15, 180, 15)))
+        results = []
+        for date in (day, ordinary):
+            mask = AvailabilityMask(date, 1)
+            for start, end in blocks:
+                mask.add_busy(at(start // 60, start % 60, date), at(min(end, 1439) // 60, min(end, 1439) % 60, date))
+            results.append(free_on(mask, duration, date=date))
+        assert results[0] == results[1]
@@ -0,0 +1,57 @@
+import datetime
+import pytest
+
+bayclub_base = pytest.importorskip("bayclub_base")
+from ledger import Ledger, Target
+
+TARGET = Target("ignite", "San Francisco", datetime.date(2026, 10, 21), datetime.time(17, 30))
+
+
+class FakePage:
+    """My Reservations showing the given item span texts, or its empty state; loaded=False never renders"""
+
+    def __init__(self, items, loaded=True):
+        self.items = items
+        self.loaded = loaded
+
+    def goto(self, url, timeout=None):
+        pass
+
+    def wait_for_selector(self, selector, timeout=None):
+        if not self.loaded:
+            raise bayclub_base.PlaywrightTimeoutError("timeout")
+
+    def query_selector(self, selector):
+        return object() if self.items else None
+
+    def eval_on_selector_all(self, selector, script):
+        return self.items
+
+
+@pytest.fixture
+def booking(tmp_path):
+    booking = bayclub_base.BayClubBookingBase.__new__(bayclub_base.BayClubBookingBase)
+    booking.base_url = "http://mock"
+    booking.username = "sam"
+    booking.ledger = Ledger(str(tmp_path / "ledger.db"))
+    booking.ledger.record("sam", TARGET)
+    yield booking
+    booking.ledger.close()
+
+
+def test_sync_ledger_empty_page_clears_a_cancelled_reservation(booking):
+    booking.page = FakePage([])
+    assert booking.sync_ledger() == []
+    assert booking.ledger.satisfied("sam", TARGET) is None
+
+
+def test_sync_ledger_leaves_the_ledger_alone_when_nothing_loads(booking):
+    booking.page = FakePage([], loaded=False)
+    assert booking.sync_ledger() is None
+    assert booking.ledger.satisfied("sam", TARGET)
+
+
+def test_sync_ledger_leaves_the_ledger_alone_when_items_cant_be_read(booking):
+    booking.page = FakePage([["Bay Club San Francisco"]])
+    assert booking.sync_ledger() is None
+    assert booking.ledger.satisfied("sam", TARGET)
@@ -0,0 +1,89 @@
+import datetime
+from availability import CLUB_TZ
+from calendar_mirror import CalendarMirror
+from mock_calendar import FakeCalendarService
+
+
+class FakeEvents:
+    """events().list(...).execute() returning one page per call, in order"""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        return self
+
+    def execute(self):
+        return self.pages.pop(0)
+
+
+def event(event_id, start):
+    return {"id": event_id, "summary": "Tennis Court - Bay Club", "start": {"dateTime": start.isoformat()},
+            "end": {"dateTime": (start + datetime.timedelta(minutes=90)).isoformat()}}
+
+
+def test_deleted_events_keep_their_last_copy(tmp_path):
+    start = datetime.datetime(2026, 10, 16, 10, 0, tzinfo=CLUB_TZ)
+    mirror = CalendarMirror(str(tmp_path / "calendar.db"))
+    mirror.sync(FakeEvents([{"items": [event("a", start), event("b", start)], "nextSyncToken": "t1"}]))
+    mirror.sync(FakeEvents([{"items": [{"id": "a", "status": "cancelled"}], "nextSyncToken": "t2"}]))
+
+    assert [e["id"] for e in mirror.events_on(start.date())] == ["b"]
+    cancelled = mirror.cancelled_between(start - datetime.timedelta(days=1), start + datetime.timedelta(days=1))
+    assert [(e["id"], e["status"], e["summary"]) for e in cancelled] == [("a", "cancelled", "Tennis Court - Bay Club")]
+    assert set(mirror.stored_events(["a", "b", "c"])) == {"a", "b"}
+    mirror.close()
+
+
+def mirrored(mirror, today):
+    """(id, start) of every mirrored event over the fake calendar's days"""
+    return sorted((e["id"], e["start"]["dateTime"]) for e in mirror.events_on(today, today + datetime.timedelta(days=7)))
+
+
+def live(service):
+    return sorted((e["id"], e["start"]["dateTime"]) for e in service.by_id.values() if e["status"] != "cancelled")
+
+
+def changed_calendar(service, today):
+    service.populate(today + datetime.timedelta(days=3), 1, per_day=4, seed=1)
+    service.move_event("evt1", 30)
+    service.delete_event("evt2")
+    service.delete_event("evt3")
+
+
+def test_paged_incremental_sync(tmp_path):
+    today = datetime.datetime.now(CLUB_TZ).date()
+    service = FakeCalendarService(page_size=3)
+    service.populate(today, 3, per_day=4)
+    mirror = CalendarMirror(str(tmp_path / "calendar.db"))
+    assert mirror.sync(service) == (12, 0, True)
+    assert service.calls == 4
+
+    changed_calendar(service, today)
+    calls = service.calls
+    assert mirror.sync(service) == (5, 2, False)
+    assert service.calls - calls == 3          # seven changes, three to a page
+    assert mirror._meta("sync_token") == f"sync-{service.seq}"
+    assert mirrored(mirror, today) == live(service)
+    assert mirror.sync(service) == (0, 0, False)
+    mirror.close()
+
+
+def test_expired_sync_token_resyncs_in_full(tmp_path):
+    today = datetime.datetime.now(CLUB_TZ).date()
+    service = FakeCalendarService(page_size=5)
+    service.populate(today, 3, per_day=4)
+    mirror = CalendarMirror(str(tmp_path / "calendar.db"))
+    mirror.sync(service)
+
+    changed_calendar(service, today)
+    service.expire_tokens()
+    changed, removed, full = mirror.sync(service)
+    assert full and removed == 0
+    assert changed == len(live(service)) == 14
+    assert mirror._meta("sync_token") == f"sync-{service.seq}"
+    assert mirrored(mirror, today) == live(service)
+    mirror.close()
@@ -0,0 +1,69 @@
+import time
+import datetime
+import pytest
+
+clock_sync = pytest.importorskip("clock_sync")
+ClockEstimate, ClockSync, Probe, estimate = (clock_sync.ClockEstimate, clock_sync.ClockSync, clock_sync.Probe,
+                                             clock_sync.estimate)
+
+
+def test_estimate_prefers_the_fastest_timestamp_probe():
+    probes = [Probe(100.0, 100.2, date=103.0, server=103.15), Probe(101.0, 101.02, date=104.0, server=104.0)]
+    result = estimate(probes)
+    assert result.source == "timestamp"
+    assert result.offset == pytest.approx(2.99)
+    assert result.uncertainty == pytest.approx(0.01)
+    assert result.probes == 2
+
+
+def test_estimate_intersects_date_bounds():
+    # Each probe bounds the offset; together they narrow it to [2.2, 2.4)
+    probes = [Probe(100.0, 100.05, date=102.0), Probe(100.6, 100.65, date=102.0), Probe(100.75, 100.8, date=103.0)]
+    result = estimate(probes)
+    assert result.source == "date"
+    assert result.offset == pytest.approx(2.3)
+    assert result.uncertainty == pytest.approx(0.1)
+    assert result.rtt == pytest.approx(0.05)
+
+
+def test_estimate_falls_back_to_the_fastest_probe_on_inconsistent_bounds():
+    probes = [Probe(100.0, 100.1, date=105.0), Probe(100.2, 100.25, date=101.0)]
+    result = estimate(probes)
+    assert result.offset == pytest.approx(101.5 - 100.225)
+    assert result.uncertainty == pytest.approx(0.525)
+
+
+def test_estimate_without_times():
+    assert estimate([Probe(100.0, 100.1)]) is None
+    assert estimate([]) is None
+
+
+class CountingClock(ClockSync):
+    def __init__(self, estimate=None):
+        super().__init__("http://127.0.0.1:1/favicon.ico")
+        self.estimate = estimate
+        self.syncs = []
+
+    def sync(self, probes=8):
+        self.syncs.append(probes)
+        return self.estimate
+
+
+def test_wait_for_a_passed_release_returns_without_probing():
+    clock = CountingClock()
+    clock.wait_for(datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=5))
+    assert clock.syncs == []
+
+
+def test_wait_for_reuses_an_earlier_estimate_close_to_release():
+    clock = CountingClock(ClockEstimate(0.0, 0.001, 0.002, "timestamp", 3))
+    release = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=0.05)
+    clock.wait_for(release)
+    assert clock.syncs == []
+    assert time.time() >= release.timestamp() - 0.002
+
+
+def test_wait_for_without_an_estimate_probes_only_while_there_is_time():
+    clock = CountingClock()
+    clock.wait_for(datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=0.05))
+    assert clock.syncs == [1]
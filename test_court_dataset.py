@@ -0,0 +1,53 @@
+import datetime
+import pytest
+
+pytest.importorskip("pyarrow")
+import court_dataset
+
+DATE = datetime.date(2026, 10, 21)
+T0 = datetime.datetime(2026, 10, 19, 16, 0, tzinfo=datetime.timezone.utc)
+
+
+def row(minutes, start_minute, available, court=None, club="Gateway"):
+    return {"snapshot_at": T0 + datetime.timedelta(minutes=minutes), "club": club, "date": DATE,
+            "start_minute": start_minute, "duration": 90, "court": court, "available": available,
+            "courts_left": int(available)}
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = str(tmp_path / "courts")
+    snapshots = [
+        [row(0, 600, False), row(0, 660, True), row(0, 720, False)],   # 10:00 full before it was ever seen open
+        [row(5, 600, True), row(5, 660, True), row(5, 720, False)],
+        [row(10, 600, False), row(10, 660, True), row(10, 720, False), row(10, 600, True, club="Redwood Shores")],
+        [row(15, 600, False), row(15, 660, True), row(15, 720, False)],
+    ]
+    for rows in snapshots:
+        court_dataset.append(rows, path)
+    return path
+
+
+def test_fill_times_first_open_then_first_full_after_it(dataset):
+    slots = {(s["club"], s["start_minute"]): s for s in court_dataset.fill_times(dataset).to_pylist()}
+    assert set(slots) == {("Gateway", 600), ("Gateway", 660), ("Redwood Shores", 600)}
+    ten = slots["Gateway", 600]
+    assert ten["opened_at"] == T0 + datetime.timedelta(minutes=5)
+    assert ten["filled_at"] == T0 + datetime.timedelta(minutes=10)
+    assert ten["court"] == ""
+    assert slots["Gateway", 660]["filled_at"] is None
+
+
+def test_fill_times_filters(dataset):
+    assert court_dataset.fill_times(dataset, club="Redwood Shores").num_rows == 1
+    assert court_dataset.fill_times(dataset, since=DATE + datetime.timedelta(days=1)).num_rows == 0
+
+
+def test_fill_percentiles(dataset):
+    stats = {(s["club"], s["start"]): s for s in court_dataset.fill_percentiles(dataset, club="Gateway").to_pylist()}
+    ten = stats["Gateway", "10:00 AM"]
+    assert (ten["weekday"], ten["opened"], ten["filled"]) == (2, 1, 1)
+    # Filled at 09:10 PDT on the 19th for a 10:00 AM start on the 21st, after 5 minutes open
+    assert ten["lead_p50"] == pytest.approx(48 + 50 / 60)
+    assert ten["open_p50"] == pytest.approx(5)
+    assert stats["Gateway", "11:00 AM"]["lead_p50"] is None
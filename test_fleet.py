@@ -0,0 +1,30 @@
+import datetime
+import threading
+import pytest
+
+fleet = pytest.importorskip("fleet")
+
+RELEASE = datetime.datetime(2026, 10, 20, 0, 1, tzinfo=datetime.timezone.utc)
+
+
+def test_later_release_fires_while_earlier_jobs_still_run(monkeypatch):
+    first = fleet.BookingJob("a", "Gateway", "tennis", "Fr", release_at=RELEASE)
+    second = fleet.BookingJob("b", "Gateway", "tennis", "Su", release_at=RELEASE + datetime.timedelta(minutes=1))
+    second_started = threading.Event()
+    waited = []
+
+    def run_job(job, account, headless=True):
+        if job is first:
+            # Only finishes on its own if the second group was submitted without waiting for this one
+            return fleet.JobResult(job, second_started.wait(5))
+        second_started.set()
+        return fleet.JobResult(job, True)
+
+    monkeypatch.setattr(fleet, "run_job", run_job)
+    monkeypatch.setattr(fleet, "ClockSync", lambda url: None)
+    monkeypatch.setattr(fleet, "wait_until", lambda release_at, clock: waited.append(release_at))
+    results = fleet.run_fleet({"a": None, "b": None}, [second, first], max_contexts=2)
+
+    assert waited == [first.release_at, second.release_at]
+    assert [result.job for result in results] == [first, second]
+    assert all(result.success for result in results)
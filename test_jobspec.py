@@ -0,0 +1,54 @@
+import datetime
+import pytest
+
+jobspec = pytest.importorskip("jobspec")
+
+MONDAY = datetime.date(2026, 10, 19)
+
+
+def job(**raw):
+    return {"name": "ignite-wednesday", "activity": "ignite", "club": "San Francisco",
+            "run_on": "Monday", "day_offset": 2, **raw}
+
+
+def test_parse_job_defaults():
+    spec = jobspec.parse_job(0, job())
+    assert spec.time == datetime.time(17, 30)
+    assert spec.duration == 50
+    assert spec.target_weekday == 2
+
+
+@pytest.mark.parametrize("raw, message", [
+    (job(activity="squash"), "unknown activity"),
+    (job(club="Nowhere"), "unknown club"),
+    (job(day_offset=True), "day_offset must be int"),
+    (job(partner="Sam"), "partner only applies to tennis"),
+    (job(colour="red"), "unknown field"),
+])
+def test_parse_job_rejects(raw, message):
+    with pytest.raises(ValueError, match=message):
+        jobspec.parse_job(0, raw)
+
+
+def test_plan_jobs_due_today():
+    specs = (jobspec.parse_job(0, job(release="5:30 PM")),
+             jobspec.parse_job(1, job(name="ignite-monday", run_on="Saturday")))
+    (planned,) = jobspec.plan_jobs(specs, MONDAY)
+    assert planned.target_date == datetime.date(2026, 10, 21)
+    assert planned.day_code == "We"
+    assert planned.release_at == datetime.datetime.combine(MONDAY, datetime.time(17, 30), tzinfo=jobspec.CLUB_TZ)
+
+
+def test_plan_jobs_force_never_targets_today():
+    # ignite-monday runs on Saturday; forced on a Monday it books next Monday, not today's class
+    spec = jobspec.parse_job(0, job(name="ignite-monday", run_on="Saturday"))
+    (planned,) = jobspec.plan_jobs((spec,), MONDAY, force=True)
+    assert planned.target_date == MONDAY + datetime.timedelta(days=7)
+    assert planned.release_at is None
+    assert jobspec.plan_jobs((spec,), MONDAY) == ()
+
+
+def test_plan_jobs_skips_disabled_and_other_activities():
+    specs = (jobspec.parse_job(0, job(enabled=False)),)
+    assert jobspec.plan_jobs(specs, MONDAY) == ()
+    assert jobspec.plan_jobs((jobspec.parse_job(0, job()),), MONDAY, activity="tennis") == ()
@@ -0,0 +1,68 @@
+import datetime
+import pytest
+from ledger import Ledger, Target, activity_of, parse_date, parse_start
+
+TODAY = datetime.date(2026, 10, 19)
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = Ledger(str(tmp_path / "ledger.db"))
+    yield ledger
+    ledger.close()
+
+
+def reservation(activity="tennis", date="2026-10-21", start="10:00", club="Gateway"):
+    return {"activity": activity, "club": club, "date": date, "start": start, "label": "10:00 - 11:30 AM"}
+
+
+@pytest.mark.parametrize("label, start", [
+    ("10:00 - 11:30 AM", datetime.time(10, 0)),
+    ("5:30 PM", datetime.time(17, 30)),
+    ("All day", None),
+])
+def test_parse_start(label, start):
+    assert parse_start(label) == start
+
+
+def test_parse_date_rolls_into_next_year():
+    assert parse_date("Friday, October 23", TODAY) == datetime.date(2026, 10, 23)
+    assert parse_date("Monday, January 4", TODAY) == datetime.date(2027, 1, 4)
+
+
+@pytest.mark.parametrize("text, activity", [
+    ("Tennis", "tennis"), ("Ignite - 50 min", "ignite"), ("Pickleball", "unknown"), ("", "unknown"),
+])
+def test_activity_of(text, activity):
+    assert activity_of(text) == activity
+
+
+def test_satisfied_matches_activity_club_date_and_time(ledger):
+    ledger.replace("sam", [reservation(), reservation(activity="unknown", date="2026-10-22")], TODAY)
+    day = datetime.date(2026, 10, 21)
+    assert ledger.satisfied("sam", Target("tennis", "Gateway", day))
+    assert ledger.satisfied("sam", Target("tennis", "Gateway", day, datetime.time(10, 0)))
+    assert not ledger.satisfied("sam", Target("tennis", "Gateway", day, datetime.time(11, 30)))
+    assert not ledger.satisfied("sam", Target("tennis", "Redwood Shores", day))
+    assert not ledger.satisfied("alex", Target("tennis", "Gateway", day))
+    # A reservation the reader couldn't classify never counts as the target
+    assert not ledger.satisfied("sam", Target("tennis", "Gateway", datetime.date(2026, 10, 22)))
+
+
+def test_replace_keeps_other_accounts_and_drops_the_past(ledger):
+    ledger.record("sam", Target("tennis", "Gateway", datetime.date(2026, 10, 23)))
+    ledger.record("alex", Target("ignite", "San Francisco", datetime.date(2026, 10, 21), datetime.time(17, 30)))
+    ledger.record("alex", Target("ignite", "San Francisco", datetime.date(2026, 10, 12), datetime.time(17, 30)))
+    ledger.replace("sam", [reservation(), reservation(date="2026-10-01")], TODAY)
+    rows = [(account, activity, date, source) for account, activity, club, date, *_, source, _ in ledger.upcoming()]
+    assert rows == [("sam", "tennis", "2026-10-21", "synced"), ("alex", "ignite", "2026-10-21", "confirmed")]
+    assert ledger.count_on("sam", "tennis", datetime.date(2026, 10, 21)) == 1
+
+
+def test_cancelled_reservation_stops_blocking_after_an_empty_sync(ledger):
+    target = Target("ignite", "San Francisco", datetime.date(2026, 10, 21), datetime.time(17, 30))
+    ledger.record("sam", target)
+    assert ledger.satisfied("sam", target)
+    # Cancelled on the site: My Reservations now shows its empty state
+    ledger.replace("sam", [], TODAY)
+    assert ledger.satisfied("sam", target) is None
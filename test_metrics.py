@@ -0,0 +1,50 @@
+import datetime
+from metrics import render
+from run_history import connect, report
+
+STARTED = datetime.datetime.now().replace(microsecond=0)
+
+
+def add_runs(path, runs):
+    conn = connect(path)
+    with conn:
+        for i, (outcome, to_confirm) in enumerate(runs):
+            conn.execute(
+                "INSERT INTO runs (run_key, started_at, script, outcome, time_to_confirm, dry_run, fallbacks)"
+                " VALUES (?, ?, 'tennisbookapp', ?, ?, 0, ?)",
+                (f"run-{i}", (STARTED + datetime.timedelta(minutes=i)).isoformat(), outcome, to_confirm, i % 2)
+            )
+    conn.close()
+
+
+def sample(text, line_start):
+    (line,) = [line for line in text.splitlines() if line.startswith(line_start + " ")]
+    return float(line.rsplit(" ", 1)[1])
+
+
+def test_render_leaves_helper_sessions_out_of_attempts(tmp_path):
+    path = str(tmp_path / "history.db")
+    add_runs(path, [("booked", 12.0), ("failed", None), ("hold_stuck", None), ("released", None),
+                    ("already_booked", None)])
+    text = render(path)
+    assert sample(text, 'bayclub_runs_total{script="tennisbookapp",outcome="hold_stuck"}') == 1
+    assert sample(text, 'bayclub_attempts_total{script="tennisbookapp"}') == 2
+    assert sample(text, 'bayclub_successes_total{script="tennisbookapp"}') == 1
+    assert sample(text, 'bayclub_time_to_confirm_seconds_bucket{script="tennisbookapp",le="20"}') == 1
+    assert sample(text, 'bayclub_time_to_confirm_seconds_count{script="tennisbookapp"}') == 1
+
+
+def test_render_empty_history(tmp_path):
+    text = render(str(tmp_path / "history.db"))
+    assert "# TYPE bayclub_attempts_total counter" in text
+    assert "bayclub_attempts_total{" not in text
+
+
+def test_report_counts_the_same_attempts(tmp_path, capsys):
+    path = str(tmp_path / "history.db")
+    add_runs(path, [("booked", 12.0), ("failed", None), ("hold_stuck", None), ("unused", None),
+                    ("hold_lost", None), ("hold_failed", None)])
+    report(path=path)
+    out = capsys.readouterr().out
+    assert "Runs in the last 4 weeks: 2" in out
+    assert "Success rate: 50% (1/2)" in out
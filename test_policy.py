@@ -0,0 +1,65 @@
+import datetime
+import pytest
+import run_history
+from availability import CLUB_TZ
+from policy import CALENDAR_SUMMARY, SIGNAL_WEIGHTS, calendar_signals, compile_scores, prior_score
+
+NOW = datetime.datetime(2026, 10, 19, 12, 0, tzinfo=CLUB_TZ)
+FRIDAY_10AM = datetime.datetime(2026, 10, 16, 10, 0, tzinfo=CLUB_TZ)
+
+
+def event(event_id, start, status="confirmed"):
+    return {"id": event_id, "status": status, "summary": f"{CALENDAR_SUMMARY} Gateway",
+            "start": {"dateTime": start.isoformat()}, "end": {"dateTime": (start + datetime.timedelta(minutes=90)).isoformat()}}
+
+
+def test_compile_scores_is_the_prior_without_signals():
+    scores = compile_scores([], NOW)
+    assert scores[(4, 600)] == round(prior_score(4, 600), 3)
+    assert len(scores) == 7 * len(range(7 * 60, 20 * 60 + 31, 30))
+
+
+def test_compile_scores_adds_decayed_signal_weights():
+    scores = compile_scores([("booked", FRIDAY_10AM), ("cancelled", FRIDAY_10AM)], NOW)
+    age_days = (NOW - FRIDAY_10AM).total_seconds() / 86400
+    decay = 0.5 ** (age_days / 56)
+    expected = prior_score(4, 600) + (SIGNAL_WEIGHTS["booked"] + SIGNAL_WEIGHTS["cancelled"]) * decay
+    assert scores[(4, 600)] == pytest.approx(expected, abs=1e-3)
+    assert scores[(3, 600)] == round(prior_score(3, 600), 3)
+
+
+def test_calendar_signals_kept_and_future_events():
+    future = NOW + datetime.timedelta(days=2)
+    signals = calendar_signals([event("a", FRIDAY_10AM), event("b", future)], NOW)
+    assert signals == [("kept", FRIDAY_10AM)]
+
+
+def test_calendar_signals_fills_cancelled_events_from_stored_copies():
+    # Incremental sync returns deleted events without summary or start
+    deleted = {"id": "a", "status": "cancelled"}
+    assert calendar_signals([deleted], NOW) == []
+    assert calendar_signals([deleted], NOW, stored={"a": event("a", FRIDAY_10AM)}) == [("cancelled", FRIDAY_10AM)]
+
+
+def test_calendar_signals_counts_each_event_once():
+    cancelled = event("a", FRIDAY_10AM, status="cancelled")
+    assert calendar_signals([cancelled, cancelled], NOW) == [("cancelled", FRIDAY_10AM)]
+
+
+def test_history_signals_records_lost_first_choices(tmp_path):
+    pytest.importorskip("tennisbookapp")
+    from policy import history_signals
+
+    path = str(tmp_path / "history.db")
+    run = run_history.RunRecorder("BayClubTennisBooking")
+    run.started_at = datetime.datetime(2026, 10, 14, 9, 0)
+    run.target = "Friday best available"
+    run.chosen_slot = "12:00 - 1:30 PM"
+    run.lost_slots = ["10:00 - 11:30 AM"]
+    run.outcome = "booked"
+    run.finish(path=path)
+
+    conn = run_history.connect(path)
+    signals = history_signals(conn, datetime.datetime(2026, 10, 1))
+    conn.close()
+    assert sorted(signals) == [("booked", FRIDAY_10AM.replace(hour=12)), ("lost", FRIDAY_10AM)]
@@ -0,0 +1,22 @@
+import pytest
+
+release_poller = pytest.importorskip("release_poller")
+
+
+@pytest.mark.parametrize("start, bookable, matches", [
+    ("1:00 PM", True, True),
+    ("1:00pm", True, True),
+    ("2026-10-20T13:00:00", True, True),
+    ("1:00 - 2:30 PM", True, True),
+    ("11:00 PM", True, False),
+    ("2026-10-20T01:00:00", True, False),
+    ("1:00 PM", False, False),
+])
+def test_target_bookable_compares_start_times(start, bookable, matches):
+    assert release_poller.target_bookable([(start, "Court 1", bookable)], "1:00 PM") is matches
+
+
+def test_target_bookable_by_name():
+    slots = [("5:30 PM", "Pilates", True), ("5:30 PM", "Ignite", False)]
+    assert not release_poller.target_bookable(slots, "5:30 PM", "ignite")
+    assert release_poller.target_bookable(slots, "5:30 PM", "pilates")
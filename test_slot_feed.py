@@ -0,0 +1,40 @@
+from slot_feed import SlotFeed, find_records, parse_classes, parse_court_slots
+
+
+CLASS_PAYLOAD = {"club": "San Francisco", "data": {"classes": [
+    {"id": "c1", "name": "Cycle", "startTime": "6:30 AM", "isBookable": True, "spotsLeft": 4},
+    {"id": "c2", "name": "Ignite", "startTime": "5:30 PM", "isBookable": False, "spotsLeft": 0},
+    {"id": "c3", "name": "No start", "isBookable": True},
+]}}
+
+
+def test_find_records_keeps_document_order_and_needs_start_and_flag():
+    records = find_records(CLASS_PAYLOAD)
+    assert [r["id"] for r in records] == ["c1", "c2"]
+
+
+def test_find_records_nested_lists():
+    payload = [[{"start": "10:00", "available": False}], {"slots": [{"start": "11:00", "available": True}]}]
+    assert [r["start"] for r in find_records(payload)] == ["10:00", "11:00"]
+
+
+def test_parse_classes():
+    ignite = parse_classes(CLASS_PAYLOAD)[1]
+    assert (ignite.name, ignite.start, ignite.bookable, ignite.spots_left) == ("Ignite", "5:30 PM", False, 0)
+
+
+def test_parse_court_slots():
+    (slot,) = parse_court_slots({"slots": [{"id": "s", "startTime": "2026-10-23T10:00:00", "isAvailable": 1,
+                                            "label": "10:00 - 11:30 AM", "courtName": "Court 3", "duration": 90}]})
+    assert slot.available is True
+    assert (slot.text, slot.court, slot.duration) == ("10:00 - 11:30 AM", "Court 3", 90)
+
+
+def test_ingest_only_reads_class_and_court_urls():
+    feed = SlotFeed(enabled=True)
+    feed.ingest("https://example.com/api/notifications", CLASS_PAYLOAD)
+    assert feed.latest == {}
+    feed.ingest("https://example.com/api/classes?date=2026-10-19", CLASS_PAYLOAD)
+    feed.ingest("https://example.com/api/court-slots?date=2026-10-23", {"slots": [{"start": "10:00", "available": True}]})
+    assert set(feed.latest) == {"classes", "courts"}
+    assert len(feed.latest["classes"][0]) == 2
@@ -0,0 +1,119 @@
+import queue
+import datetime
+import threading
+import pytest
+
+speculate = pytest.importorskip("speculate")
+
+NOW = datetime.datetime(2026, 10, 19, 9, 0, tzinfo=datetime.timezone.utc)
+RULES = speculate.SpeculationRules(enabled=True, max_holds=3, max_reservations_per_day=3, min_cancel_notice_hours=24)
+
+
+def starts(*hours_ahead):
+    return [NOW + datetime.timedelta(hours=h) for h in hours_ahead]
+
+
+def test_holds_for_is_bounded_by_rules_and_candidates():
+    assert RULES.holds_for("Gateway", starts(48, 50, 52, 54), NOW) == 3
+    assert RULES.holds_for("Gateway", starts(48, 50), NOW) == 2
+    assert speculate.SpeculationRules().holds_for("Gateway", starts(48, 50), NOW) == 1
+
+
+def test_holds_for_counts_existing_reservations():
+    assert RULES.holds_for("Gateway", starts(48, 50, 52), NOW, existing=1) == 2
+    assert RULES.holds_for("Gateway", starts(48, 50, 52), NOW, existing=3) == 1
+
+
+def test_holds_for_only_checks_notice_on_held_starts():
+    # The third candidate is within the notice, but only two can be held
+    rules = speculate.SpeculationRules(enabled=True, max_holds=2, max_reservations_per_day=2)
+    assert rules.holds_for("Gateway", starts(48, 50, 2), NOW) == 2
+    assert rules.holds_for("Gateway", starts(48, 2, 50), NOW) == 1
+
+
+class FakeWorker:
+    def __init__(self, prepared, held=True):
+        self.ready = threading.Event()
+        self.done = threading.Event()
+        self.assignment = queue.Queue()
+        self.decision = queue.Queue()
+        self.prepared = prepared
+        self.held = held
+        self.released = True
+        self.time_text = None
+        if prepared:
+            self.ready.set()
+
+    def join(self, timeout=None):
+        pass
+
+
+class FakeBooking:
+    def __init__(self, books):
+        self.books = books
+        self.run = type("Run", (), {"chosen_slot": None, "fallbacks": 0})()
+
+    def book_candidates(self, candidates, court_times):
+        return candidates[0] if self.books else None
+
+    def return_to_slot_list(self):
+        return True
+
+
+def test_book_speculatively_only_assigns_ready_helpers():
+    ready, failed = FakeWorker(prepared=True), FakeWorker(prepared=False)
+    ready.done.set()
+    failed.ready.set()
+    kept = speculate.book_speculatively(FakeBooking(books=False), ["10:00 AM", "11:30 AM", "1:00 PM"], [],
+                                        [failed, ready], timeout=1, ready_timeout=0.1)
+    assert failed.assignment.get_nowait() is None
+    assert ready.assignment.get_nowait() == "11:30 AM"
+    assert ready.decision.get_nowait() is False
+    assert kept == "11:30 AM"
+
+
+class FakeSession:
+    """Stands in for BayClubTennisBooking in a helper; books nothing, or raises while opening the date"""
+
+    runs = []
+
+    def __init__(self, fail=False, **kwargs):
+        self.fail = fail
+        self.run = type("Run", (), {"outcome": "failed", "error_class": None, "error_message": None})()
+        FakeSession.runs.append(self.run)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def login(self):
+        pass
+
+    def select_location(self, club):
+        pass
+
+    def select_date(self, date):
+        if self.fail:
+            raise RuntimeError("court page didn't load")
+        return True
+
+    def get_available_court_times(self):
+        return [("10:00 - 11:30 AM", None)]
+
+    def book_candidates(self, candidates, court_times):
+        return None
+
+
+@pytest.mark.parametrize("fail, outcome", [(False, "hold_lost"), (True, "hold_failed")])
+def test_helper_that_holds_nothing_gets_a_helper_outcome(monkeypatch, fail, outcome):
+    tennisbookapp = pytest.importorskip("tennisbookapp")
+    monkeypatch.setattr(tennisbookapp, "BayClubTennisBooking", lambda **kwargs: FakeSession(fail=fail, **kwargs))
+    FakeSession.runs = []
+    worker = speculate.HoldWorker(1, "Gateway", datetime.date(2026, 10, 21))
+    worker.assignment.put("10:00 - 11:30 AM")
+    worker.run()
+    (run,) = FakeSession.runs
+    assert run.outcome == outcome
+    assert not worker.held and worker.done.is_set()